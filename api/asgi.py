@@ -0,0 +1,226 @@
+"""
+Metal Price Tracker - asyncio (ASGI) sürümü
+Flask uygulamasıyla aynı rotalar: rota gövdeleri core.routes'tan, ETag/gzip ve metrik
+ara katmanı core.web/core.metrics'ten gelir; kaynak istekleri core.aio ile (httpx)
+bloklamadan yapılır. Bu dosya yalnızca ASGI istek/yanıt çevirisidir. Çalıştırma:
+    uvicorn asgi:app --app-dir api --port 8000
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import core  # noqa: E402
+
+class Request:
+    def __init__(self, scope, body):
+        self.method = scope['method']
+        self.path = scope['path']
+        # Flask'taki request.args gibi: boş değerler korunur, ilk değer geçerli
+        self.args = {k: v[0] for k, v in parse_qs(scope.get('query_string', b'').decode(), keep_blank_values=True).items()}
+        self.headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body or b'{}')
+
+def respond(request, reply):
+    """core.routes.Reply -> (durum, başlıklar, gövde); GET yanıtlarına ETag/304 ve gzip"""
+    status, headers, body = core.web.json_validators(
+        request.method, reply.status, core.routes.encode(reply), reply.etag, reply.cache_control,
+        request.headers.get('accept-encoding', ''), request.headers.get('if-none-match', ''))
+    headers = {k.lower(): v for k, v in headers.items()}
+    if status != 304:
+        headers['content-type'] = 'application/json'
+    return status, headers, body
+
+# Rotalar
+async def page_index(request):
+    status, headers, body = core.page.page_reply(request.headers.get('accept-encoding', ''),
+                                                 request.headers.get('if-none-match', ''))
+    return status, {k.lower(): v for k, v in headers.items()}, body
+
+async def api_login(request):
+    return respond(request, core.routes.login(request.json))
+
+async def api_verify_session(request):
+    return respond(request, core.routes.verify_session(request.json))
+
+async def api_portfolio_config(request):
+    return respond(request, core.routes.portfolio_config())
+
+def price_route(source):
+    async def route(request):
+        try:
+            value, fetched_at = await core.aio.get_cached_price(source)
+        except Exception as e:
+            return respond(request, core.routes.error(e))
+        return respond(request, core.routes.price(source, value, fetched_at))
+    return route
+
+async def api_table_data(request):
+    return respond(request, await core.aio.run_with_history(core.routes.table_data))
+
+async def api_stats(request):
+    return respond(request, await core.aio.run_with_history(core.routes.stats, request.args))
+
+async def api_history(request):
+    return respond(request, await core.aio.run_with_history(core.routes.history, request.args))
+
+async def api_snapshot(request):
+    try:
+        return respond(request, core.routes.snapshot(await core.aio.get_dashboard_snapshot()))
+    except Exception as e:
+        return respond(request, core.routes.error(e))
+
+async def api_warmup(request):
+    return respond(request, await core.aio.run_with_history(core.routes.warmup))
+
+async def api_status(request):
+    return respond(request, core.routes.status())
+
+async def api_cache_stats(request):
+    return respond(request, core.routes.cache_stats(len(core.aio.stream_clients)))
+
+async def api_stream_disabled(request):
+    return respond(request, core.routes.stream_disabled())
+
+async def api_stream(receive, send, extra_headers):
+    """İlk olarak tam durumu, sonra yalnızca değişen bölümleri gönderir"""
+    async def wait_disconnect():
+        # Kapanan bağlantıya send sessizce yutulur; ayrılma receive ile anlaşılır
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [
+        (b'content-type', b'text/event-stream; charset=utf-8'),
+        (b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no'),
+        *((k.encode('latin-1'), v.encode('latin-1')) for k, v in extra_headers.items())]})
+    disconnect = asyncio.create_task(wait_disconnect())
+    client = core.aio.subscribe_stream()
+    try:
+        state = await core.aio.initial_state()
+        await send({'type': 'http.response.body', 'body': core.stream.format_sse('snapshot', state).encode(), 'more_body': True})
+        while True:
+            getter = asyncio.ensure_future(client.get())
+            done, _ = await asyncio.wait({getter, disconnect}, timeout=core.stream.STREAM_KEEPALIVE,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+            if disconnect in done:
+                return
+            event = getter.result() if getter in done else ": keep-alive\n\n"
+            if event is core.stream.STREAM_CLOSE:
+                return
+            await send({'type': 'http.response.body', 'body': event.encode(), 'more_body': True})
+    finally:
+        disconnect.cancel()
+        core.aio.stream_clients.discard(client)
+
+async def api_metrics(request):
+    return 200, {'content-type': core.metrics.CONTENT_TYPE, 'cache-control': 'no-store'}, core.metrics.render().encode()
+
+ROUTES = {
+    ('GET', '/'): page_index,
+    ('POST', '/api/login'): api_login,
+    ('POST', '/api/verify-session'): api_verify_session,
+    ('GET', '/api/portfolio-config'): api_portfolio_config,
+    ('GET', '/api/gold-price'): price_route("gold"),
+    ('GET', '/api/silver-price'): price_route("silver"),
+    ('GET', '/api/gold-ounce-usd'): price_route("gold_ounce_usd"),
+    ('GET', '/api/silver-ounce-usd'): price_route("silver_ounce_usd"),
+    ('GET', '/api/table-data'): api_table_data,
+    ('GET', '/api/stats'): api_stats,
+    ('GET', '/api/history'): api_history,
+    ('GET', '/api/snapshot'): api_snapshot,
+    # SSE_ENABLED açıkken app() akışı bu tablodan önce yakalar
+    ('GET', '/api/stream'): api_stream_disabled,
+    ('GET', '/api/warmup'): api_warmup,
+    ('GET', '/api/status'): api_status,
+    ('GET', '/api/cache-stats'): api_cache_stats,
+    ('GET', '/metrics'): api_metrics,
+}
+
+# CORS - Flask tarafındaki CORS(app) varsayılanlarıyla aynı: Origin varsa yansıtılır
+CORS_METHODS = 'DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT'
+
+def cors_headers(request_headers):
+    origin = request_headers.get(b'origin')
+    if origin is None:
+        return {'access-control-allow-origin': '*'}
+    return {'access-control-allow-origin': origin.decode('latin-1'), 'vary': 'Origin'}
+
+def preflight_headers(methods, request_headers):
+    """OPTIONS yanıtı: izinli metotlar, ön kontrol isteğiyse CORS metot/başlıkları"""
+    methods = set(methods) | {'OPTIONS'} | ({'HEAD'} if 'GET' in methods else set())
+    headers = {'content-type': 'text/html; charset=utf-8', 'allow': ', '.join(sorted(methods))}
+    if b'access-control-request-method' in request_headers:
+        headers['access-control-allow-methods'] = CORS_METHODS
+        if b'access-control-request-headers' in request_headers:
+            headers['access-control-allow-headers'] = request_headers[b'access-control-request-headers'].decode('latin-1')
+    return headers
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            if core.warmup.WARMUP != 'off':
+                # Geçmiş async indirilir, snapshot/tablo thread'de kurulur
+                core.aio.spawn(core.aio.run_with_history(core.warmup.warm))
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await core.aio.http_client.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    method = 'GET' if scope['method'] == 'HEAD' else scope['method']
+    request_headers = dict(scope['headers'])
+    if method == 'GET' and scope['path'] == '/api/stream' and core.page.SSE_ENABLED:
+        # Bağlantı süresi gecikme sayılmaz, yalnızca istek sayılır
+        core.metrics.record_request('/api/stream', scope['method'], 200)
+        return await api_stream(receive, send, cors_headers(request_headers))
+
+    started = time.perf_counter()
+    route = ROUTES.get((method, scope['path']))
+    allowed = [m for m, path in ROUTES if path == scope['path']]
+    if route is not None:
+        status, headers, body = await route(Request(scope, await read_body(receive)))
+    elif method == 'OPTIONS' and allowed:
+        status, headers, body = 200, preflight_headers(allowed, request_headers), b''
+    elif allowed:
+        status, headers, body = 405, {'content-type': 'text/plain'}, b'Method Not Allowed'
+    else:
+        status, headers, body = 404, {'content-type': 'text/plain'}, b'Not Found'
+
+    label = scope['path'] if allowed else 'unmatched'
+    core.metrics.record_request(label, scope['method'], status, time.perf_counter() - started,
+                                None if 'content-encoding' in headers else body)
+
+    for name, value in cors_headers(request_headers).items():
+        headers[name] = f"{headers['vary']}, {value}" if name == 'vary' and 'vary' in headers else value
+    headers['content-length'] = str(len(body))
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(k.encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()]})
+    await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 8000)))
@@ -0,0 +1,18 @@
+"""
+Metal Price Tracker çekirdeği - Flask (api/index.py, app.py) ve ASGI (api/asgi.py)
+giriş noktalarının paylaştığı tek uygulama katmanı.
+
+Alt modüller ilk erişimde yüklenir (core.prices, core.snapshot, ...); böylece bir
+rota yalnızca ihtiyaç duyduğu bağımlılıkları (numpy, bs4, şablon) yükler.
+"""
+import importlib
+
+SUBMODULES = ("auth", "net", "history", "snapshot", "extract", "prices", "stream", "page", "web", "warmup", "breaker", "metrics",
+              "routes", "aio")
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
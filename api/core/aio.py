@@ -0,0 +1,212 @@
+"""
+asyncio ilkelleri (ASGI giriş noktası için): httpx istemcisi, geçmişin bloklamadan
+indirilmesi, canlı fiyat önbelleği ve SSE poller'ı. Önbellekler, devre kesiciler ve
+kurallar senkron modüllerle (history, prices, stream) ortaktır; burada yalnızca
+bekleme biçimi değişir.
+"""
+import asyncio
+import threading
+import time
+
+import httpx
+
+from . import history, prices, stream
+from .net import HTTP_COMPRESSION, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, record_http_request
+
+# Tek bir istemci: bağlantı havuzu tüm istekler arasında paylaşılır
+http_client = httpx.AsyncClient(
+    headers={'Accept-Encoding': 'gzip, deflate' if HTTP_COMPRESSION else 'identity'},
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    follow_redirects=True
+)
+
+async def http_get(url, headers=None, read_timeout=None):
+    """net.http_get'in async karşılığı; aynı host sayaçlarına yazar"""
+    started = time.perf_counter()
+    failed = False
+    try:
+        return await http_client.get(url, headers=headers,
+                                     timeout=httpx.Timeout(read_timeout or HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT))
+    except:
+        failed = True
+        raise
+    finally:
+        record_http_request(url, time.perf_counter() - started, failed)
+
+# Loop görevlere yalnızca zayıf referans tutar; bitene kadar burada saklanır
+_background_tasks = set()
+
+def spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+# Geçmiş: history önbelleği kullanılır, indirme event loop'u bloklamaz.
+# Yenileme history._history_inflight üzerinden sahiplenilir; böylece thread'de
+# çalışan load_price_history ikinci bir (requests ile) indirme başlatmaz.
+_history_task = None
+
+async def _fetch_history(event):
+    try:
+        if history.is_local_source() or history.HISTORY_FORMAT == 'jsonl':
+            # Yerel dosya veya birden çok parçalı jsonl deposu: senkron yol, thread'de
+            await asyncio.to_thread(history._fetch_price_history)
+            return
+        url, headers = history.history_request()
+        started = time.perf_counter()
+        response = await http_get(url, headers=headers, read_timeout=10)
+        # Büyük JSON'u çözmek CPU işi, loop dışında yapılır
+        await asyncio.to_thread(history.apply_history_response, response.status_code,
+                                response.content, response.headers.get('ETag'), time.perf_counter() - started)
+    except:
+        history.history_fetch_failed()
+    finally:
+        with history._history_lock:
+            history._history_inflight = None
+        event.set()
+
+async def ensure_history():
+    """history.load_price_history ile aynı kurallar: bellek, sonra disk; elde veri
+    varsa yenileme arka planda, yoksa tek bir indirme beklenir"""
+    global _history_task
+    cache = history._history_cache
+    if cache["data"] is None:
+        await asyncio.to_thread(history.load_disk_copy)
+    if cache["data"] is not None and time.time() - cache["fetched_at"] < history.HISTORY_TTL:
+        return
+    if history.recently_failed():
+        return
+    with history._history_lock:
+        event = history._history_inflight
+        if event is None:
+            event = history._history_inflight = threading.Event()
+            history.history_cache_stats["misses" if cache["data"] is None else "refreshes"] += 1
+            _history_task = spawn(_fetch_history(event))
+            task = _history_task
+        else:
+            task = _history_task if _history_task is not None and not _history_task.done() else None
+            history.history_cache_stats["coalesced" if cache["data"] is None else "stale"] += 1
+    if cache["data"] is None:
+        if task is not None:
+            await asyncio.shield(task)
+        else:
+            # Yenilemeyi bir thread (ör. ısınma) sahiplenmiş
+            await asyncio.to_thread(event.wait, 15)
+
+async def run_with_history(fn, *args):
+    """Geçmiş hazırken snapshot/tablo işini (ör. core.routes) thread'de çalıştırır"""
+    await ensure_history()
+    return await asyncio.to_thread(fn, *args)
+
+# Canlı fiyatlar: prices._price_cache üzerinde stale-while-revalidate
+_price_tasks = {}
+
+async def fetch_price(source):
+    url, headers, read_timeout = prices.begin_fetch(source)
+    started = time.perf_counter()
+    try:
+        response = await http_get(url, headers=headers, read_timeout=read_timeout)
+        response.raise_for_status()
+    except:
+        prices.fetch_failed(source)
+        raise
+    return prices.finish_fetch(source, response.content, time.perf_counter() - started)
+
+async def _refresh_price(source):
+    try:
+        value = await fetch_price(source)
+    except:
+        prices.price_cache_stats[source]["errors"] += 1
+        raise
+    return prices.store_price(source, value)
+
+def _refresh_task(source):
+    """Kaynak başına aynı anda tek yenileme"""
+    task = _price_tasks.get(source)
+    if task is None or task.done():
+        task = spawn(_refresh_price(source))
+        # Kimse beklemiyorsa hata "never retrieved" uyarısı üretmesin
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        _price_tasks[source] = task
+    return task
+
+async def get_cached_price(source):
+    """(değer, fetched_at) döndürür - prices.get_cached_price ile aynı kurallar"""
+    entry, stale = prices.cached_entry(source)
+    if entry:
+        task = _price_tasks.get(source)
+        if stale and (task is None or task.done()):
+            prices.price_cache_stats[source]["refreshes"] += 1
+            _refresh_task(source)
+        return entry["value"], entry["fetched_at"]
+
+    try:
+        entry = await asyncio.shield(_refresh_task(source))
+    except Exception:
+        entry = prices.last_known_good(source)
+        if entry is None:
+            raise
+    return entry["value"], entry["fetched_at"]
+
+async def fetch_all_prices(sources=None, deadline=prices.FETCH_DEADLINE):
+    sources = sources or list(prices.PRICE_SOURCES)
+    tasks = {source: asyncio.ensure_future(get_cached_price(source)) for source in sources}
+    done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        # Yenileme görevi shield ile korunur, arka planda bitince önbelleği doldurur
+        task.cancel()
+    return prices.collect_results(tasks, done)
+
+async def get_dashboard_snapshot(deadline=prices.FETCH_DEADLINE):
+    """prices.get_dashboard_snapshot'ın async karşılığı"""
+    from .snapshot import get_table_data
+    started = time.time()
+    table_task = asyncio.ensure_future(run_with_history(get_table_data))
+    results = await fetch_all_prices(deadline=deadline)
+    snapshot = {source: prices.price_payload(source, result) for source, result in results.items()}
+    # Fiyatlarla aynı süre sınırı; tablo işi paylaşılan snapshot'ı ısıtmak için sürer
+    done, _ = await asyncio.wait([table_task], timeout=max(deadline - (time.time() - started), 0))
+    snapshot["table"] = prices.table_section(table_task, done)
+    return snapshot
+
+# SSE: tek poller task'ı, istemci başına sınırlı asyncio.Queue; son durum
+# stream modülündeki thread poller'ıyla aynı kurallarla tutulur
+stream_clients = set()
+_stream_task = None
+
+async def _stream_poller():
+    global _stream_task
+    try:
+        while stream_clients:
+            try:
+                snapshot = await get_dashboard_snapshot()
+            except:
+                snapshot = {}
+            changed = stream.apply_snapshot(snapshot)
+            if changed:
+                event = stream.format_sse('delta', changed)
+                for client in list(stream_clients):
+                    try:
+                        client.put_nowait(event)
+                    except asyncio.QueueFull:
+                        # Geride kalan istemciyi kapat; yeniden bağlanınca tam durum alır
+                        stream_clients.discard(client)
+                        while not client.empty():
+                            client.get_nowait()
+                        client.put_nowait(stream.STREAM_CLOSE)
+            await asyncio.sleep(stream.STREAM_INTERVAL)
+    finally:
+        _stream_task = None
+
+def subscribe_stream():
+    global _stream_task
+    client = asyncio.Queue(maxsize=32)
+    stream_clients.add(client)
+    if _stream_task is None:
+        _stream_task = spawn(_stream_poller())
+    return client
+
+async def initial_state():
+    """Yeni istemciye gönderilecek tam durum"""
+    return dict(stream._stream_state) or stream.seed_state(await get_dashboard_snapshot())
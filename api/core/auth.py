@@ -0,0 +1,57 @@
+"""
+Portföy ayarı ve oturum doğrulama
+"""
+import os
+import json
+import hashlib
+import hmac
+import threading
+import time
+
+# Portföy ayarı bellekte tutulur; dosya mtime'ı değişince yeniden okunur.
+# mtime en fazla PORTFOLIO_CONFIG_CHECK saniyede bir kontrol edilir.
+PORTFOLIO_CONFIG_PATH = os.environ.get('PORTFOLIO_CONFIG_PATH', 'portfolio-config.json')
+PORTFOLIO_CONFIG_CHECK = float(os.environ.get('PORTFOLIO_CONFIG_CHECK', 5))
+DEFAULT_PORTFOLIO_CONFIG = {"gold_amount": 0, "silver_amount": 0, "password_hash": ""}
+
+_portfolio_lock = threading.Lock()
+_portfolio = {"mtime": None, "checked_at": float("-inf"), "config": DEFAULT_PORTFOLIO_CONFIG, "token": b""}
+
+def _reload_portfolio_config():
+    try:
+        mtime = os.stat(PORTFOLIO_CONFIG_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime == _portfolio["mtime"]:
+        return
+    try:
+        with open(PORTFOLIO_CONFIG_PATH, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except:
+        config = DEFAULT_PORTFOLIO_CONFIG
+    _portfolio.update(mtime=mtime, config=config,
+                      token=str(config.get("password_hash", "")).lower().encode())
+
+def load_portfolio_config():
+    now = time.monotonic()
+    if now - _portfolio["checked_at"] >= PORTFOLIO_CONFIG_CHECK:
+        with _portfolio_lock:
+            if now - _portfolio["checked_at"] >= PORTFOLIO_CONFIG_CHECK:
+                _reload_portfolio_config()
+                _portfolio["checked_at"] = now
+    return _portfolio["config"]
+
+def verify_token(token):
+    """Sabit zamanlı karşılaştırma; şifre tanımlı değilse hiçbir token geçmez"""
+    load_portfolio_config()
+    expected = _portfolio["token"]
+    try:
+        return bool(expected) and hmac.compare_digest(str(token).encode(), expected)
+    except:
+        return False
+
+def verify_password(password):
+    try:
+        return verify_token(hashlib.sha256(password.encode()).hexdigest())
+    except:
+        return False
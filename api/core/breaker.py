@@ -0,0 +1,98 @@
+"""
+Kaynak başına devre kesici ve gözlenen gecikmeden uyarlanan zaman aşımı
+"""
+import os
+import threading
+import time
+from collections import deque
+
+# Art arda bu kadar hata devreyi açar; açık devre COOLDOWN sonunda tek bir deneme
+# isteğine izin verir (half_open), başarılıysa kapanır, değilse yeniden açılır
+BREAKER_THRESHOLD = int(os.environ.get('BREAKER_THRESHOLD', 3))
+BREAKER_COOLDOWN = float(os.environ.get('BREAKER_COOLDOWN', 30))
+# Okuma zaman aşımı = p95 gecikme x FACTOR, [MIN, MAX] aralığında
+SCRAPE_TIMEOUT_MIN = float(os.environ.get('SCRAPE_TIMEOUT_MIN', 2))
+SCRAPE_TIMEOUT_MAX = float(os.environ.get('SCRAPE_TIMEOUT_MAX', 15))
+SCRAPE_TIMEOUT_FACTOR = float(os.environ.get('SCRAPE_TIMEOUT_FACTOR', 3))
+LATENCY_WINDOW = 50
+LATENCY_MIN_SAMPLES = 5
+
+class CircuitOpen(Exception):
+    pass
+
+class CircuitBreaker:
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opens": 0}
+
+    def allow(self):
+        """İstek yapılabilir mi; half_open durumunda yalnızca tek deneme geçer"""
+        with self.lock:
+            if self.state == "open" and time.time() - self.opened_at >= BREAKER_COOLDOWN:
+                self.state = "half_open"
+                self.probing = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def check(self):
+        if not self.allow():
+            raise CircuitOpen(f"{self.name} circuit open, retry in {self.retry_in()}s")
+
+    def record_success(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+            self.stats["successes"] += 1
+            self.failures = 0
+            self.state = "closed"
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.stats["failures"] += 1
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= BREAKER_THRESHOLD:
+                if self.state != "open":
+                    self.stats["opens"] += 1
+                self.state = "open"
+                self.opened_at = time.time()
+            self.probing = False
+
+    def percentile(self, q):
+        samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(int(len(samples) * q), len(samples) - 1)]
+
+    def timeout(self):
+        """Yeterli örnek yoksa üst sınır; varsa p95'ten türetilen okuma zaman aşımı"""
+        if len(self.latencies) < LATENCY_MIN_SAMPLES:
+            return SCRAPE_TIMEOUT_MAX
+        return min(max(self.percentile(0.95) * SCRAPE_TIMEOUT_FACTOR, SCRAPE_TIMEOUT_MIN), SCRAPE_TIMEOUT_MAX)
+
+    def retry_in(self):
+        if self.state != "open":
+            return 0
+        return round(max(BREAKER_COOLDOWN - (time.time() - self.opened_at), 0), 1)
+
+    def status(self):
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": self.retry_in(),
+            "timeout": round(self.timeout(), 2),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            **self.stats
+        }
@@ -0,0 +1,129 @@
+"""
+Fiyat sayfalarından değer çıkarma: hızlı bayt tarayıcı, gerekirse BeautifulSoup
+"""
+import os
+import re
+import html as html_lib
+
+# HTML çıkarıcılar: hızlı yol tüm sayfayı ağaca çevirmeden yalnızca hedef span'ı
+# bulur, bulamazsa BeautifulSoup'a düşülür. HTML_EXTRACTOR=bs4 hızlı yolu kapatır.
+HTML_EXTRACTOR = os.environ.get('HTML_EXTRACTOR', 'fast')
+extractor_stats = {"fast": 0, "fallback": 0}
+
+_TAG_RE = re.compile(rb'<[^>]*>')
+_SPAN_OPEN_RE = re.compile(rb'<span\b[^>]*>', re.I)
+_SPAN_CLOSE = b'</span'
+
+def _span_text(content, open_end):
+    """Açılış etiketinden sonraki metni get_text(strip=True) gibi döndürür"""
+    close = content.find(_SPAN_CLOSE, open_end)
+    if close == -1:
+        return None
+    inner = content[open_end:close]
+    # İç içe span varsa ilk kapanış yanlış olabilir; o durumda yavaş yola bırak
+    if _SPAN_OPEN_RE.search(inner):
+        return None
+    pieces = (html_lib.unescape(piece.decode('utf-8', 'replace')).strip() for piece in _TAG_RE.split(inner))
+    return ''.join(pieces)
+
+def _has_attr(tag, name, value):
+    return re.search(rb'\s' + name + rb'\s*=\s*["\']' + re.escape(value) + rb'["\']', tag) is not None
+
+def _has_class(tag, class_name):
+    return re.search(rb'\sclass\s*=\s*["\'](?:[^"\']*\s)?' + re.escape(class_name) + rb'(?=[\s"\'])', tag) is not None
+
+def fast_socket_price(content, socket_key, socket_attr='bid'):
+    """doviz.com: data-socket-key/data-socket-attr eşleşen ilk span'ın metni"""
+    key = socket_key.encode()
+    attr = socket_attr.encode()
+    pos = content.find(key)
+    while pos != -1:
+        tag_start = content.rfind(b'<', 0, pos)
+        tag_end = content.find(b'>', pos)
+        if tag_start != -1 and tag_end != -1:
+            tag = content[tag_start:tag_end + 1]
+            if (tag[:5].lower() == b'<span' and _has_attr(tag, b'data-socket-key', key)
+                    and _has_attr(tag, b'data-socket-attr', attr)):
+                return _span_text(content, tag_end + 1)
+        pos = content.find(key, pos + len(key))
+    return None
+
+def _fast_class_span(content, class_name):
+    """Verilen class'a sahip ilk span etiketinin (başlangıç, bitiş) konumu"""
+    needle = class_name.encode()
+    pos = content.find(needle)
+    while pos != -1:
+        tag_start = content.rfind(b'<', 0, pos)
+        tag_end = content.find(b'>', pos)
+        if tag_start != -1 and tag_end != -1:
+            tag = content[tag_start:tag_end + 1]
+            if tag[:5].lower() == b'<span' and _has_class(tag, needle):
+                return tag_start, tag_end + 1
+        pos = content.find(needle, pos + len(needle))
+    return None
+
+def fast_bloomberg_quote(content):
+    """bloomberght.com: lastPrice, yön oku ve percentChange; fiyat yoksa None"""
+    price_span = _fast_class_span(content, 'lastPrice')
+    price = _span_text(content, price_span[1]) if price_span else None
+    if price is None:
+        return None
+    direction = "neutral"
+    if _fast_class_span(content, 'bloomberght-icon-font-icon-graphic-up'):
+        direction = "up"
+    elif _fast_class_span(content, 'bloomberght-icon-font-icon-graphic-down'):
+        direction = "down"
+    percent_span = _fast_class_span(content, 'percentChange')
+    percent = _span_text(content, percent_span[1]) if percent_span else None
+    return {"price": price, "direction": direction, "change_percent": percent}
+
+def bs4_socket_price(content, socket_key, socket_attr='bid'):
+    from bs4 import BeautifulSoup  # yalnızca yedek yolda yüklenir
+    soup = BeautifulSoup(content, 'html.parser')
+    price_element = soup.find('span', {'data-socket-key': socket_key, 'data-socket-attr': socket_attr})
+    if price_element:
+        return price_element.get_text(strip=True)
+    return None
+
+def bs4_bloomberg_quote(content):
+    from bs4 import BeautifulSoup  # yalnızca yedek yolda yüklenir
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # Fiyat
+    price_element = soup.find('span', class_='lastPrice')
+    price = price_element.get_text(strip=True) if price_element else None
+    
+    # Yön (ok)
+    direction = "neutral"
+    if soup.find('span', class_='bloomberght-icon-font-icon-graphic-up'):
+        direction = "up"
+    elif soup.find('span', class_='bloomberght-icon-font-icon-graphic-down'):
+        direction = "down"
+    
+    # Değişim oranı
+    percent_element = soup.find('span', class_='percentChange')
+    percent = percent_element.get_text(strip=True) if percent_element else None
+    
+    return {
+        "price": price,
+        "direction": direction,
+        "change_percent": percent
+    }
+
+def extract_socket_price(content, socket_key, socket_attr='bid'):
+    if HTML_EXTRACTOR == 'fast':
+        value = fast_socket_price(content, socket_key, socket_attr)
+        if value is not None:
+            extractor_stats["fast"] += 1
+            return value
+    extractor_stats["fallback"] += 1
+    return bs4_socket_price(content, socket_key, socket_attr)
+
+def extract_bloomberg_quote(content):
+    if HTML_EXTRACTOR == 'fast':
+        quote = fast_bloomberg_quote(content)
+        if quote is not None:
+            extractor_stats["fast"] += 1
+            return quote
+    extractor_stats["fallback"] += 1
+    return bs4_bloomberg_quote(content)
@@ -0,0 +1,495 @@
+"""
+Fiyat geçmişi: önbellekli indirme (bellek + disk) ve PHB1 ikili okuyucu
+"""
+import os
+import json
+import gzip
+import hashlib
+import struct
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from collections import namedtuple
+from types import MappingProxyType
+
+from . import metrics
+from .net import http_get
+
+# Kaynak bir URL veya yerel dosya yolu (file://...) olabilir; yerel kaynakta ağ kullanılmaz
+HISTORY_URL = os.environ.get('HISTORY_URL', "https://raw.githubusercontent.com/drkgreen/altin-gumus-tracker/main/data/price-history.json")
+HISTORY_BINARY_URL = os.environ.get('HISTORY_BINARY_URL', "https://raw.githubusercontent.com/drkgreen/altin-gumus-tracker/main/data/price-history.bin")
+HISTORY_JSONL_URL = os.environ.get('HISTORY_JSONL_URL', "https://raw.githubusercontent.com/drkgreen/altin-gumus-tracker/main/data/history")
+# jsonl: bot'un append-only deposunu oku (manifest + aylık segmentler); değişmeyen
+# segmentler yeniden indirilmez, bir toplamadan sonra yalnızca manifest, o ayın
+# segmenti ve (peak değiştiyse) o ayın peak dosyası gelir. Depo henüz yoksa (manifest 404) kanonik JSON'a düşer.
+# json: data/price-history.json'u indir ve tamamını çöz
+# binary: bot'un ürettiği PHB1 kopyasını indir, yalnızca gereken günleri/peak satırlarını çöz
+# Bot HISTORY_BACKEND=jsonl ile çalışırken (workflow varsayılanı) bu iki kopya yalnızca
+# gece --export ile üretilir, yani gün içindeki toplamaları içermez: json/binary bu
+# durumda desteklenmez, yalnızca HISTORY_BACKEND=json bot'uyla (her toplamada yazar) kullanılmalı.
+HISTORY_FORMAT = os.environ.get('HISTORY_FORMAT', 'jsonl')
+# OHLC katmanlarının dizini (hourly/daily/monthly.jsonl, satır başına bir kova; aynı
+# anahtarın son satırı geçerli). Boşsa HISTORY_JSONL_URL/rollups. Saatlik katman
+# /api/history?resolution=hourly için, günlük/aylık katmanlar tablolar ve
+# daily/monthly aralıkları için indirilir.
+HISTORY_ROLLUPS_URL = os.environ.get('HISTORY_ROLLUPS_URL', '')
+ROLLUP_TIERS = ("hourly", "daily", "monthly")
+# Bot her 15 dakikada bir veri topluyor, daha sık indirmenin anlamı yok
+HISTORY_TTL = int(os.environ.get('HISTORY_TTL', 900))
+HISTORY_RETRY_AFTER = int(os.environ.get('HISTORY_RETRY_AFTER', 60))
+# İkinci seviye: son başarılı indirmenin diskteki kopyası + sürüm bilgisi. Yeniden
+# başlatmada veya kaynak erişilemezken hemen buradan servis edilir. 'off' kapatır.
+HISTORY_CACHE_DIR = os.environ.get('HISTORY_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'metal-tracker'))
+
+_history_lock = threading.Lock()
+_history_inflight = None
+_history_cache = {"data": None, "etag": None, "fetched_at": 0.0, "version": 0, "failed_at": 0.0}
+history_cache_stats = {"hits": 0, "misses": 0, "refreshes": 0, "not_modified": 0, "coalesced": 0,
+                       "stale": 0, "disk_loads": 0, "errors": 0}
+
+def history_source():
+    if HISTORY_FORMAT == 'jsonl':
+        return f"{HISTORY_JSONL_URL.rstrip('/')}/manifest.json"
+    return HISTORY_BINARY_URL if HISTORY_FORMAT == 'binary' else HISTORY_URL
+
+def _local_path(source):
+    if source.startswith('file://'):
+        return source[len('file://'):]
+    return None if '://' in source else source
+
+def is_local_source():
+    return _local_path(history_source()) is not None
+
+def _read_local_history(path, etag):
+    """(status, içerik, ETag) - mtime değişmediyse 304 gibi davranır"""
+    current = f'"mtime-{os.stat(path).st_mtime_ns}"'
+    if etag == current:
+        return 304, b'', current
+    with open(path, 'rb') as f:
+        return 200, f.read(), current
+
+def _fetch_source(url, etag=None):
+    """(status, içerik, ETag) - yerel dosya veya koşullu HTTP GET"""
+    path = _local_path(url)
+    if path is not None:
+        if not os.path.exists(path):
+            return 404, b'', None
+        return _read_local_history(path, etag)
+    response = http_get(url, headers={'If-None-Match': etag} if etag else {}, read_timeout=10)
+    return response.status_code, response.content, response.headers.get('ETag')
+
+def _disk_paths():
+    name = {'binary': 'price-history.bin', 'jsonl': 'price-history-jsonl.json'}.get(HISTORY_FORMAT, 'price-history.json')
+    return os.path.join(HISTORY_CACHE_DIR, name), os.path.join(HISTORY_CACHE_DIR, name + '.meta.json')
+
+def _disk_enabled():
+    return HISTORY_CACHE_DIR != 'off' and not is_local_source()
+
+def _write_atomic(path, content):
+    # Eşzamanlı yazıcılar (thread/süreç) aynı geçici dosyayı paylaşmasın
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except:
+        try:
+            os.unlink(tmp_path)
+        except:
+            pass
+        raise
+
+def _save_disk_meta(meta_path, etag, fetched_at):
+    meta = {"source": history_source(), "etag": etag, "fetched_at": fetched_at}
+    _write_atomic(meta_path, json.dumps(meta).encode())
+
+def save_disk_copy(content, etag):
+    """Önce veri, sonra meta yazılır; yarıda kalırsa meta eski ETag'i taşır ve
+    sonraki doğrulama tam indirmeye döner"""
+    if not _disk_enabled():
+        return
+    try:
+        os.makedirs(HISTORY_CACHE_DIR, exist_ok=True)
+        data_path, meta_path = _disk_paths()
+        if content is not None:
+            _write_atomic(data_path, content)
+        elif not os.path.exists(data_path):
+            return
+        _save_disk_meta(meta_path, etag, time.time())
+    except:
+        pass
+
+def load_disk_copy():
+    """Bellek boşsa diskteki kopyayı yükler; bellekte veri varsa True"""
+    if not _disk_enabled():
+        return False
+    data_path, meta_path = _disk_paths()
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("source") != history_source():
+            return False
+        with open(data_path, 'rb') as f:
+            content = f.read()
+        data = parse_binary_history(content) if HISTORY_FORMAT == 'binary' else json.loads(content)
+    except:
+        return False
+    with _history_lock:
+        if _history_cache["data"] is None:
+            _history_cache.update(data=data, etag=meta.get("etag"), fetched_at=meta.get("fetched_at", 0.0),
+                                  version=_history_cache["version"] + 1)
+            history_cache_stats["disk_loads"] += 1
+    return True
+
+def apply_history_response(status_code, content, etag, elapsed=None):
+    """İndirilen geçmişi önbelleğe ve diske yazar (304 ise yalnızca tazeler)"""
+    if elapsed is not None:
+        metrics.history_download_duration.observe(elapsed, str(status_code))
+    if status_code == 304:
+        with _history_lock:
+            history_cache_stats["not_modified"] += 1
+            _history_cache["fetched_at"] = time.time()
+        save_disk_copy(None, etag or _history_cache["etag"])
+        return
+    if status_code == 200:
+        metrics.history_download_bytes.observe(len(content))
+        with metrics.history_parse_duration.time(HISTORY_FORMAT):
+            data = parse_binary_history(content) if HISTORY_FORMAT == 'binary' else json.loads(content)
+        _store_history(data, content, etag)
+        return
+    raise Exception(f"HTTP {status_code}")
+
+def _store_history(data, content, etag):
+    with _history_lock:
+        _history_cache["data"] = data
+        _history_cache["etag"] = etag
+        _history_cache["fetched_at"] = time.time()
+        _history_cache["version"] += 1
+    save_disk_copy(content, etag)
+
+# jsonl deposu: ay -> ((kayıt sayısı, bayt), kayıtlar) ve ay -> (özet, peak indeksi).
+# Manifest'teki sayaçlar/özet değişmediyse segment veya peak dosyası yeniden
+# indirilmez. Yalnızca tekil yenileme kullanır.
+_segment_cache = {}
+_peaks_cache = {}
+# Manifest 404 iken indirilen kanonik JSON'un ETag'i. _history_cache["etag"] yalnızca
+# manifest'in doğrulayıcısıdır; ikisi karışırsa manifest'e yabancı bir ETag gönderilir.
+_fallback_etag = None
+
+def _jsonl_peaks(manifest, base):
+    """Ayların peak dosyalarını (peaks/YYYY-MM.json) birleştirir; özeti değişmeyen ay
+    önbellekten gelir. Özet tutmayan gövde (eski CDN kopyası) kullanılır ama saklanmaz.
+    (peaks, indirilen bayt) döner."""
+    if "peaks" in manifest:
+        # Peak indeksini içinde taşıyan eski manifest biçimi
+        return manifest["peaks"], 0
+    peaks = {"daily": {}, "monthly": {}}
+    downloaded = 0
+    for month, segment in sorted(manifest["segments"].items()):
+        digest = segment.get("peaks")
+        if digest is None:
+            continue
+        cached = _peaks_cache.get(month)
+        if cached is None or cached[0] != digest:
+            status_code, content, _ = _fetch_source(f"{base}/peaks/{month}.json")
+            if status_code != 200:
+                raise Exception(f"peaks/{month}.json: HTTP {status_code}")
+            downloaded += len(content)
+            cached = (digest, json.loads(content))
+            if hashlib.sha1(content).hexdigest()[:len(digest)] == digest:
+                _peaks_cache[month] = cached
+        peaks["daily"].update(cached[1]["daily"])
+        peaks["monthly"].update(cached[1]["monthly"])
+    for month in set(_peaks_cache) - set(manifest["segments"]):
+        del _peaks_cache[month]
+    return peaks, downloaded
+
+def _with_peak_flags(record, peaks):
+    """scripts/history_store.apply_peak_flags ile aynı kural; önbellekteki satır değişmez"""
+    date = record.get("date", "")
+    daily = peaks["daily"].get(date)
+    monthly = peaks["monthly"].get(date[:7])
+    return {**record,
+            "daily_peak": bool(daily and daily["timestamp"] == record.get("timestamp")),
+            "monthly_peak": bool(monthly and monthly["date"] == date
+                                 and monthly["timestamp"] == record.get("timestamp"))}
+
+def _fetch_jsonl_history(etag):
+    """Manifest'i koşullu indirir, değişen segmentleri tamamlar ve eski
+    {"records": [...]} belgesini kurar"""
+    global _fallback_etag
+    started = time.perf_counter()
+    status_code, content, etag = _fetch_source(history_source(), etag)
+    if status_code == 404:
+        # Depo henüz yayınlanmamış: kanonik JSON, kendi ETag'iyle koşullu
+        fallback_etag = _fallback_etag if _history_cache["data"] is not None else None
+        status_code, content, fallback_etag = _fetch_source(HISTORY_URL, fallback_etag)
+        if status_code == 304:
+            apply_history_response(304, b'', None)
+            return
+        if status_code != 200:
+            raise Exception(f"HTTP {status_code}")
+        metrics.history_download_bytes.observe(len(content))
+        _store_history(json.loads(content), content, None)
+        _fallback_etag = fallback_etag
+        return
+    if status_code != 200:
+        apply_history_response(status_code, content, etag, time.perf_counter() - started)
+        return
+    manifest = json.loads(content)
+    downloaded = len(content)
+    base = HISTORY_JSONL_URL.rstrip('/')
+    segments = {}
+    for month, segment in manifest["segments"].items():
+        key = (segment["records"], segment["bytes"])
+        cached = _segment_cache.get(month)
+        if cached is not None and cached[0] == key:
+            segments[month] = cached[1]
+            continue
+        segment_status, segment_content, _ = _fetch_source(f"{base}/{month}.jsonl")
+        if segment_status != 200:
+            raise Exception(f"{month}.jsonl: HTTP {segment_status}")
+        downloaded += len(segment_content)
+        segments[month] = [json.loads(line) for line in segment_content.splitlines() if line.strip()]
+        # Boyu manifest'le uyuşmayan gövde (yarım yazılmış veya manifest'ten yeni
+        # segment) bu seferlik kullanılır ama saklanmaz; sonraki yenileme tekrar indirir
+        if len(segment_content) == segment["bytes"]:
+            _segment_cache[month] = (key, segments[month])
+        else:
+            _segment_cache.pop(month, None)
+    for month in set(_segment_cache) - set(manifest["segments"]):
+        del _segment_cache[month]
+    peaks, peak_bytes = _jsonl_peaks(manifest, base)
+    downloaded += peak_bytes
+
+    metrics.history_download_duration.observe(time.perf_counter() - started, '200')
+    metrics.history_download_bytes.observe(downloaded)
+    with metrics.history_parse_duration.time(HISTORY_FORMAT):
+        records = [_with_peak_flags(r, peaks) for month in sorted(segments) for r in segments[month]]
+        data = {"records": records, **manifest["meta"], "total_records": len(records)}
+    _store_history(data, json.dumps(data, ensure_ascii=False).encode('utf-8') if _disk_enabled() else None, etag)
+    _fallback_etag = None
+
+def history_fetch_failed():
+    with _history_lock:
+        history_cache_stats["errors"] += 1
+        # Eldeki veriyle devam et, kaynağı her istekte yeniden zorlamayalım
+        if _history_cache["data"] is not None:
+            _history_cache["fetched_at"] = time.time() - HISTORY_TTL + HISTORY_RETRY_AFTER
+        else:
+            _history_cache["failed_at"] = time.time()
+
+def history_request():
+    """(url, koşullu istek başlıkları)"""
+    headers = {}
+    if _history_cache["etag"] and _history_cache["data"] is not None:
+        headers['If-None-Match'] = _history_cache["etag"]
+    return history_source(), headers
+
+def recently_failed():
+    """Hiç veri yokken kaynak az önce başarısız olduysa her istek zaman aşımını beklemesin"""
+    return _history_cache["data"] is None and time.time() - _history_cache["failed_at"] < HISTORY_RETRY_AFTER
+
+def _fetch_price_history():
+    """Geçmişi indirir (veya yerel dosyadan okur), ETag varsa koşullu istek atar"""
+    try:
+        url, headers = history_request()
+        if HISTORY_FORMAT == 'jsonl':
+            _fetch_jsonl_history(headers.get('If-None-Match'))
+            return
+        path = _local_path(url)
+        started = time.perf_counter()
+        if path is not None:
+            status_code, content, etag = _read_local_history(path, headers.get('If-None-Match'))
+        else:
+            response = http_get(url, headers=headers, read_timeout=10)
+            status_code, content, etag = response.status_code, response.content, response.headers.get('ETag')
+        apply_history_response(status_code, content, etag, time.perf_counter() - started)
+    except:
+        history_fetch_failed()
+
+def _refresh_history(event):
+    global _history_inflight
+    try:
+        _fetch_price_history()
+    finally:
+        with _history_lock:
+            _history_inflight = None
+        event.set()
+
+def load_price_history():
+    """İki seviyeli önbellekli geçmiş: bellek, sonra disk. TTL dolunca tek bir yenileme
+    yapılır; elde (bellekte veya diskte) veri varsa beklenmeden o döner, yenileme arka
+    planda sürer. Hiç veri yoksa ilk istek indirir, diğerleri onu bekler.
+    Dönen nesne paylaşımlıdır, değiştirilmemelidir. HISTORY_FORMAT=binary iken
+    BinaryHistory döner; kayıt listesi için history_records() kullanılmalı."""
+    return load_versioned_history()[0]
+
+def load_versioned_history():
+    """(veri, sürüm) - load_price_history ile aynı kurallar; sürüm veriyle aynı kilit
+    altında okunur, arka plandaki bir yenileme ikisini birbirinden ayıramaz"""
+    global _history_inflight
+    if _history_cache["data"] is None:
+        load_disk_copy()
+    with _history_lock:
+        data, version = _history_cache["data"], _history_cache["version"]
+        if data is not None and time.time() - _history_cache["fetched_at"] < HISTORY_TTL:
+            history_cache_stats["hits"] += 1
+            return data, version
+        if recently_failed():
+            return {"records": []}, version
+        event = _history_inflight
+        leader = event is None
+        if leader:
+            event = _history_inflight = threading.Event()
+            history_cache_stats["misses" if data is None else "refreshes"] += 1
+        elif data is None:
+            history_cache_stats["coalesced"] += 1
+        else:
+            history_cache_stats["stale"] += 1
+
+    if data is not None:
+        if leader:
+            threading.Thread(target=_refresh_history, args=(event,), name='history-refresh', daemon=True).start()
+        return data, version
+    if leader:
+        _refresh_history(event)
+    else:
+        event.wait(timeout=15)
+
+    with _history_lock:
+        return _history_cache["data"] or {"records": []}, _history_cache["version"]
+
+def history_tag(version):
+    """Verilen sürümün etiketi: önbellek hâlâ o sürümdeyse kaynağın ETag'i, değilse
+    sürümün kendisi (yeni ETag eski veriyle eşleşmesin)"""
+    with _history_lock:
+        if _history_cache["version"] == version and _history_cache["etag"]:
+            return _history_cache["etag"]
+    return version
+
+def get_history_cache_stats():
+    with _history_lock:
+        return {
+            **history_cache_stats,
+            "version": _history_cache["version"],
+            "etag": _history_cache["etag"],
+            "age": round(time.time() - _history_cache["fetched_at"], 1) if _history_cache["data"] is not None else None,
+            "ttl": HISTORY_TTL,
+            "source": history_source(),
+            "disk_cache": HISTORY_CACHE_DIR if _disk_enabled() else None
+        }
+
+def rollups_source(tier):
+    base = HISTORY_ROLLUPS_URL or f"{HISTORY_JSONL_URL.rstrip('/')}/rollups"
+    return f"{base.rstrip('/')}/{tier}.jsonl"
+
+_rollups_locks = {tier: threading.Lock() for tier in ROLLUP_TIERS}
+_rollups_cache = {tier: {"data": None, "etag": None, "fetched_at": 0.0, "version": 0, "failed_at": 0.0}
+                  for tier in ROLLUP_TIERS}
+
+def load_rollup_tier(tier):
+    """(etiket, {anahtar: kova}) - geçmişle aynı TTL ve koşullu istek; hata olursa
+    eldeki kopya döner, hiç yoksa istisna yükselir. Hatadan sonra HISTORY_RETRY_AFTER
+    boyunca yeniden denenmez."""
+    with _rollups_locks[tier]:
+        cache = _rollups_cache[tier]
+        now = time.time()
+        stale = cache["data"] is None or now - cache["fetched_at"] >= HISTORY_TTL
+        if stale and now - cache["failed_at"] >= HISTORY_RETRY_AFTER:
+            try:
+                status_code, content, etag = _fetch_source(rollups_source(tier),
+                                                           cache["etag"] if cache["data"] is not None else None)
+                if status_code == 200:
+                    buckets = {}
+                    # Eklemeli dosya: aynı kovanın sonraki satırı öncekinin yerini alır
+                    for line in content.splitlines():
+                        if line.strip():
+                            bucket = json.loads(line)
+                            buckets[bucket.pop("key")] = bucket
+                    cache.update(data=MappingProxyType(buckets), etag=etag, version=cache["version"] + 1)
+                elif status_code != 304:
+                    raise Exception(f"HTTP {status_code}")
+                cache["fetched_at"] = time.time()
+            except:
+                cache["failed_at"] = time.time()
+        if cache["data"] is None:
+            raise Exception(f"{tier} rollups unavailable")
+        return cache["etag"] or f"v{cache['version']}", cache["data"]
+
+# PHB1 ikili anlık görüntü okuyucu (yazıcı: scripts/history_store.py).
+# Başlık ve gün indeksi hemen okunur, satırlar yalnızca istendiğinde çözülür.
+BINARY_MAGIC = b'PHB1'
+BINARY_HEADER = struct.Struct('<4sHHIII')
+BINARY_DAY = struct.Struct('<III')
+BINARY_PEAK = struct.Struct('<I')
+BINARY_ROW = struct.Struct('<ddddB8s3x')
+
+BinaryHistory = namedtuple('BinaryHistory', ['buffer', 'rows_offset', 'row_count', 'days', 'day_firsts', 'day_names', 'peak_rows'])
+
+def parse_binary_history(content):
+    """Gerekirse açar, başlığı ve indeksleri okur; satırlara dokunmaz"""
+    if content[:2] == b'\x1f\x8b':
+        content = gzip.decompress(content)
+    elif content[:4] == b'\x28\xb5\x2f\xfd':
+        import zstandard
+        content = zstandard.ZstdDecompressor().decompress(content)
+    magic, version, row_size, row_count, day_count, peak_count = BINARY_HEADER.unpack_from(content, 0)
+    if magic != BINARY_MAGIC or version != 1 or row_size != BINARY_ROW.size:
+        raise ValueError("Unsupported price history binary")
+    offset = BINARY_HEADER.size
+    days = {}
+    for yyyymmdd, first, count in BINARY_DAY.iter_unpack(content[offset:offset + day_count * BINARY_DAY.size]):
+        days[f"{yyyymmdd // 10000:04d}-{yyyymmdd // 100 % 100:02d}-{yyyymmdd % 100:02d}"] = (first, count)
+    offset += day_count * BINARY_DAY.size
+    peak_rows = tuple(i for (i,) in BINARY_PEAK.iter_unpack(content[offset:offset + peak_count * BINARY_PEAK.size]))
+    offset += peak_count * BINARY_PEAK.size
+    return BinaryHistory(memoryview(content), offset, row_count, MappingProxyType(days),
+                         tuple(first for first, _ in days.values()), tuple(days), peak_rows)
+
+def _binary_row_date(history, index):
+    i = bisect_right(history.day_firsts, index) - 1
+    return history.day_names[i] if i >= 0 else ""
+
+def decode_binary_rows(history, start, stop, date=None):
+    """[start, stop) satırlarını eski kayıt sözlüklerine çevirir"""
+    buffer = history.buffer[history.rows_offset + start * BINARY_ROW.size:history.rows_offset + stop * BINARY_ROW.size]
+    records = []
+    for i, (timestamp, gold, silver, portfolio, flags, time_label) in enumerate(BINARY_ROW.iter_unpack(buffer)):
+        records.append({
+            "timestamp": timestamp,
+            "date": date or _binary_row_date(history, start + i),
+            "time": time_label.rstrip(b'\0').decode('ascii'),
+            "gold_price": gold,
+            "silver_price": silver,
+            "portfolio_value": portfolio,
+            "daily_peak": bool(flags & 1),
+            "monthly_peak": bool(flags & 2),
+            "optimized": bool(flags & 4)
+        })
+    return records
+
+def decode_binary_day(history, date):
+    first, count = history.days.get(date, (0, 0))
+    return decode_binary_rows(history, first, first + count, date)
+
+def history_records(history):
+    """JSON veya ikili geçmişten tam kayıt listesi (ikilide tümü çözülür)"""
+    if isinstance(history, BinaryHistory):
+        records = []
+        for date, (first, count) in history.days.items():
+            records.extend(decode_binary_rows(history, first, first + count, date))
+        return records
+    return history.get("records", [])
+
+class _BinaryRecords:
+    """İkili satırlara sıralı erişim; her öğe istendiğinde çözülür"""
+    def __init__(self, history):
+        self.history = history
+
+    def __len__(self):
+        return self.history.row_count
+
+    def __getitem__(self, i):
+        return decode_binary_rows(self.history, i, i + 1, _binary_row_date(self.history, i))[0]
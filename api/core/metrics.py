@@ -0,0 +1,192 @@
+"""
+Prometheus metin formatında metrikler (bağımlılıksız, thread-safe)
+Rota/kaynak sayaçları ve histogramlar burada toplanır; önbellek ve devre kesici
+durumları /metrics okunurken ilgili modüllerden hesaplanır.
+"""
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+        with _registry_lock:
+            _registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            items = sorted(self.values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.series = {}   # etiketler -> [kova sayıları, toplam, adet]
+        with _registry_lock:
+            _registry.append(self)
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            items = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self.series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = (('le', _number(float(bound)) if bound != float('inf') else '+Inf'),)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram, self.labels = histogram, labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+# Rotalar
+http_requests = Counter('http_requests_total', 'HTTP requests by route, method and status', ('route', 'method', 'status'))
+http_request_duration = Histogram('http_request_duration_seconds', 'HTTP request latency by route', ('route', 'method'))
+api_errors = Counter('api_errors_total', 'API responses with success=false (errors swallowed by routes)', ('route',))
+
+# Kaynaklar
+upstream_request_duration = Histogram('upstream_request_duration_seconds', 'Outbound HTTP request latency by origin', ('origin',))
+upstream_fetch_duration = Histogram('scraper_fetch_duration_seconds', 'Scraper page download time by source', ('source',))
+upstream_parse_duration = Histogram('scraper_parse_duration_seconds', 'Scraper HTML extraction time by source', ('source',),
+                                    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1))
+upstream_fetches = Counter('scraper_fetches_total', 'Scraper fetch outcomes by source', ('source', 'outcome'))
+
+# Geçmiş ve snapshot
+history_download_duration = Histogram('history_download_duration_seconds', 'Price history download time', ('status',))
+history_download_bytes = Histogram('history_download_bytes', 'Price history download size', (), buckets=SIZE_BUCKETS)
+history_parse_duration = Histogram('history_parse_duration_seconds', 'Price history parse time', ('format',))
+snapshot_build_duration = Histogram('snapshot_build_duration_seconds', 'History snapshot build time', ('format',))
+table_build_duration = Histogram('table_build_duration_seconds', 'Dashboard table build time')
+
+def _cache_lines():
+    """Önbellek ve devre kesici durumları - yalnızca yüklenmiş modüllerden"""
+    lines = []
+    history = sys.modules.get(f"{__package__}.history")
+    prices = sys.modules.get(f"{__package__}.prices")
+
+    lines += ["# HELP cache_events_total Cache lookups by cache and result", "# TYPE cache_events_total counter"]
+    ratios = []
+    if history is not None:
+        stats = dict(history.history_cache_stats)
+        for result, value in sorted(stats.items()):
+            lines.append(f'cache_events_total{{cache="history",result="{result}"}} {value}')
+        served = stats["hits"] + stats["stale"]
+        ratios.append(("history", served, served + stats["misses"] + stats["refreshes"] + stats["coalesced"]))
+    if prices is not None:
+        for source, stats in sorted(prices.price_cache_stats.items()):
+            stats = dict(stats)
+            for result, value in sorted(stats.items()):
+                lines.append(f'cache_events_total{{cache="price_{source}",result="{result}"}} {value}')
+            served = stats["fresh"] + stats["stale"]
+            ratios.append((f"price_{source}", served, served + stats["misses"]))
+
+    lines += ["# HELP cache_hit_ratio Share of lookups served from cache (fresh or stale)", "# TYPE cache_hit_ratio gauge"]
+    for cache, served, total in ratios:
+        lines.append(f'cache_hit_ratio{{cache="{cache}"}} {_number(served / total if total else 0.0)}')
+
+    if history is not None:
+        cache = history._history_cache
+        lines += ["# HELP history_age_seconds Age of the in-memory price history", "# TYPE history_age_seconds gauge"]
+        if cache["data"] is not None:
+            lines.append(f"history_age_seconds {_number(round(time.time() - cache['fetched_at'], 3))}")
+        lines += ["# HELP history_version In-process history version counter", "# TYPE history_version gauge",
+                  f"history_version {cache['version']}"]
+
+    if prices is not None:
+        lines += ["# HELP scraper_circuit_state Circuit breaker state by source (1 = current state)",
+                  "# TYPE scraper_circuit_state gauge"]
+        for source, breaker in sorted(prices.breakers.items()):
+            for state in ("closed", "half_open", "open"):
+                lines.append(f'scraper_circuit_state{{source="{source}",state="{state}"}} {int(breaker.state == state)}')
+        lines += ["# HELP scraper_timeout_seconds Current adaptive read timeout by source",
+                  "# TYPE scraper_timeout_seconds gauge"]
+        for source, breaker in sorted(prices.breakers.items()):
+            lines.append(f'scraper_timeout_seconds{{source="{source}"}} {_number(float(breaker.timeout()))}')
+    return lines
+
+def render():
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines += metric.render()
+    lines += _cache_lines()
+    return '\n'.join(lines) + '\n'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def is_error_body(body):
+    """Rotaların yuttuğu hatalar: küçük JSON gövdesinde üst düzeyde success=false veya
+    dolu error alanı. Geçersiz oturum gibi valid=false sonuçları hata sayılmaz"""
+    if len(body) >= 2048 or (b'"success":false' not in body and b'"error":' not in body):
+        return False
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return False
+    return isinstance(payload, dict) and (payload.get('success') is False or payload.get('error') is not None)
+
+def record_request(route, method, status, elapsed=None, body=None):
+    """Rota başına istek sayacı, gecikme ve yutulan hatalar (Flask ve ASGI ara katmanı
+    ortak). body yalnızca sıkıştırılmamış, akış olmayan yanıtlarda verilir."""
+    http_requests.inc(route, method, str(status))
+    if elapsed is not None:
+        http_request_duration.observe(elapsed, route, method)
+    if body is not None and is_error_body(body):
+        api_errors.inc(route)
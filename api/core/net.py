@@ -0,0 +1,84 @@
+"""
+Paylaşılan HTTP oturumu ve kaynak başına istek istatistikleri
+"""
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import metrics
+
+# Paylaşılan HTTP oturumu - aynı iki siteye her istekte DNS/TCP/TLS kurulumu yapılmasın
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 12))
+HTTP_COMPRESSION = os.environ.get('HTTP_COMPRESSION', '1') != '0'
+
+def build_http_session(retries=2, read_retries=1):
+    session = requests.Session()
+    retry = Retry(total=retries, connect=retries, read=read_retries, backoff_factor=0.3,
+                  status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET']), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = 'gzip, deflate' if HTTP_COMPRESSION else 'identity'
+    return session
+
+http_session = build_http_session()
+# Kaynak sayfalar devre kesicinin arkasında: okuma zaman aşımı yeniden denenmez ve tek
+# yeniden deneme hakkı kalır, böylece korunan bir çağrı en fazla ~2×bağlantı + okuma
+# süresi sürer ve kesici her çağrıyı gerçek süresiyle görür
+scraper_session = build_http_session(retries=1, read_retries=0)
+_http_stats_lock = threading.Lock()
+_http_stats = {}
+
+def record_http_request(url, elapsed, failed):
+    """Host bazında süre ve hata sayaçları (requests ve httpx istemcisi ortak)"""
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    elapsed_ms = elapsed * 1000
+    metrics.upstream_request_duration.observe(elapsed, origin)
+    with _http_stats_lock:
+        stats = _http_stats.setdefault(origin, {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["requests"] += 1
+        stats["errors"] += failed
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+def http_get(url, headers=None, read_timeout=None, session=None):
+    """Oturum üzerinden GET; host bazında süre ve hata sayaçlarını tutar"""
+    start = time.perf_counter()
+    failed = False
+    try:
+        return (session or http_session).get(url, headers=headers,
+                                             timeout=(HTTP_CONNECT_TIMEOUT, read_timeout or HTTP_READ_TIMEOUT))
+    except:
+        failed = True
+        raise
+    finally:
+        record_http_request(url, time.perf_counter() - start, failed)
+
+def get_http_stats():
+    """Host başına gecikme ve bağlantı yeniden kullanım oranı"""
+    result = {}
+    with _http_stats_lock:
+        items = [(origin, dict(stats)) for origin, stats in _http_stats.items()]
+    for origin, stats in items:
+        result[origin] = {
+            "requests": stats["requests"],
+            "errors": stats["errors"],
+            "avg_ms": round(stats["total_ms"] / stats["requests"], 1),
+            "max_ms": round(stats["max_ms"], 1)
+        }
+        # Bağlantı sayaçları yalnızca requests oturumlarının havuzunda var (ASGI'de httpx kullanılır)
+        for session in (http_session, scraper_session):
+            pool = session.get_adapter(origin).poolmanager.connection_from_url(origin)
+            if pool.num_requests:
+                result[origin]["new_connections"] = pool.num_connections
+                result[origin]["reused"] = max(pool.num_requests - pool.num_connections, 0)
+                break
+    return result
@@ -0,0 +1,308 @@
+"""
+Canlı fiyatlar: kaynak sayfalar, stale-while-revalidate önbellek ve paralel toplama
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+from . import metrics
+from .net import http_get, scraper_session
+from .breaker import CircuitBreaker
+from .extract import extract_bloomberg_quote, extract_socket_price
+
+# Kaynak sayfalar; taban adresler yük testi/yerel kaynak için değiştirilebilir
+DOVIZ_BASE = os.environ.get('DOVIZ_BASE', 'https://m.doviz.com')
+BLOOMBERG_BASE = os.environ.get('BLOOMBERG_BASE', 'https://www.bloomberght.com')
+MOBILE_HEADERS = {'User-Agent': 'Mozilla/5.0 (Android 10; Mobile; rv:91.0) Gecko/91.0 Firefox/91.0'}
+DESKTOP_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
+
+PRICE_PAGES = {
+    "gold": (f"{DOVIZ_BASE}/altin/yapikredi/gram-altin", MOBILE_HEADERS),
+    "silver": (f"{DOVIZ_BASE}/altin/vakifbank/gumus", MOBILE_HEADERS),
+    "gold_ounce_usd": (f"{BLOOMBERG_BASE}/altin/altin-ons", DESKTOP_HEADERS),
+    "silver_ounce_usd": (f"{BLOOMBERG_BASE}/emtia/gumus-ons", DESKTOP_HEADERS)
+}
+SOCKET_KEYS = {"gold": '6-gram-altin', "silver": '5-gumus'}
+
+def parse_price_page(source, content):
+    """Gram fiyatları metin, ons fiyatları {price, direction, change_percent} döner"""
+    if source in SOCKET_KEYS:
+        return extract_socket_price(content, SOCKET_KEYS[source]) or None
+    return extract_bloomberg_quote(content)
+
+# Kaynak başına devre kesici; açıkken istek atılmadan CircuitOpen fırlatılır
+breakers = {source: CircuitBreaker(source) for source in PRICE_PAGES}
+
+def begin_fetch(source):
+    """(url, başlıklar, okuma süresi) - devre açıksa CircuitOpen fırlatır. Senkron ve
+    async (core.aio) yol aynı kesici/metrik adımlarını kullanır."""
+    url, headers = PRICE_PAGES[source]
+    breaker = breakers[source]
+    try:
+        breaker.check()
+    except:
+        metrics.upstream_fetches.inc(source, "rejected")
+        raise
+    return url, headers, breaker.timeout()
+
+def fetch_failed(source):
+    breakers[source].record_failure()
+    metrics.upstream_fetches.inc(source, "error")
+
+def finish_fetch(source, content, elapsed):
+    """Başarılı indirmeyi kaydeder ve sayfayı ayrıştırır"""
+    breakers[source].record_success(elapsed)
+    metrics.upstream_fetch_duration.observe(elapsed, source)
+    metrics.upstream_fetches.inc(source, "ok")
+    with metrics.upstream_parse_duration.time(source):
+        return parse_price_page(source, content)
+
+def fetch_price_page(source):
+    url, headers, read_timeout = begin_fetch(source)
+    started = time.perf_counter()
+    try:
+        response = http_get(url, headers=headers, read_timeout=read_timeout, session=scraper_session)
+        response.raise_for_status()
+    except:
+        fetch_failed(source)
+        raise
+    return finish_fetch(source, response.content, time.perf_counter() - started)
+
+def get_gold_price():
+    try:
+        return fetch_price_page("gold")
+    except Exception as e:
+        raise Exception(f"Gold price error: {str(e)}")
+
+def get_silver_price():
+    try:
+        return fetch_price_page("silver")
+    except Exception as e:
+        raise Exception(f"Silver price error: {str(e)}")
+
+def get_gold_ounce_usd():
+    """Bloomberg HT'den altın ons fiyatı (USD) + yön + değişim oranı"""
+    try:
+        return fetch_price_page("gold_ounce_usd")
+    except Exception as e:
+        raise Exception(f"Gold ounce USD error: {str(e)}")
+
+def get_silver_ounce_usd():
+    """Bloomberg HT'den gümüş ons fiyatı (USD) + yön + değişim oranı"""
+    try:
+        return fetch_price_page("silver_ounce_usd")
+    except Exception as e:
+        raise Exception(f"Silver ounce USD error: {str(e)}")
+
+# Canlı fiyat önbelleği: taze penceresinde doğrudan, bayat penceresinde
+# arka planda yenilenirken eski değer döner
+PRICE_FRESH_TTL = int(os.environ.get('PRICE_FRESH_TTL', 60))
+PRICE_STALE_TTL = int(os.environ.get('PRICE_STALE_TTL', 600))
+
+PRICE_SOURCES = {
+    "gold": get_gold_price,
+    "silver": get_silver_price,
+    "gold_ounce_usd": get_gold_ounce_usd,
+    "silver_ounce_usd": get_silver_ounce_usd
+}
+
+_price_cache = {}
+price_cache_stats = {source: {"fresh": 0, "stale": 0, "misses": 0, "refreshes": 0, "errors": 0, "fallbacks": 0}
+                     for source in PRICE_SOURCES}
+
+def store_price(source, value):
+    """Yeni değeri önbelleğe yazar (boş değer yazılmaz), kaydı döner"""
+    entry = {"value": value, "fetched_at": time.time()}
+    if value:
+        _price_cache[source] = entry
+    return entry
+
+def _refresh_price(source):
+    """Kaynağı çeker ve önbelleğe yazar; hata olursa yukarı fırlatır"""
+    try:
+        value = PRICE_SOURCES[source]()
+    except:
+        price_cache_stats[source]["errors"] += 1
+        raise
+    return store_price(source, value)
+
+def cached_entry(source):
+    """(kayıt, bayat) - taze veya bayat pencerede önbellekteki kayıt; yoksa (None, False).
+    Sayaçlar burada tutulur; bayatsa çağıran arka planda yeniler."""
+    stats = price_cache_stats[source]
+    entry = _price_cache.get(source)
+    if entry:
+        age = time.time() - entry["fetched_at"]
+        if age < PRICE_FRESH_TTL:
+            stats["fresh"] += 1
+            return entry, False
+        if age < PRICE_STALE_TTL:
+            stats["stale"] += 1
+            return entry, True
+    stats["misses"] += 1
+    return None, False
+
+def last_known_good(source):
+    """Kaynak çökük veya devre açık: varsa son bilinen kayıt (age ile birlikte), yoksa None"""
+    entry = _price_cache.get(source)
+    if entry is not None:
+        price_cache_stats[source]["fallbacks"] += 1
+    return entry
+
+# Yenilemeler sınırlı bir havuzda, kaynak başına aynı anda tek iş olarak çalışır.
+# İstekler süren işin future'ını paylaşır ve süre sınırıyla bekler; havuz işçileri
+# hiçbir kilitte beklemez, asılı kalan bir kaynak en fazla bir işçi tutar.
+FETCH_DEADLINE = float(os.environ.get('FETCH_DEADLINE', 12))
+_fetch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='price-fetch')
+_inflight_lock = threading.Lock()
+_inflight = {}
+
+def refresh_future(source):
+    """(future, yeni_mi) - kaynağın süren yenilemesi, yoksa havuzda başlatılır"""
+    with _inflight_lock:
+        future = _inflight.get(source)
+        if future is not None and not future.done():
+            return future, False
+        future = _inflight[source] = _fetch_pool.submit(_refresh_price, source)
+        return future, True
+
+def lookup_price(source):
+    """(kayıt, None) önbellekten veya (None, future) süren yenilemeyle - beklemez.
+    Bayat kayıt dönerken arka planda tek yenileme başlatılır."""
+    entry, stale = cached_entry(source)
+    if entry is None:
+        return None, refresh_future(source)[0]
+    if stale and refresh_future(source)[1]:
+        price_cache_stats[source]["refreshes"] += 1
+    return entry, None
+
+def settle_price(source, future):
+    """Biten yenilemenin (değer, fetched_at) sonucu; hata olursa son bilinen değer"""
+    try:
+        entry = future.result()
+    except Exception:
+        entry = last_known_good(source)
+        if entry is None:
+            raise
+    return entry["value"], entry["fetched_at"]
+
+def get_cached_price(source, deadline=FETCH_DEADLINE):
+    """(değer, fetched_at) döndürür - stale-while-revalidate, hata olursa son bilinen değer.
+    Önbellek isabeti çağıran thread'de döner; kaçırmada süren yenileme en fazla
+    deadline saniye beklenir."""
+    entry, future = lookup_price(source)
+    if entry is not None:
+        return entry["value"], entry["fetched_at"]
+    done, _ = wait([future], timeout=deadline)
+    if future not in done:
+        entry = last_known_good(source)
+        if entry is None:
+            raise Exception("timeout")
+        return entry["value"], entry["fetched_at"]
+    return settle_price(source, future)
+
+def collect_results(pending, done):
+    """{kaynak: asyncio görevi} -> {kaynak: {"value", "fetched_at"} | {"error"}};
+    bitmeyenler "timeout" hatasıyla işaretlenir (core.aio)"""
+    results = {}
+    for source, future in pending.items():
+        if future not in done:
+            results[source] = {"error": "timeout"}
+            continue
+        try:
+            value, fetched_at = future.result()
+            results[source] = {"value": value, "fetched_at": fetched_at}
+        except Exception as e:
+            results[source] = {"error": str(e)}
+    return results
+
+def start_prices(sources):
+    """(sonuçlar, bekleyenler) - önbellekteki değerler çağıran thread'de okunur,
+    eksik kaynakların yenilemesi havuzda başlatılır"""
+    results = {}
+    pending = {}
+    for source in sources:
+        entry, future = lookup_price(source)
+        if entry is not None:
+            results[source] = {"value": entry["value"], "fetched_at": entry["fetched_at"]}
+        else:
+            pending[source] = future
+    return results, pending
+
+def finish_prices(sources, results, pending, timeout):
+    """Bekleyen yenilemeleri en fazla timeout saniye bekler; süresi dolanlar "timeout"
+    hatasıyla işaretlenir ve arka planda bitince önbelleği yine doldurur"""
+    done, _ = wait(pending.values(), timeout=max(timeout, 0))
+    for source, future in pending.items():
+        if future not in done:
+            results[source] = {"error": "timeout"}
+            continue
+        try:
+            value, fetched_at = settle_price(source, future)
+            results[source] = {"value": value, "fetched_at": fetched_at}
+        except Exception as e:
+            results[source] = {"error": str(e)}
+    return {source: results[source] for source in sources}
+
+def fetch_all_prices(sources=None, deadline=FETCH_DEADLINE):
+    """{kaynak: {"value", "fetched_at"} | {"error"}} döndürür"""
+    sources = sources or list(PRICE_SOURCES)
+    results, pending = start_prices(sources)
+    return finish_prices(sources, results, pending, deadline)
+
+def price_meta(fetched_at):
+    """Yanıtlara eklenen tazelik bilgisi"""
+    return {
+        'age': round(time.time() - fetched_at, 1),
+        'fetched_at': datetime.fromtimestamp(fetched_at, timezone.utc).isoformat()
+    }
+
+def price_payload(source, result):
+    """fetch_all_prices sonucunu tekil endpoint'lerle aynı biçime çevirir"""
+    if "error" in result:
+        return {'success': False, 'error': result["error"]}
+    value = result["value"]
+    if source in ("gold", "silver"):
+        return {'success': bool(value), 'price': value or '', **price_meta(result["fetched_at"])}
+    return {'success': True, 'data': value, **price_meta(result["fetched_at"])}
+
+def get_dashboard_snapshot(deadline=FETCH_DEADLINE):
+    """Panelin ihtiyaç duyduğu beş bölümü toplar; her bölüm kendi hatasını taşır.
+    Eksik fiyatlar havuzda yenilenirken tablo çağıran thread'de kurulur."""
+    # Tablo (numpy/snapshot) yalnızca panel görüntüsü istendiğinde yüklenir
+    from .snapshot import get_table_data
+    started = time.time()
+    sources = list(PRICE_SOURCES)
+    results, pending = start_prices(sources)
+    try:
+        table = table_payload(get_table_data())
+    except Exception as e:
+        table = {'success': False, 'error': str(e)}
+    prices = finish_prices(sources, results, pending, deadline - (time.time() - started))
+    snapshot = {source: price_payload(source, result) for source, result in prices.items()}
+    snapshot["table"] = table
+    return snapshot
+
+def table_payload(data):
+    return {'success': bool(data), 'data': data or {}}
+
+def table_section(future, done):
+    """Tablo bölümü (core.aio); süre dolduysa iş arka planda sürer (paylaşılan snapshot'ı ısıtır)"""
+    if future not in done:
+        return {'success': False, 'error': 'timeout'}
+    try:
+        return table_payload(future.result())
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+def get_source_status():
+    """Devre kesici durumları ve son bilinen değerlerin yaşı"""
+    now = time.time()
+    status = {}
+    for source, breaker in breakers.items():
+        entry = _price_cache.get(source)
+        status[source] = {**breaker.status(),
+                          "last_good_age": round(now - entry["fetched_at"], 1) if entry else None}
+    return status
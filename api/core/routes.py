@@ -0,0 +1,137 @@
+"""
+Rota gövdeleri: Flask (api/index.py) ve ASGI (api/asgi.py) aynı fonksiyonları çağırır,
+giriş noktaları yalnızca istek/yanıt nesnelerini kendi çatısına çevirir. Canlı fiyat
+gerektiren rotalar değeri adaptörden alır (Flask'ta core.prices, ASGI'de core.aio).
+"""
+import hashlib
+from collections import namedtuple
+
+from . import web
+
+# payload JSON'a çevrilir; body verilmişse (önceden serileştirilmiş) o kullanılır
+Reply = namedtuple('Reply', ['payload', 'status', 'etag', 'cache_control', 'body'],
+                   defaults=(200, None, None, None))
+
+def encode(reply):
+    return reply.body if reply.body is not None else web.dumps(reply.payload)
+
+def error(e, status=200):
+    return Reply({'success': False, 'error': str(e)}, status)
+
+def int_arg(args, name, default=None):
+    """Flask'taki args.get(name, type=int) gibi: eksik veya geçersiz değer varsayılana düşer"""
+    try:
+        return int(args.get(name))
+    except (TypeError, ValueError):
+        return default
+
+def login(get_json):
+    from .auth import _portfolio, verify_password
+    try:
+        password = get_json().get('password', '')
+        if verify_password(password):
+            return Reply({'success': True, 'token': _portfolio["token"].decode()})
+        return Reply({'success': False, 'error': 'Invalid password'})
+    except Exception as e:
+        return error(e)
+
+def verify_session(get_json):
+    from .auth import verify_token
+    try:
+        return Reply({'valid': verify_token(get_json().get('token', ''))})
+    except Exception as e:
+        return Reply({'valid': False, 'error': str(e)})
+
+def portfolio_config():
+    from .auth import load_portfolio_config
+    try:
+        config = load_portfolio_config()
+        return Reply({
+            'success': True,
+            'gold_amount': config.get('gold_amount', 0),
+            'silver_amount': config.get('silver_amount', 0)
+        })
+    except Exception as e:
+        return error(e)
+
+def price(source, value, fetched_at):
+    from .prices import price_payload
+    return Reply(price_payload(source, {"value": value, "fetched_at": fetched_at}))
+
+def table_data():
+    from .snapshot import get_table_data, table_version
+    try:
+        def build():
+            data = get_table_data()
+            return {'success': bool(data), 'data': data or {}}
+        etag, body = web.versioned_body('/api/table-data', table_version(), build)
+        return Reply(None, etag=etag, body=body)
+    except Exception as e:
+        return error(e)
+
+def stats(args):
+    from .snapshot import get_price_stats
+    try:
+        return Reply({'success': True, 'data': get_price_stats(int_arg(args, 'days'))})
+    except Exception as e:
+        return error(e)
+
+def history(args):
+    """Geçersiz parametre 400, geçmiş/katman alınamazsa 503"""
+    from .snapshot import (HISTORY_PAGE_LIMIT, HISTORY_PAGE_MAX, HISTORY_RESOLUTIONS, decode_cursor,
+                           parse_time_param, query_history)
+    try:
+        resolution = args.get('resolution', 'daily')
+        if resolution not in HISTORY_RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {', '.join(HISTORY_RESOLUTIONS)}")
+        start_ts = parse_time_param(args.get('from'), float('-inf'))
+        end_ts = parse_time_param(args.get('to'), float('inf'))
+        limit = min(max(int_arg(args, 'limit', HISTORY_PAGE_LIMIT), 1), HISTORY_PAGE_MAX)
+        cursor = args.get('cursor')
+        if cursor:
+            decode_cursor(cursor)
+    except ValueError as e:
+        return error(e, 400)
+    try:
+        source, data = query_history(resolution, start_ts, end_ts, limit, cursor)
+    except Exception as e:
+        return error(e, 503)
+
+    # Aynı aralık + aynı kaynak sürümü = aynı gövde
+    etag = hashlib.sha1(f"{source}|{resolution}|{start_ts}|{end_ts}|{limit}|{cursor}".encode()).hexdigest()
+    return Reply({'success': True, 'data': data}, etag=etag, cache_control='public, max-age=60')
+
+def stream_disabled():
+    """SSE_ENABLED kapalıyken /api/stream yanıtı; sayfa /api/snapshot'ı yoklar"""
+    return error('Stream disabled (SSE_ENABLED=0), poll /api/snapshot', 404)
+
+def snapshot(sections):
+    return Reply({'success': True, **sections})
+
+def warmup():
+    from .warmup import warm
+    try:
+        return Reply({'success': True, **warm()})
+    except Exception as e:
+        return error(e)
+
+def status():
+    from .history import get_history_cache_stats
+    from .prices import get_source_status
+    try:
+        return Reply({'success': True, 'sources': get_source_status(), 'history': get_history_cache_stats()})
+    except Exception as e:
+        return error(e)
+
+def cache_stats(stream_clients):
+    from .extract import extractor_stats
+    from .history import get_history_cache_stats
+    from .net import get_http_stats
+    from .prices import price_cache_stats
+    from .warmup import warmup_stats
+    try:
+        return Reply({'success': True, 'history': get_history_cache_stats(), 'prices': price_cache_stats,
+                      'http': get_http_stats(), 'extractor': extractor_stats,
+                      'stream_clients': stream_clients, 'warmup': warmup_stats})
+    except Exception as e:
+        return error(e)
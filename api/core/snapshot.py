@@ -0,0 +1,461 @@
+"""
+Geçmiş görünümleri: snapshot, sütunlu analitik, tablo verileri ve aralık sorguları
+"""
+import os
+import base64
+import threading
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from types import MappingProxyType
+from datetime import datetime, timezone, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from . import metrics
+from .history import (BinaryHistory, _BinaryRecords, _binary_row_date, decode_binary_day,
+                      decode_binary_rows, history_records, history_tag, load_price_history,
+                      load_rollup_tier, load_versioned_history)
+
+MONTH_NAMES = {1: "Ocak", 2: "Şubat", 3: "Mart", 4: "Nisan",
+               5: "Mayıs", 6: "Haziran", 7: "Temmuz", 8: "Ağustos",
+               9: "Eylül", 10: "Ekim", 11: "Kasım", 12: "Aralık"}
+
+# Geçmişin bir sürümünden bir kez üretilen, salt okunur görünümler
+HistorySnapshot = namedtuple('HistorySnapshot', [
+    'version',         # load_price_history sürümü
+    'today',           # YYYY-MM-DD (UTC)
+    'today_records',   # bugünün ham kayıtları, timestamp sıralı
+    'daily_peaks',     # tüm daily_peak kayıtları, tarih sıralı
+    'monthly_peaks',   # YYYY-MM -> monthly_peak kaydı
+    'columns'          # ColumnarHistory (numpy yoksa None)
+])
+
+# Analitik için sütunlu görünüm: timestamp sıralı numpy dizileri + bayrak bitmask'i.
+# row, sütunlardaki her satırın records içindeki konumudur.
+ColumnarHistory = namedtuple('ColumnarHistory', ['records', 'timestamp', 'gold', 'silver', 'portfolio', 'flags', 'row'])
+FLAG_DAILY_PEAK = 1
+FLAG_MONTHLY_PEAK = 2
+FLAG_OPTIMIZED = 4
+FLAG_VALID = 8
+
+def build_columnar_history(records):
+    """Kayıt listesini sütunlara çevirir; numpy yoksa None"""
+    if np is None:
+        return None
+    n = len(records)
+    timestamp = np.fromiter((r.get("timestamp") or 0 for r in records), np.float64, n)
+    gold = np.fromiter((r.get("gold_price") or 0 for r in records), np.float64, n)
+    silver = np.fromiter((r.get("silver_price") or 0 for r in records), np.float64, n)
+    portfolio = np.fromiter((r.get("portfolio_value") or 0 for r in records), np.float64, n)
+    flags = np.fromiter(((r.get("daily_peak") == True) * FLAG_DAILY_PEAK
+                         | (r.get("monthly_peak") == True) * FLAG_MONTHLY_PEAK
+                         | bool(r.get("optimized")) * FLAG_OPTIMIZED for r in records), np.uint8, n)
+    flags |= ((gold != 0) & (silver != 0)).astype(np.uint8) * FLAG_VALID
+    row = np.argsort(timestamp, kind='stable')
+    return ColumnarHistory(records, timestamp[row], gold[row], silver[row], portfolio[row], flags[row], row)
+
+def columnar_range(columns, start_ts, end_ts):
+    """[start_ts, end_ts) aralığının sütun dilimi - ikili arama"""
+    lo, hi = np.searchsorted(columns.timestamp, [start_ts, end_ts], side='left')
+    return slice(int(lo), int(hi))
+
+def columnar_peaks(columns, start_ts=None, end_ts=None):
+    """Aralıktaki en yüksek altın/gümüş/portföy satırları (records indeksleri)"""
+    window = columnar_range(columns, start_ts if start_ts is not None else -np.inf,
+                            end_ts if end_ts is not None else np.inf)
+    valid = np.flatnonzero(columns.flags[window] & FLAG_VALID) + window.start
+    if not len(valid):
+        return {}
+    portfolio = columns.portfolio[valid]
+    # Portföy hesaplanmamış eski kayıtlarda altın + gümüş kullanılır
+    portfolio = np.where(portfolio == 0, columns.gold[valid] + columns.silver[valid], portfolio)
+    return {
+        "gold": int(columns.row[valid[np.argmax(columns.gold[valid])]]),
+        "silver": int(columns.row[valid[np.argmax(columns.silver[valid])]]),
+        "portfolio": int(columns.row[valid[np.argmax(portfolio)]])
+    }
+
+def change_percents(prices):
+    """Ardışık fiyatlar arası yüzde değişim; ilk eleman ve önceki fiyatı 0 olanlar 0"""
+    if not prices:
+        return []
+    if np is None or len(prices) < 32:
+        result = [0]
+        for prev, price in zip(prices, prices[1:]):
+            result.append(((price - prev) / prev) * 100 if prev else 0)
+        return result
+    values = np.asarray(prices, dtype=np.float64)
+    prev = values[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = ((values[1:] - prev) / prev) * 100
+    result = [0] + pct.tolist()
+    for i in np.flatnonzero(prev == 0):
+        result[i + 1] = 0
+    return result
+
+_snapshot_lock = threading.Lock()
+_snapshot = None
+_table_cache = (None, None)
+
+def build_history_snapshot(records, today, version=0):
+    """Kayıtları tek geçişte bölümlere ayırır ve sıralar. Günlük/aylık görünümler
+    peak bayraklarından gelir; JSON ve ikili kopya aynı sonucu verir."""
+    today_records = []
+    daily_peaks = []
+    monthly_peaks = {}
+    for r in records:
+        if r.get("daily_peak") == True:
+            daily_peaks.append(r)
+        elif r.get("date") == today and r.get("gold_price") and r.get("silver_price"):
+            today_records.append(r)
+        if r.get("monthly_peak") == True:
+            monthly_peaks.setdefault(r.get("date", "")[:7], r)
+    today_records.sort(key=lambda x: x.get("timestamp", 0))
+    daily_peaks.sort(key=lambda x: x.get("date", ""))
+    return HistorySnapshot(version, today, tuple(today_records), tuple(daily_peaks),
+                           MappingProxyType(monthly_peaks), build_columnar_history(records))
+
+def build_binary_columns(history):
+    """Satır bölgesini kopyalamadan numpy sütunlarına bağlar"""
+    if np is None:
+        return None
+    dtype = np.dtype([('timestamp', '<f8'), ('gold', '<f8'), ('silver', '<f8'), ('portfolio', '<f8'),
+                      ('flags', 'u1'), ('time', 'S8'), ('pad', 'V3')])
+    rows = np.frombuffer(history.buffer, dtype=dtype, count=history.row_count, offset=history.rows_offset)
+    row = np.argsort(rows['timestamp'], kind='stable')
+    flags = rows['flags'] | (((rows['gold'] != 0) & (rows['silver'] != 0)).astype(np.uint8) * FLAG_VALID)
+    return ColumnarHistory(_BinaryRecords(history), rows['timestamp'][row], rows['gold'][row],
+                           rows['silver'][row], rows['portfolio'][row], flags[row], row)
+
+def build_binary_snapshot(history, today, version=0):
+    """Bugünün günü ve peak satırları dışında hiçbir satırı çözmeden snapshot kurar"""
+    first, count = history.days.get(today, (0, 0))
+    peaks = []
+    for i in history.peak_rows:
+        # Bugünün peak'leri zaten gün diliminde çözülüyor
+        if not first <= i < first + count:
+            peaks.extend(decode_binary_rows(history, i, i + 1, _binary_row_date(history, i)))
+    snapshot = build_history_snapshot(decode_binary_day(history, today) + peaks, today, version)
+    return snapshot._replace(columns=build_binary_columns(history))
+
+def get_history_snapshot():
+    """Geçmiş sürümü veya gün değişmediyse önceki snapshot'ı döndürür"""
+    global _snapshot
+    history, version = load_versioned_history()
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version and snapshot.today == today:
+        return snapshot
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != version or snapshot.today != today:
+            if isinstance(history, BinaryHistory):
+                with metrics.snapshot_build_duration.time("binary"):
+                    snapshot = _snapshot = build_binary_snapshot(history, today, version)
+            else:
+                with metrics.snapshot_build_duration.time("json"):
+                    snapshot = _snapshot = build_history_snapshot(history.get("records", []), today, version)
+        return snapshot
+
+_tier_views = {}
+
+def tier_peaks(tier):
+    """(etiket, peak'ler) - günlük/aylık katmanın kovalarındaki portföy peak'leri:
+    günlükte tarih sıralı kayıtlar, aylıkta YYYY-MM -> kayıt. Katman alınamazsa
+    (None, None); çağıran snapshot'taki peak bayraklarına düşer."""
+    try:
+        tag, buckets = load_rollup_tier(tier)
+    except:
+        return None, None
+    cached = _tier_views.get(tier)
+    if cached is not None and cached[0] == tag:
+        return cached
+    peaks = {key: bucket["peak"] for key, bucket in sorted(buckets.items()) if "peak" in bucket}
+    view = (tag, tuple(peaks.values()) if tier == "daily" else MappingProxyType(peaks))
+    _tier_views[tier] = view
+    return view
+
+def get_hourly_data(snapshot=None):
+    try:
+        snapshot = snapshot or get_history_snapshot()
+        # SADECE BUGÜNKÜ saatlik kayıtlar (peak olmayanlar) - snapshot'ta hazır
+        sorted_records = snapshot.today_records
+        changes = change_percents([record["gold_price"] for record in sorted_records])
+        hourly_data = []
+        
+        for record, change_percent in zip(sorted_records, changes):
+            timestamp = record.get("timestamp", 0)
+            local_time = datetime.fromtimestamp(timestamp, timezone.utc) + timedelta(hours=3)
+            time_label = local_time.strftime("%H:%M")
+            
+            hourly_data.append({
+                "time": time_label,
+                "gold_price": record["gold_price"],
+                "silver_price": record["silver_price"],
+                "change_percent": change_percent,
+                "optimized": False,
+                "is_peak": False
+            })
+        return hourly_data
+    except:
+        return []
+
+def get_daily_optimized_data(snapshot=None, peaks=None):
+    try:
+        # TÜM günlük peak kayıtları, tarihe göre sıralı (günlük katman yoksa bayraklardan)
+        sorted_peaks = peaks if peaks is not None else (snapshot or get_history_snapshot()).daily_peaks
+        changes = change_percents([day_record["gold_price"] for day_record in sorted_peaks])
+        daily_data = []
+        
+        for day_record, change_percent in zip(sorted_peaks, changes):
+            day_date = datetime.strptime(day_record["date"], "%Y-%m-%d")
+            day_name = day_date.strftime("%d.%m.%Y")
+            
+            # Time formatını kontrol et (HH:MM:SS ise HH:MM'e çevir)
+            peak_time = day_record.get("time", "unknown")
+            if len(peak_time) > 5:
+                peak_time = peak_time[:5]
+            
+            daily_data.append({
+                "time": day_name,
+                "gold_price": day_record["gold_price"],
+                "silver_price": day_record["silver_price"],
+                "change_percent": change_percent,
+                "optimized": True,
+                "peak_time": peak_time,
+                "portfolio_value": day_record.get("portfolio_value", 0),
+                "is_peak": True
+            })
+        
+        return daily_data
+    except:
+        return []
+
+# Aylık tabloda gösterilecek ay sayısı
+MONTHLY_LOOKBACK = int(os.environ.get('MONTHLY_LOOKBACK', '12'))
+
+def calendar_months(now, count):
+    """now dahil geriye doğru count takvim ayı, eskiden yeniye YYYY-MM"""
+    index = now.year * 12 + now.month - 1
+    return [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(index - count + 1, index + 1)]
+
+def get_monthly_optimized_data(snapshot=None, months=None, peaks=None):
+    try:
+        monthly_peaks = peaks if peaks is not None else (snapshot or get_history_snapshot()).monthly_peaks
+        monthly_data = []
+        monthly_temp = []
+        
+        for target_month in calendar_months(datetime.now(timezone.utc), months or MONTHLY_LOOKBACK):
+            month_record = monthly_peaks.get(target_month)
+            if month_record:
+                month_date = datetime.strptime(month_record["date"], "%Y-%m-%d")
+                month_label = f"{MONTH_NAMES[month_date.month]} {month_date.year}"
+                
+                # Time formatını kontrol et (HH:MM:SS ise HH:MM'e çevir)
+                peak_time = month_record.get("time", "unknown")
+                if len(peak_time) > 5:
+                    peak_time = peak_time[:5]
+                
+                monthly_temp.append({
+                    "time": month_label,
+                    "gold_price": month_record["gold_price"],
+                    "silver_price": month_record["silver_price"],
+                    "peak_time": peak_time,
+                    "peak_date": month_record.get("date", "unknown"),
+                    "portfolio_value": month_record.get("portfolio_value", 0)
+                })
+                
+        changes = change_percents([item["gold_price"] for item in monthly_temp])
+        for month_data_item, change_percent in zip(monthly_temp, changes):
+            monthly_data.append({
+                "time": month_data_item['time'],
+                "gold_price": month_data_item["gold_price"],
+                "silver_price": month_data_item["silver_price"],
+                "change_percent": change_percent,
+                "optimized": True,
+                "peak_time": month_data_item["peak_time"],
+                "peak_date": month_data_item["peak_date"],
+                "portfolio_value": month_data_item["portfolio_value"],
+                "is_peak": True
+            })
+        return monthly_data
+    except:
+        return []
+
+def table_version():
+    """get_table_data'nın önbellek anahtarı: geçmiş sürümü, gün ve günlük/aylık katman
+    etiketleri. Rotalar yanıt gövdesini/ETag'i bu anahtarla saklar."""
+    snapshot = get_history_snapshot()
+    return (snapshot.version, snapshot.today, tier_peaks("daily")[0], tier_peaks("monthly")[0])
+
+def get_table_data():
+    """Snapshot ve günlük/aylık katmanlar değişmediği sürece aynı sonucu döndürür
+    (paylaşımlı, değiştirilmemeli)"""
+    global _table_cache
+    try:
+        snapshot = get_history_snapshot()
+        daily_tag, daily_peaks = tier_peaks("daily")
+        monthly_tag, monthly_peaks = tier_peaks("monthly")
+        key = (snapshot.version, snapshot.today, daily_tag, monthly_tag)
+        cached_key, cached_data = _table_cache
+        if cached_key == key:
+            return cached_data
+        with metrics.table_build_duration.time():
+            data = {
+                "hourly": get_hourly_data(snapshot),
+                "daily": get_daily_optimized_data(snapshot, daily_peaks),
+                "monthly": get_monthly_optimized_data(snapshot, peaks=monthly_peaks)
+            }
+        if snapshot.version:
+            _table_cache = (key, data)
+        return data
+    except:
+        return {"hourly": [], "daily": [], "monthly": []}
+
+def portfolio_value(record):
+    """Portföy hesaplanmamış eski kayıtlarda altın + gümüş (columnar_peaks ile aynı kural)"""
+    return record.get("portfolio_value") or record["gold_price"] + record["silver_price"]
+
+def get_price_stats(days=None):
+    """Son N gündeki (veya tüm geçmişteki) en yüksek altın/gümüş/portföy kayıtları"""
+    snapshot = get_history_snapshot()
+    start_ts = time.time() - days * 86400 if days else None
+    columns = snapshot.columns
+    if columns is not None:
+        records = columns.records
+        peaks = columnar_peaks(columns, start_ts)
+    else:
+        records = history_records(load_price_history())
+        window = [i for i, r in enumerate(records)
+                  if r.get("gold_price") and r.get("silver_price")
+                  and (start_ts is None or r.get("timestamp", 0) >= start_ts)]
+        peaks = {}
+        if window:
+            peaks = {
+                "gold": max(window, key=lambda i: records[i]["gold_price"]),
+                "silver": max(window, key=lambda i: records[i]["silver_price"]),
+                "portfolio": max(window, key=lambda i: portfolio_value(records[i]))
+            }
+    stats = {}
+    for level, i in peaks.items():
+        record = records[i]
+        stats[level] = {
+            "value": portfolio_value(record) if level == "portfolio" else record[f"{level}_price"],
+            "date": record.get("date"),
+            "time": record.get("time", "")[:5]
+        }
+    return stats
+
+# Zaman aralığı sorguları: çözünürlük başına timestamp sıralı bir indeks,
+# bisect ile O(log n + k). İndeks geçmiş sürümü değişene kadar saklanır.
+HISTORY_RESOLUTIONS = ("raw", "hourly", "daily", "monthly")
+HISTORY_PAGE_LIMIT = 500
+HISTORY_PAGE_MAX = 5000
+
+_range_index_lock = threading.Lock()
+_range_index = {"version": None, "series": {}}
+
+def _compact_record(r):
+    return {
+        "timestamp": r.get("timestamp"),
+        "date": r.get("date"),
+        "time": (r.get("time") or "")[:5],
+        "gold_price": r.get("gold_price"),
+        "silver_price": r.get("silver_price"),
+        "portfolio_value": r.get("portfolio_value", 0)
+    }
+
+def _build_series(resolution, snapshot, buckets=None):
+    """(timestamps, items) - items zaman sıralı, timestamps ile aynı uzunlukta"""
+    if resolution == "raw":
+        records = [r for r in history_records(load_price_history())
+                   if r.get("gold_price") and r.get("silver_price")]
+        records.sort(key=lambda r: r.get("timestamp", 0))
+        items = [_compact_record(r) for r in records]
+    elif resolution == "hourly":
+        items = []
+        for hour, bucket in sorted(buckets.items()):
+            start = datetime.strptime(hour, "%Y-%m-%dT%H").replace(tzinfo=timezone.utc)
+            items.append({"timestamp": int(start.timestamp()), "hour": hour,
+                          "gold": bucket["gold"], "silver": bucket["silver"], "count": bucket["count"]})
+    elif buckets is not None:
+        # Günlük/aylık katman: kovanın peak kaydı + OHLC
+        items = sorted(({**_compact_record(bucket["peak"]), "gold": bucket["gold"],
+                         "silver": bucket["silver"], "count": bucket["count"]}
+                        for bucket in buckets.values() if "peak" in bucket),
+                       key=lambda r: r["timestamp"] or 0)
+    elif resolution == "daily":
+        items = sorted((_compact_record(r) for r in snapshot.daily_peaks), key=lambda r: r["timestamp"] or 0)
+    else:
+        items = sorted((_compact_record(r) for r in snapshot.monthly_peaks.values()), key=lambda r: r["timestamp"] or 0)
+    return [item["timestamp"] or 0 for item in items], items
+
+def get_history_series(resolution):
+    """(etiket, seri) - etiket verinin kaynağını tanımlar (ETag için): katmandan
+    gelen çözünürlüklerde katman dosyasının, diğerlerinde geçmişin ETag'i veya sürümü.
+    Günlük/aylık katman alınamazsa peak bayraklarına düşülür."""
+    snapshot = get_history_snapshot()
+    buckets = None
+    if resolution == "hourly":
+        tag, buckets = load_rollup_tier("hourly")
+    elif resolution != "raw":
+        try:
+            tag, buckets = load_rollup_tier(resolution)
+        except:
+            pass
+    if buckets is None:
+        tag = history_tag(snapshot.version)
+    key = (resolution, tag, buckets is not None)
+    with _range_index_lock:
+        if _range_index["version"] != snapshot.version:
+            _range_index.update(version=snapshot.version, series={})
+        series = _range_index["series"].get(key)
+    if series is None:
+        series = _build_series(resolution, snapshot, buckets)
+        with _range_index_lock:
+            if _range_index["version"] == snapshot.version:
+                _range_index["series"][key] = series
+    return tag, series
+
+def parse_time_param(value, default):
+    """Unix saniye veya ISO tarih/saat (UTC) kabul eder"""
+    if value in (None, ''):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+def encode_cursor(timestamp, skip):
+    return base64.urlsafe_b64encode(f"{timestamp}:{skip}".encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    timestamp, skip = raw.split(':')
+    return float(timestamp), int(skip)
+
+def query_history(resolution, start_ts, end_ts, limit=HISTORY_PAGE_LIMIT, cursor=None):
+    """(etiket, sayfa) - [start_ts, end_ts) aralığındaki öğeler; sonraki sayfa için imleç döner"""
+    if resolution not in HISTORY_RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(HISTORY_RESOLUTIONS)}")
+    tag, (timestamps, items) = get_history_series(resolution)
+    lo = bisect_left(timestamps, start_ts)
+    if cursor:
+        # İmleç konum değil timestamp taşır; yeni sürümde de doğru yerden devam eder
+        cursor_ts, skip = decode_cursor(cursor)
+        lo = max(lo, bisect_left(timestamps, cursor_ts) + skip)
+    hi = bisect_left(timestamps, end_ts)
+    page = items[lo:min(hi, lo + limit)]
+    next_cursor = None
+    if lo + limit < hi:
+        last_ts = timestamps[lo + limit - 1]
+        skip = lo + limit - bisect_left(timestamps, last_ts)
+        next_cursor = encode_cursor(last_ts, skip)
+    return tag, {"resolution": resolution, "count": len(page), "items": page, "next_cursor": next_cursor}
@@ -0,0 +1,115 @@
+"""
+SSE yayını
+"""
+import os
+import json
+import queue
+import threading
+import time
+
+from .prices import PRICE_FRESH_TTL, get_dashboard_snapshot
+
+# SSE yayını: bağlı istemci sayısından bağımsız tek bir poller kaynakları çeker
+# ve yalnızca değişen bölümleri tüm istemcilere iletir
+STREAM_INTERVAL = float(os.environ.get('STREAM_INTERVAL', PRICE_FRESH_TTL))
+STREAM_KEEPALIVE = float(os.environ.get('STREAM_KEEPALIVE', 15))
+
+_stream_lock = threading.Lock()
+_stream_clients = set()
+_stream_state = {}
+_stream_thread = None
+# Kuyruğa konunca istemcinin generator'ı biter, EventSource yeniden bağlanır
+STREAM_CLOSE = None
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+def _section_key(section):
+    """Tazelik alanları dışında bölüm içeriği - değişiklik karşılaştırması için"""
+    return {k: v for k, v in section.items() if k not in ('age', 'fetched_at')}
+
+def apply_snapshot(snapshot):
+    """Başarılı bölümleri son duruma işler, değişenleri döner (thread ve asyncio poller ortak)"""
+    changed = {}
+    for name, section in snapshot.items():
+        if not section.get('success'):
+            continue
+        previous = _stream_state.get(name)
+        if previous is None or _section_key(previous) != _section_key(section):
+            changed[name] = section
+        _stream_state[name] = section
+    return changed
+
+def seed_state(snapshot):
+    """Poller henüz durum kurmadıysa ilk istemcinin çektiği görüntüyle başlatır"""
+    for name, section in snapshot.items():
+        if section.get('success'):
+            _stream_state.setdefault(name, section)
+    return snapshot
+
+def _stream_poller():
+    global _stream_thread
+    while True:
+        with _stream_lock:
+            if not _stream_clients:
+                _stream_thread = None
+                return
+        try:
+            snapshot = get_dashboard_snapshot()
+        except:
+            snapshot = {}
+        changed = apply_snapshot(snapshot)
+        if changed:
+            event = format_sse('delta', changed)
+            with _stream_lock:
+                clients = list(_stream_clients)
+            for client in clients:
+                try:
+                    client.put_nowait(event)
+                except queue.Full:
+                    # Okumayan istemci poller'ı bekletmesin
+                    with _stream_lock:
+                        _stream_clients.discard(client)
+                    close_client(client)
+        time.sleep(STREAM_INTERVAL)
+
+def subscribe_stream():
+    global _stream_thread
+    client = queue.Queue(maxsize=32)
+    with _stream_lock:
+        _stream_clients.add(client)
+        if _stream_thread is None:
+            _stream_thread = threading.Thread(target=_stream_poller, name='price-stream', daemon=True)
+            _stream_thread.start()
+    return client
+
+def close_client(client):
+    """Dolu kuyruğu boşaltıp kapanış işaretini koyar - yalnızca poller yazar"""
+    while True:
+        try:
+            client.get_nowait()
+        except queue.Empty:
+            break
+    client.put_nowait(STREAM_CLOSE)
+
+def unsubscribe_stream(client):
+    with _stream_lock:
+        _stream_clients.discard(client)
+
+def stream_events():
+    """İlk olarak tam durumu, sonra yalnızca değişen bölümleri gönderir"""
+    client = subscribe_stream()
+    try:
+        state = dict(_stream_state) or seed_state(get_dashboard_snapshot())
+        yield format_sse('snapshot', state)
+        while True:
+            try:
+                event = client.get(timeout=STREAM_KEEPALIVE)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if event is STREAM_CLOSE:
+                return
+            yield event
+    finally:
+        unsubscribe_stream(client)
@@ -0,0 +1,49 @@
+"""
+Soğuk başlangıç ısıtması: geçmiş indirilir, snapshot ve tablo önbelleği kurulur.
+Sonuç modül genelindeki önbelleklerde kalır; sıcak çağrılar yeniden kullanır.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+# off: kapalı, background: import sonrası ayrı thread'de, sync: import sırasında
+WARMUP = os.environ.get('WARMUP', 'background')
+
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+warmup_stats = {"runs": 0, "last_ms": None, "last_at": None, "error": None}
+
+def warm():
+    """Geçmiş snapshot'ını ve tablo verisini önbelleğe alır"""
+    started = time.perf_counter()
+    try:
+        from .snapshot import get_table_data
+        get_table_data()
+        error = None
+    except Exception as e:
+        error = str(e)
+    warmup_stats.update(runs=warmup_stats["runs"] + 1, error=error,
+                        last_ms=round((time.perf_counter() - started) * 1000, 1),
+                        last_at=datetime.now(timezone.utc).isoformat())
+    return dict(warmup_stats)
+
+def _run():
+    global _warmup_thread
+    try:
+        warm()
+    finally:
+        with _warmup_lock:
+            _warmup_thread = None
+
+def start(mode=None):
+    """WARMUP ayarına göre ısıtmayı başlatır; aynı anda tek ısıtma thread'i"""
+    global _warmup_thread
+    mode = mode or WARMUP
+    if mode == 'sync':
+        warm()
+    elif mode == 'background':
+        with _warmup_lock:
+            if _warmup_thread is None:
+                _warmup_thread = threading.Thread(target=_run, name='warmup', daemon=True)
+                _warmup_thread.start()
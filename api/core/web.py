@@ -0,0 +1,68 @@
+"""
+Çatıdan bağımsız yanıt ara katmanı (Flask ve ASGI tarafı ortak kullanır): içerik
+kodlaması pazarlığı, ETag/304 ve JSON gövdelerinin gzip'i
+"""
+import os
+import json
+import gzip
+import hashlib
+
+# JSON API yanıtları: ETag/304 ve eşik üstü gövdelerde gzip.
+# Serileştirilmiş gövdeler ve gzip halleri burada saklanır.
+JSON_COMPRESS_MIN = int(os.environ.get('JSON_COMPRESS_MIN', '1024'))
+JSON_GZIP_CACHE_SIZE = 64
+
+_payload_cache = {}   # rota -> (sürüm, ETag, gövde)
+_gzip_cache = {}      # ETag -> gzip gövde (ekleme sırasıyla sınırlı)
+
+def _gzip_body(etag, body):
+    gz = _gzip_cache.get(etag)
+    if gz is None:
+        gz = gzip.compress(body, compresslevel=6, mtime=0)
+        if len(_gzip_cache) >= JSON_GZIP_CACHE_SIZE:
+            _gzip_cache.pop(next(iter(_gzip_cache)), None)
+        _gzip_cache[etag] = gz
+    return gz
+
+def dumps(payload):
+    """jsonify ile aynı bayt çıktısı (sıralı anahtarlar, sıkışık ayraçlar)"""
+    return json.dumps(payload, ensure_ascii=True, sort_keys=True, separators=(',', ':')).encode() + b"\n"
+
+def accepts(header, encoding):
+    """Accept-Encoding başlığı kodlamayı (veya *) q=0 olmadan listeliyor mu"""
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip().lower() in (encoding, '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+def etag_matches(header, etag):
+    """If-None-Match başlığı (zayıf karşılaştırma) ETag'i içeriyor mu"""
+    tags = [tag.strip() for tag in (header or '').split(',')]
+    return '*' in tags or any(tag.removeprefix('W/').strip('"') == etag for tag in tags)
+
+def versioned_body(key, version, build):
+    """(ETag, gövde) - sürüm değişmedikçe gövde ve ETag yeniden hesaplanmaz"""
+    cached = _payload_cache.get(key)
+    if cached is None or cached[0] != version:
+        body = dumps(build())
+        cached = (version, hashlib.sha1(body).hexdigest(), body)
+        _payload_cache[key] = cached
+    return cached[1], cached[2]
+
+def json_validators(method, status, body, etag=None, cache_control=None, accept_encoding='', if_none_match=''):
+    """(durum, başlıklar, gövde) - GET/HEAD 200 JSON yanıtlarına ETag/304, Vary ve eşik
+    üstünde gzip uygular; diğer yanıtlar olduğu gibi döner"""
+    if method not in ('GET', 'HEAD') or status != 200:
+        return status, {}, body
+    etag = etag or hashlib.sha1(body).hexdigest()
+    use_gzip = len(body) >= JSON_COMPRESS_MIN and accepts(accept_encoding, 'gzip')
+    # Güçlü ETag kodlamaya göre ayrışmalı
+    tagged = f"{etag}-gzip" if use_gzip else etag
+    headers = {'ETag': f'"{tagged}"', 'Vary': 'Accept-Encoding', 'Cache-Control': cache_control or 'no-cache'}
+    if etag_matches(if_none_match, tagged):
+        return 304, headers, b''
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        body = _gzip_body(etag, body)
+    return status, headers, body
@@ -2,1082 +2,164 @@
 """
 Metal Price Tracker Web App v3.7 - Altın Ons USD Eklendi
 Flask web uygulaması - Şifre korumalı
+Rotalar burada; rota gövdeleri ve ara katman core paketinde (app.py ve asgi.py ile ortak)
 """
-from flask import Flask, jsonify, render_template_string, request
+from flask import Flask, Response, g, request, stream_with_context
 from flask_cors import CORS
-import requests
-from bs4 import BeautifulSoup
 import os
-import json
-import hashlib
-from datetime import datetime, timezone, timedelta
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import core  # noqa: E402
 
 app = Flask(__name__)
 CORS(app)
 
-def load_portfolio_config():
-    try:
-        with open('portfolio-config.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
-        return {"gold_amount": 0, "silver_amount": 0, "password_hash": ""}
-
-def verify_password(password):
-    try:
-        config = load_portfolio_config()
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        return password_hash == config.get("password_hash", "")
-    except:
-        return False
-
-def load_price_history():
-    try:
-        url = "https://raw.githubusercontent.com/drkgreen/altin-gumus-tracker/main/data/price-history.json"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        return {"records": []}
-    except:
-        return {"records": []}
-
-def get_hourly_data():
-    try:
-        history = load_price_history()
-        records = history.get("records", [])
-        if not records:
-            return []
-        
-        now = datetime.now(timezone.utc)
-        today = now.strftime("%Y-%m-%d")
-        hourly_data = []
-        
-        # SADECE BUGÜNKÜ saatlik kayıtları al (peak olmayanlar)
-        today_records = [r for r in records 
-                        if r.get("date") == today 
-                        and not r.get("daily_peak", False) 
-                        and r.get("gold_price") 
-                        and r.get("silver_price")]
-        
-        if today_records:
-            sorted_records = sorted(today_records, key=lambda x: x.get("timestamp", 0))
-            for i, record in enumerate(sorted_records):
-                timestamp = record.get("timestamp", 0)
-                local_time = datetime.fromtimestamp(timestamp, timezone.utc) + timedelta(hours=3)
-                time_label = local_time.strftime("%H:%M")
-                
-                change_percent = 0
-                if i > 0:
-                    prev_record = sorted_records[i - 1]
-                    if prev_record and prev_record.get("gold_price"):
-                        price_diff = record["gold_price"] - prev_record["gold_price"]
-                        change_percent = (price_diff / prev_record["gold_price"]) * 100
-                        
-                hourly_data.append({
-                    "time": time_label,
-                    "gold_price": record["gold_price"],
-                    "silver_price": record["silver_price"],
-                    "change_percent": change_percent,
-                    "optimized": False,
-                    "is_peak": False
-                })
-        return hourly_data
-    except:
-        return []
-
-def get_daily_optimized_data():
-    try:
-        history = load_price_history()
-        records = history.get("records", [])
-        if not records:
-            return []
-        
-        # TÜM daily_peak kayıtları al
-        daily_peaks = [r for r in records if r.get("daily_peak") == True]
-        daily_data = []
-        
-        # Tarihe göre sırala
-        sorted_peaks = sorted(daily_peaks, key=lambda x: x.get("date", ""))
-        
-        for i, day_record in enumerate(sorted_peaks):
-            day_date = datetime.strptime(day_record["date"], "%Y-%m-%d")
-            day_name = day_date.strftime("%d.%m.%Y")
-            
-            # Time formatını kontrol et (HH:MM:SS ise HH:MM'e çevir)
-            peak_time = day_record.get("time", "unknown")
-            if len(peak_time) > 5:
-                peak_time = peak_time[:5]
-            
-            change_percent = 0
-            if i > 0:
-                prev_day = sorted_peaks[i-1]
-                if prev_day["gold_price"] > 0:
-                    price_diff = day_record["gold_price"] - prev_day["gold_price"]
-                    change_percent = (price_diff / prev_day["gold_price"]) * 100
-            
-            daily_data.append({
-                "time": day_name,
-                "gold_price": day_record["gold_price"],
-                "silver_price": day_record["silver_price"],
-                "change_percent": change_percent,
-                "optimized": True,
-                "peak_time": peak_time,
-                "portfolio_value": day_record.get("portfolio_value", 0),
-                "is_peak": True
-            })
-        
-        return daily_data
-    except:
-        return []
-
-def get_monthly_optimized_data():
-    try:
-        history = load_price_history()
-        records = history.get("records", [])
-        if not records:
-            return []
-            
-        monthly_peaks = [r for r in records if r.get("monthly_peak") == True]
-        monthly_data = []
-        monthly_temp = []
-        now = datetime.now(timezone.utc)
-        
-        for i in range(11, -1, -1):
-            target_month = (now - timedelta(days=i*30)).strftime("%Y-%m")
-            month_record = next((r for r in monthly_peaks 
-                               if r.get("date", "").startswith(target_month)), None)
-            if month_record:
-                month_date = datetime.strptime(month_record["date"], "%Y-%m-%d")
-                month_names = {1: "Ocak", 2: "Şubat", 3: "Mart", 4: "Nisan", 
-                             5: "Mayıs", 6: "Haziran", 7: "Temmuz", 8: "Ağustos", 
-                             9: "Eylül", 10: "Ekim", 11: "Kasım", 12: "Aralık"}
-                month_label = f"{month_names[month_date.month]} {month_date.year}"
-                
-                # Time formatını kontrol et (HH:MM:SS ise HH:MM'e çevir)
-                peak_time = month_record.get("time", "unknown")
-                if len(peak_time) > 5:
-                    peak_time = peak_time[:5]
-                
-                monthly_temp.append({
-                    "time": month_label,
-                    "gold_price": month_record["gold_price"],
-                    "silver_price": month_record["silver_price"],
-                    "peak_time": peak_time,
-                    "peak_date": month_record.get("date", "unknown"),
-                    "portfolio_value": month_record.get("portfolio_value", 0)
-                })
-                
-        for i, month_data_item in enumerate(monthly_temp):
-            change_percent = 0
-            if i > 0:
-                prev_month = monthly_temp[i-1]
-                if prev_month["gold_price"] > 0:
-                    price_diff = month_data_item["gold_price"] - prev_month["gold_price"]
-                    change_percent = (price_diff / prev_month["gold_price"]) * 100
-                    
-            monthly_data.append({
-                "time": month_data_item['time'],
-                "gold_price": month_data_item["gold_price"],
-                "silver_price": month_data_item["silver_price"],
-                "change_percent": change_percent,
-                "optimized": True,
-                "peak_time": month_data_item["peak_time"],
-                "peak_date": month_data_item["peak_date"],
-                "portfolio_value": month_data_item["portfolio_value"],
-                "is_peak": True
-            })
-        return monthly_data
-    except:
-        return []
-
-def get_table_data():
-    try:
-        return {
-            "hourly": get_hourly_data(),
-            "daily": get_daily_optimized_data(),
-            "monthly": get_monthly_optimized_data()
-        }
-    except:
-        return {"hourly": [], "daily": [], "monthly": []}
-
-def get_gold_price():
-    try:
-        url = "https://m.doviz.com/altin/yapikredi/gram-altin"
-        headers = {'User-Agent': 'Mozilla/5.0 (Android 10; Mobile; rv:91.0) Gecko/91.0 Firefox/91.0'}
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        price_element = soup.find('span', {'data-socket-key': '6-gram-altin', 'data-socket-attr': 'bid'})
-        if price_element:
-            return price_element.get_text(strip=True)
-        return None
-    except Exception as e:
-        raise Exception(f"Gold price error: {str(e)}")
-
-def get_silver_price():
-    try:
-        url = "https://m.doviz.com/altin/vakifbank/gumus"
-        headers = {'User-Agent': 'Mozilla/5.0 (Android 10; Mobile; rv:91.0) Gecko/91.0 Firefox/91.0'}
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        price_element = soup.find('span', {'data-socket-key': '5-gumus', 'data-socket-attr': 'bid'})
-        if price_element:
-            return price_element.get_text(strip=True)
-        return None
-    except Exception as e:
-        raise Exception(f"Silver price error: {str(e)}")
-
-def get_gold_ounce_usd():
-    """Bloomberg HT'den altın ons fiyatı (USD) + yön + değişim oranı"""
-    try:
-        url = "https://www.bloomberght.com/altin/altin-ons"
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Fiyat
-        price_element = soup.find('span', class_='lastPrice')
-        price = price_element.get_text(strip=True) if price_element else None
-        
-        # Yön (ok)
-        direction = "neutral"
-        if soup.find('span', class_='bloomberght-icon-font-icon-graphic-up'):
-            direction = "up"
-        elif soup.find('span', class_='bloomberght-icon-font-icon-graphic-down'):
-            direction = "down"
-        
-        # Değişim oranı
-        percent_element = soup.find('span', class_='percentChange')
-        percent = percent_element.get_text(strip=True) if percent_element else None
-        
-        return {
-            "price": price,
-            "direction": direction,
-            "change_percent": percent
-        }
-    except Exception as e:
-        raise Exception(f"Gold ounce USD error: {str(e)}")
-
-def get_silver_ounce_usd():
-    """Bloomberg HT'den gümüş ons fiyatı (USD) + yön + değişim oranı"""
-    try:
-        url = "https://www.bloomberght.com/emtia/gumus-ons"
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Fiyat
-        price_element = soup.find('span', class_='lastPrice')
-        price = price_element.get_text(strip=True) if price_element else None
-        
-        # Yön (ok)
-        direction = "neutral"
-        if soup.find('span', class_='bloomberght-icon-font-icon-graphic-up'):
-            direction = "up"
-        elif soup.find('span', class_='bloomberght-icon-font-icon-graphic-down'):
-            direction = "down"
-        
-        # Değişim oranı
-        percent_element = soup.find('span', class_='percentChange')
-        percent = percent_element.get_text(strip=True) if percent_element else None
-        
-        return {
-            "price": price,
-            "direction": direction,
-            "change_percent": percent
-        }
-    except Exception as e:
-        raise Exception(f"Silver ounce USD error: {str(e)}")
-
-HTML_TEMPLATE = """<!DOCTYPE html>
-<html lang="tr">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>Metal Tracker v3.8</title>
-<script src="https://cdnjs.cloudflare.com/ajax/libs/Chart.js/3.9.1/chart.min.js"></script>
-<style>
-*{margin:0;padding:0;box-sizing:border-box}
-body{font-family:-apple-system,BlinkMacSystemFont,sans-serif;background:linear-gradient(135deg,#0f172a 0%,#1e293b 50%,#0f172a 100%);background-attachment:fixed;min-height:100vh;padding:0;color:#e2e8f0}
-.container{max-width:100%;margin:0 auto;display:flex;flex-direction:column;gap:0;padding:0;padding-top:80px;min-height:100vh}
-.header{position:fixed;top:0;left:0;right:0;width:100%;display:flex;justify-content:space-between;align-items:center;background:rgba(15,23,42,0.95);backdrop-filter:blur(20px);border-bottom:1px solid rgba(59,130,246,0.2);padding:16px 20px;box-shadow:0 4px 20px rgba(0,0,0,0.4);z-index:1000}
-.header-left{display:flex;align-items:center;gap:12px}
-.header-center{flex:1;display:flex;justify-content:center}
-.logo{font-size:16px;font-weight:700;color:#60a5fa;white-space:nowrap}
-.version{font-size:9px;color:#60a5fa;background:rgba(59,130,246,0.2);padding:3px 6px;border-radius:6px}
-.update-time{font-size:14px;color:#60a5fa;font-weight:600;background:rgba(59,130,246,0.15);padding:6px 12px;border-radius:8px;border:1px solid rgba(59,130,246,0.3);white-space:nowrap}
-.actions{display:flex;gap:8px}
-.action-btn{width:36px;height:36px;border-radius:8px;background:rgba(15,23,42,0.6);border:1px solid rgba(59,130,246,0.3);color:#60a5fa;font-size:14px;cursor:pointer;transition:all 0.3s;display:flex;align-items:center;justify-content:center}
-.action-btn:hover{background:rgba(59,130,246,0.2);transform:translateY(-1px)}
-.portfolio-summary{background:rgba(15,23,42,0.6);backdrop-filter:blur(20px);border-bottom:1px solid rgba(59,130,246,0.2);padding:20px 2px;box-shadow:0 4px 20px rgba(0,0,0,0.3);text-align:center}
-.portfolio-amount{font-size:33px;font-weight:800;margin-bottom:20px;color:#60a5fa;white-space:nowrap}
-.portfolio-metals{display:flex;gap:0;margin-top:16px}
-.metal-item{flex:1;background:transparent;border:none;border-radius:0;padding:18px 12px;min-height:120px;text-align:center;transition:all 0.3s;position:relative}
-.metal-item:not(:last-child)::after{content:'';position:absolute;right:0;top:10%;height:80%;width:1px;background:rgba(59,130,246,0.3)}
-.metal-item:hover{background:rgba(59,130,246,0.05);transform:none}
-.metal-name{font-size:20px;font-weight:600;color:#60a5fa;margin-bottom:8px;white-space:nowrap}
-.metal-amount{font-size:17px;color:rgba(226,232,240,0.7);margin-bottom:6px;white-space:nowrap}
-.metal-price{font-size:17px;color:rgba(226,232,240,0.6);margin-bottom:8px;white-space:nowrap}
-.metal-value{font-size:21px;font-weight:700;color:#e2e8f0;white-space:nowrap}
-.gold-ounce-section{background:transparent;border-top:1px solid rgba(59,130,246,0.3);padding:20px 2px;margin-top:16px;display:flex;gap:0}
-.ounce-card{flex:1;text-align:center;padding:0 12px;position:relative;cursor:pointer;transition:all 0.3s;text-decoration:none;display:block}
-.ounce-card:not(:last-child)::after{content:'';position:absolute;right:0;top:10%;height:80%;width:1px;background:rgba(59,130,246,0.3)}
-.ounce-card:hover{background:rgba(59,130,246,0.05);transform:none}
-.ounce-title{font-size:14px;font-weight:600;color:#60a5fa;margin-bottom:12px}
-.ounce-data{display:flex;align-items:center;justify-content:center;gap:8px;flex-wrap:wrap}
-.ounce-price{font-size:22px;font-weight:700;color:#fbbf24}
-.ounce-direction{font-size:20px}
-.ounce-direction.up{color:#10b981}
-.ounce-direction.down{color:#ef4444}
-.ounce-direction.neutral{color:#94a3b8}
-.ounce-change{font-size:16px;font-weight:600}
-.ounce-change.positive{color:#10b981}
-.ounce-change.negative{color:#ef4444}
-.statistics-section{margin-top:12px;display:none}
-.statistics-section{margin-top:12px;display:none}
-.statistics-grid{display:flex;gap:0}
-.stat-item{flex:1;background:transparent;border:none;border-radius:0;padding:14px 8px;text-align:center;min-height:90px;display:flex;flex-direction:column;justify-content:center;transition:all 0.3s;position:relative}
-.stat-item:not(:last-child)::after{content:'';position:absolute;right:0;top:10%;height:80%;width:1px;background:rgba(59,130,246,0.3)}
-.stat-item:hover{background:rgba(59,130,246,0.05);transform:none}
-.stat-title{font-size:10px;font-weight:600;color:#60a5fa;margin-bottom:6px;white-space:nowrap;overflow:hidden;text-overflow:ellipsis}
-.stat-value{font-size:14px;font-weight:700;color:#e2e8f0;margin-bottom:4px;white-space:nowrap;overflow:hidden;text-overflow:ellipsis}
-.stat-time{font-size:9px;color:rgba(226,232,240,0.6);white-space:nowrap;overflow:hidden;text-overflow:ellipsis}
-.price-history{background:rgba(15,23,42,0.6);backdrop-filter:blur(20px);padding:20px 0;padding-bottom:20px;border-top:1px solid rgba(59,130,246,0.2)}
-.history-header{display:flex;justify-content:space-between;align-items:center;margin-bottom:16px;gap:8px}
-.history-title{font-size:14px;font-weight:600;color:#60a5fa;white-space:nowrap}
-.period-tabs{display:flex;gap:3px;background:rgba(15,23,42,0.8);border:1px solid rgba(59,130,246,0.2);border-radius:8px;padding:3px}
-.period-tab{padding:6px 10px;border:none;border-radius:6px;background:transparent;color:rgba(226,232,240,0.6);font-size:10px;font-weight:500;cursor:pointer;transition:all 0.3s;white-space:nowrap}
-.period-tab.active{background:rgba(59,130,246,0.3);color:#60a5fa}
-.charts-container{display:flex;flex-direction:column;gap:16px}
-.chart-wrapper{background:rgba(15,23,42,0.4);border:1px solid rgba(59,130,246,0.15);border-radius:12px;padding:12px;position:relative}
-.chart-content{display:flex;gap:4px;align-items:stretch;flex-direction:row-reverse}
-.chart-y-axis{width:45px;flex-shrink:0;display:flex;flex-direction:column;justify-content:space-between;padding:8px 3px;font-size:8px;color:rgba(226,232,240,0.7)}
-.y-axis-label{text-align:left;white-space:nowrap}
-.chart-canvas-wrapper{flex:1;height:200px;position:relative}
-.chart-canvas{width:100%!important;height:200px!important}
-.chart-title{font-size:12px;font-weight:600;color:#60a5fa;margin-bottom:12px;text-align:left;white-space:nowrap;overflow:hidden;text-overflow:ellipsis}
-.chart-title-value{color:#ef4444;font-weight:700}
-.chart-period{color:rgba(226,232,240,0.6);font-size:10px;font-weight:500;margin-left:8px}
-.chart-change{font-size:11px;font-weight:700;margin-left:8px}
-.chart-change.positive{color:#10b981}
-.chart-change.negative{color:#ef4444}
-.login-screen{position:fixed;top:0;left:0;width:100%;height:100%;background:linear-gradient(135deg,#0f172a 0%,#1e293b 50%,#0f172a 100%);display:flex;align-items:center;justify-content:center;z-index:2000}
-.login-box{background:rgba(15,23,42,0.8);backdrop-filter:blur(20px);border:1px solid rgba(59,130,246,0.3);border-radius:20px;padding:32px;width:90%;max-width:360px;box-shadow:0 20px 60px rgba(0,0,0,0.5)}
-.login-title{font-size:24px;font-weight:800;color:#60a5fa;text-align:center;margin-bottom:24px}
-.login-input{width:100%;padding:14px 16px;background:rgba(15,23,42,0.8);border:1px solid rgba(59,130,246,0.3);border-radius:12px;font-size:16px;margin-bottom:16px;color:#e2e8f0;transition:all 0.3s}
-.login-input:focus{outline:none;border-color:#60a5fa;background:rgba(15,23,42,0.9)}
-.login-input::placeholder{color:rgba(226,232,240,0.5)}
-.login-btn{width:100%;padding:14px;background:linear-gradient(135deg,#3b82f6,#1d4ed8);color:white;border:none;border-radius:12px;font-size:16px;font-weight:600;cursor:pointer;transition:all 0.3s}
-.login-btn:hover{transform:translateY(-1px);box-shadow:0 8px 20px rgba(59,130,246,0.4)}
-.login-error{color:#ef4444;text-align:center;margin-top:12px;font-size:14px;display:none}
-@media (max-width:460px){
-.container{max-width:100%;padding:0;padding-top:70px}
-.header{top:0;left:0;right:0;width:100%;padding:12px 16px;border-radius:0}
-.header-center{display:none}
-.update-time{position:absolute;top:100%;left:50%;transform:translateX(-50%);margin-top:3px;font-size:11px;padding:4px 8px}
-.history-header{flex-direction:column;gap:8px}
-.period-tabs{justify-content:center}
-.chart-y-axis{width:40px;font-size:7px;padding:5px 2px}
-.chart-canvas-wrapper{height:180px}
-.chart-canvas{height:180px!important}
-.portfolio-summary{padding:16px 2px}
-.price-history{padding:16px 0}
-.chart-wrapper{padding:10px}
-.gold-ounce-section{border-top:1px solid rgba(59,130,246,0.3);padding:16px 2px;margin-top:12px}
-.ounce-card{padding:0 8px}
-.ounce-data{gap:6px}
-.ounce-price{font-size:18px}
-.ounce-direction{font-size:16px}
-.ounce-change{font-size:13px}
-}
-@keyframes spin{0%{transform:rotate(0deg)}100%{transform:rotate(360deg)}}
-</style>
-</head>
-<body>
-<div class="login-screen" id="loginScreen" style="display:none;">
-<div class="login-box">
-<div class="login-title">🔐 Metal Tracker v3.7</div>
-<input type="password" class="login-input" id="passwordInput" placeholder="Şifre" onkeypress="if(event.key==='Enter')login()">
-<button class="login-btn" onclick="login()">Giriş</button>
-<div class="login-error" id="loginError">Hatalı şifre!</div>
-</div>
-</div>
-<div class="loading-screen" id="loadingScreen">
-<div style="text-align:center"><div style="width:32px;height:32px;border:3px solid rgba(96,165,250,0.3);border-top:3px solid #60a5fa;border-radius:50%;animation:spin 1s linear infinite;margin:0 auto 12px"></div><div style="color:#60a5fa;font-size:14px">Yükleniyor...</div></div>
-</div>
-<div class="container" id="mainApp" style="display:none;">
-<div class="header">
-<div class="header-left">
-<div style="display:flex;align-items:center;gap:8px">
-<div class="logo">Metal Tracker</div>
-<div class="version">v3.7</div>
-</div>
-</div>
-<div class="header-center">
-<div class="update-time" id="headerTime">--:--</div>
-</div>
-<div class="actions">
-<button class="action-btn" onclick="fetchPrice()" id="refreshBtn" title="Yenile">⟳</button>
-<button class="action-btn" onclick="logout()" title="Çıkış">🚪</button>
-</div>
-</div>
-<div class="portfolio-summary">
-<div class="portfolio-amount" id="totalAmount">0,00 ₺</div>
-<div class="portfolio-metals">
-<div class="metal-item">
-<div class="metal-name">Altın</div>
-<div class="metal-amount" id="goldAmount">0 gr</div>
-<div class="metal-price" id="goldCurrentPrice">0,00 ₺/gr</div>
-<div class="metal-value" id="goldPortfolioValue">0,00 ₺</div>
-</div>
-<div class="metal-item">
-<div class="metal-name">Gümüş</div>
-<div class="metal-amount" id="silverAmount">0 gr</div>
-<div class="metal-price" id="silverCurrentPrice">0,00 ₺/gr</div>
-<div class="metal-value" id="silverPortfolioValue">0,00 ₺</div>
-</div>
-</div>
-
-<div class="gold-ounce-section">
-<a href="https://www.bloomberght.com/altin/altin-ons" target="_blank" class="ounce-card">
-<div class="ounce-title">Altın Ons (USD)</div>
-<div class="ounce-data">
-<span class="ounce-price" id="goldOuncePrice">--</span>
-<span class="ounce-direction" id="goldOunceDirection">●</span>
-<span class="ounce-change" id="goldOunceChange">--</span>
-</div>
-</a>
-<a href="https://www.bloomberght.com/emtia/gumus-ons" target="_blank" class="ounce-card">
-<div class="ounce-title">Gümüş Ons (USD)</div>
-<div class="ounce-data">
-<span class="ounce-price" id="silverOuncePrice">--</span>
-<span class="ounce-direction" id="silverOunceDirection">●</span>
-<span class="ounce-change" id="silverOunceChange">--</span>
-</div>
-</a>
-</div>
-
-<div class="statistics-section">
-<div class="statistics-grid">
-<div class="stat-item">
-<div class="stat-title">En Yüksek Altın</div>
-<div class="stat-value" id="highestGold">0,00 ₺</div>
-<div class="stat-time" id="highestGoldTime">--:--</div>
-</div>
-<div class="stat-item">
-<div class="stat-title">En Yüksek Gümüş</div>
-<div class="stat-value" id="highestSilver">0,00 ₺</div>
-<div class="stat-time" id="highestSilverTime">--:--</div>
-</div>
-<div class="stat-item">
-<div class="stat-title">En Yüksek Portföy</div>
-<div class="stat-value" id="highestPortfolio">0,00 ₺</div>
-<div class="stat-time" id="highestPortfolioTime">--:--</div>
-</div>
-</div>
-</div>
-</div>
-
-<div class="price-history">
-<div class="history-header">
-<div class="history-title">Fiyat Geçmişi</div>
-<div class="period-tabs">
-<button class="period-tab active" onclick="switchPeriod('hourly')" id="hourlyTab">Saatlik</button>
-<button class="period-tab" onclick="switchPeriod('daily')" id="dailyTab">Günlük</button>
-<button class="period-tab" onclick="switchPeriod('monthly')" id="monthlyTab">Aylık</button>
-</div>
-</div>
-<div class="charts-container">
-<div class="chart-wrapper">
-<div class="chart-title" id="goldChartTitle">
-Altın: <span class="chart-title-value" id="goldChartValue">--</span>
-</div>
-<div class="chart-content">
-<div class="chart-y-axis" id="goldYAxis"></div>
-<div class="chart-canvas-wrapper">
-<canvas id="goldChart" class="chart-canvas"></canvas>
-</div>
-</div>
-</div>
-<div class="chart-wrapper">
-<div class="chart-title" id="silverChartTitle">
-Gümüş: <span class="chart-title-value" id="silverChartValue">--</span>
-</div>
-<div class="chart-content">
-<div class="chart-y-axis" id="silverYAxis"></div>
-<div class="chart-canvas-wrapper">
-<canvas id="silverChart" class="chart-canvas"></canvas>
-</div>
-</div>
-</div>
-<div class="chart-wrapper">
-<div class="chart-title" id="portfolioChartTitle">
-Portföy: <span class="chart-title-value" id="portfolioChartValue">--</span>
-</div>
-<div class="chart-content">
-<div class="chart-y-axis" id="portfolioYAxis"></div>
-<div class="chart-canvas-wrapper">
-<canvas id="portfolioChart" class="chart-canvas"></canvas>
-</div>
-</div>
-</div>
-</div>
-</div>
-</div>
-<script>
-let currentGoldPrice = 0;
-let currentSilverPrice = 0;
-let tableData = {};
-let currentPeriod = 'hourly';
-let goldAmount = 0;
-let silverAmount = 0;
-let goldChart = null;
-let silverChart = null;
-let portfolioChart = null;
-
-document.addEventListener('DOMContentLoaded', function() {
-    initializeApp();
-});
-
-async function initializeApp() {
-    const token = localStorage.getItem('auth_token');
-    const expiry = localStorage.getItem('auth_expiry');
-    
-    if (token && expiry && new Date().getTime() < parseInt(expiry)) {
-        try {
-            const response = await fetch('/api/verify-session', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({token: token})
-            });
-            const data = await response.json();
-            if (data.valid) {
-                showMainApp();
-                await loadPortfolioConfig();
-                await fetchPrice();
-                return;
-            }
-        } catch (error) {
-            console.error('Auth verification error:', error);
-        }
-    }
-    showLoginScreen();
-}
-
-function showLoginScreen() {
-    document.getElementById('loadingScreen').style.display = 'none';
-    document.getElementById('loginScreen').style.display = 'flex';
-    document.getElementById('mainApp').style.display = 'none';
-}
-
-function showMainApp() {
-    document.getElementById('loadingScreen').style.display = 'none';
-    document.getElementById('loginScreen').style.display = 'none';
-    document.getElementById('mainApp').style.display = 'flex';
-}
-
-async function login() {
-    const password = document.getElementById('passwordInput').value;
-    if (!password) return;
-    
-    try {
-        const response = await fetch('/api/login', {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({password: password})
-        });
-        const data = await response.json();
-        
-        if (data.success) {
-            const expiry = new Date();
-            expiry.setDate(expiry.getDate() + 30);
-            document.cookie = `auth_token=${data.token}; expires=${expiry.toUTCString()}; path=/`;
-            localStorage.setItem('auth_token', data.token);
-            localStorage.setItem('auth_expiry', expiry.getTime());
-            showMainApp();
-            await loadPortfolioConfig();
-            await fetchPrice();
-        } else {
-            document.getElementById('loginError').style.display = 'block';
-            document.getElementById('passwordInput').value = '';
-        }
-    } catch (error) {
-        document.getElementById('loginError').style.display = 'block';
-    }
-}
-
-function logout() {
-    document.cookie = 'auth_token=; expires=Thu, 01 Jan 1970 00:00:00 UTC; path=/';
-    localStorage.removeItem('auth_token');
-    localStorage.removeItem('auth_expiry');
-    document.getElementById('passwordInput').value = '';
-    document.getElementById('loginError').style.display = 'none';
-    showLoginScreen();
-}
-
-async function loadPortfolioConfig() {
-    try {
-        const response = await fetch('/api/portfolio-config');
-        const data = await response.json();
-        if (data.success) {
-            goldAmount = data.gold_amount;
-            silverAmount = data.silver_amount;
-        }
-    } catch (error) {
-        console.error('Portfolio config error:', error);
-    }
-}
-
-async function fetchPrice() {
-    const refreshBtn = document.getElementById('refreshBtn');
-    try {
-        refreshBtn.style.transform = 'rotate(360deg)';
-        
-        const [goldResponse, silverResponse, tableResponse, goldOunceResponse, silverOunceResponse] = await Promise.all([
-            fetch('/api/gold-price'),
-            fetch('/api/silver-price'),
-            fetch('/api/table-data'),
-            fetch('/api/gold-ounce-usd'),
-            fetch('/api/silver-ounce-usd')
-        ]);
-        
-        const goldData = await goldResponse.json();
-        const silverData = await silverResponse.json();
-        const tableDataResult = await tableResponse.json();
-        const goldOunceData = await goldOunceResponse.json();
-        const silverOunceData = await silverOunceResponse.json();
-        
-        if (goldData.success) {
-            let cleaned = goldData.price.replace(/[^\d,]/g, '');
-            currentGoldPrice = parseFloat(cleaned.replace(',', '.'));
-        }
-        
-        if (silverData.success) {
-            let cleaned = silverData.price.replace(/[^\d,]/g, '');
-            currentSilverPrice = parseFloat(cleaned.replace(',', '.'));
-        }
-        
-        if (tableDataResult.success) {
-            tableData = tableDataResult.data;
-            updateCharts();
-        }
-        
-        if (goldOunceData.success) {
-            updateOunceData('goldOunce', goldOunceData.data);
-        }
-        
-        if (silverOunceData.success) {
-            updateOunceData('silverOunce', silverOunceData.data);
-        }
-        
-        document.getElementById('headerTime').textContent = new Date().toLocaleTimeString('tr-TR', {
-            hour: '2-digit',
-            minute: '2-digit'
-        });
-        
-        updatePortfolio();
-    } catch (error) {
-        console.error('Fetch price error:', error);
-    } finally {
-        setTimeout(() => refreshBtn.style.transform = 'rotate(0deg)', 500);
-    }
-}
-
-function updateOunceData(prefix, data) {
-    const priceEl = document.getElementById(prefix + 'Price');
-    const directionEl = document.getElementById(prefix + 'Direction');
-    const changeEl = document.getElementById(prefix + 'Change');
-    
-    if (data.price) {
-        priceEl.textContent = data.price + ' $';
-    }
-    
-    if (data.direction === 'up') {
-        directionEl.textContent = '▲';
-        directionEl.className = 'ounce-direction up';
-    } else if (data.direction === 'down') {
-        directionEl.textContent = '▼';
-        directionEl.className = 'ounce-direction down';
-    } else {
-        directionEl.textContent = '●';
-        directionEl.className = 'ounce-direction neutral';
-    }
-    
-    if (data.change_percent) {
-        changeEl.textContent = data.change_percent;
-        if (data.change_percent.includes('-')) {
-            changeEl.className = 'ounce-change negative';
-        } else {
-            changeEl.className = 'ounce-change positive';
-        }
-    }
-}
-
-function switchPeriod(period) {
-    currentPeriod = period;
-    document.querySelectorAll('.period-tab').forEach(tab => tab.classList.remove('active'));
-    document.getElementById(period + 'Tab').classList.add('active');
-    updateCharts();
-}
-
-function updateCharts() {
-    if (!tableData || !tableData[currentPeriod]) return;
-    
-    const data = tableData[currentPeriod];
-    if (data.length === 0) return;
-    
-    const labels = data.map(item => formatXAxisLabel(item.time));
-    const goldPrices = data.map(item => item.gold_price);
-    const silverPrices = data.map(item => item.silver_price);
-    const portfolioValues = data.map(item => (goldAmount * item.gold_price) + (silverAmount * item.silver_price));
-    
-    const peakInfo = getPeakInfo(data, goldPrices, silverPrices, portfolioValues);
-    const goldChange = calculateChange(goldPrices);
-    const silverChange = calculateChange(silverPrices);
-    const portfolioChange = calculateChange(portfolioValues);
-    
-    updateChartTitle('goldChartTitle', 'Altın', peakInfo.gold.value, peakInfo.gold.time, goldChange, false);
-    updateChartTitle('silverChartTitle', 'Gümüş', peakInfo.silver.value, peakInfo.silver.time, silverChange, false);
-    updateChartTitle('portfolioChartTitle', 'Portföy', peakInfo.portfolio.value, peakInfo.portfolio.time, portfolioChange, true);
-    
-    createSingleChart('goldChart', 'goldYAxis', 'Altın', labels, goldPrices, '#fbbf24', false);
-    createSingleChart('silverChart', 'silverYAxis', 'Gümüş', labels, silverPrices, '#94a3b8', false);
-    createSingleChart('portfolioChart', 'portfolioYAxis', 'Portföy', labels, portfolioValues, '#60a5fa', true);
-}
-
-function formatXAxisLabel(time) {
-    if (currentPeriod === 'hourly') {
-        return time;
-    } else if (currentPeriod === 'daily') {
-        const parts = time.split('.');
-        if (parts.length >= 3) {
-            return `${parts[0]}.${parts[1]}`;
-        }
-        return time;
-    } else if (currentPeriod === 'monthly') {
-        return time;
-    }
-    return time;
-}
-
-function getPeakInfo(data, goldPrices, silverPrices, portfolioValues) {
-    const maxGoldIndex = goldPrices.indexOf(Math.max(...goldPrices));
-    const maxSilverIndex = silverPrices.indexOf(Math.max(...silverPrices));
-    const maxPortfolioIndex = portfolioValues.indexOf(Math.max(...portfolioValues));
-    
-    const formatPeakTime = (index) => {
-        const item = data[index];
-        
-        if (currentPeriod === 'hourly') {
-            return item.time;
-        } else if (currentPeriod === 'daily') {
-            const dateStr = item.time;
-            const parts = dateStr.split('.');
-            if (parts.length >= 2) {
-                const day = parts[0];
-                const month = parts[1];
-                const monthNames = ['Oca', 'Şub', 'Mar', 'Nis', 'May', 'Haz', 'Tem', 'Ağu', 'Eyl', 'Eki', 'Kas', 'Ara'];
-                return `${day} ${monthNames[parseInt(month) - 1]}`;
-            }
-            return item.time;
-        } else if (currentPeriod === 'monthly') {
-            return item.time;
-        }
-        return item.time;
-    };
-    
-    return {
-        gold: {
-            value: goldPrices[maxGoldIndex],
-            time: formatPeakTime(maxGoldIndex)
-        },
-        silver: {
-            value: silverPrices[maxSilverIndex],
-            time: formatPeakTime(maxSilverIndex)
-        },
-        portfolio: {
-            value: portfolioValues[maxPortfolioIndex],
-            time: formatPeakTime(maxPortfolioIndex)
-        }
-    };
-}
-
-function calculateChange(values) {
-    if (values.length < 2) return { percent: 0, isPositive: true };
-    const first = values[0];
-    const last = values[values.length - 1];
-    const percent = ((last - first) / first) * 100;
-    return {
-        percent: percent,
-        isPositive: percent >= 0
-    };
-}
-
-function updateChartTitle(titleId, label, maxValue, peakTime, change, isPortfolio) {
-    const titleElement = document.getElementById(titleId);
-    if (!titleElement) return;
-    
-    const formattedValue = isPortfolio ? formatCurrency(maxValue) : formatPrice(maxValue);
-    const arrow = change.isPositive ? '↑' : '↓';
-    const sign = change.isPositive ? '+' : '';
-    const changeClass = change.isPositive ? 'positive' : 'negative';
-    
-    titleElement.innerHTML = `
-        ${label}: <span class="chart-title-value">${formattedValue}</span>
-        <span class="chart-period">${peakTime}</span>
-        <span class="chart-change ${changeClass}">${arrow} ${sign}${change.percent.toFixed(1)}%</span>
-    `;
-}
-
-function createCustomYAxis(yAxisId, data, isPortfolio) {
-    const yAxisElement = document.getElementById(yAxisId);
-    if (!yAxisElement) return;
-    
-    const min = Math.min(...data);
-    const max = Math.max(...data);
-    const range = max - min;
-    const step = range / 5;
-    
-    const labels = [];
-    for (let i = 5; i >= 0; i--) {
-        const value = min + (step * i);
-        if (isPortfolio) {
-            labels.push(formatCurrency(value));
-        } else {
-            labels.push(formatPrice(value));
-        }
-    }
-    
-    yAxisElement.innerHTML = labels.map(label => 
-        `<div class="y-axis-label">${label}</div>`
-    ).join('');
-}
-
-function createSingleChart(canvasId, yAxisId, label, labels, data, color, isPortfolio) {
-    const canvas = document.getElementById(canvasId);
-    if (!canvas) return;
-    
-    createCustomYAxis(yAxisId, data, isPortfolio);
-    
-    if (canvasId === 'goldChart' && goldChart) {
-        goldChart.destroy();
-        goldChart = null;
-    }
-    if (canvasId === 'silverChart' && silverChart) {
-        silverChart.destroy();
-        silverChart = null;
-    }
-    if (canvasId === 'portfolioChart' && portfolioChart) {
-        portfolioChart.destroy();
-        portfolioChart = null;
-    }
-    
-    const ctx = canvas.getContext('2d');
-    const gradient = ctx.createLinearGradient(0, 0, 0, 200);
-    gradient.addColorStop(0, color + 'AA');
-    gradient.addColorStop(1, color + '10');
-    
-    const chart = new Chart(canvas, {
-        type: 'line',
-        data: {
-            labels: labels,
-            datasets: [{
-                label: label,
-                data: data,
-                borderColor: color,
-                backgroundColor: gradient,
-                borderWidth: 2,
-                fill: true,
-                tension: 0.4,
-                pointRadius: 0,
-                pointHoverRadius: 6,
-                pointHitRadius: 15,
-                pointBackgroundColor: color,
-                pointBorderColor: '#ffffff',
-                pointBorderWidth: 2
-            }]
-        },
-        options: {
-            responsive: true,
-            maintainAspectRatio: false,
-            plugins: {
-                legend: {
-                    display: false
-                },
-                tooltip: {
-                    enabled: true,
-                    mode: 'index',
-                    intersect: false,
-                    backgroundColor: 'rgba(15, 23, 42, 0.95)',
-                    titleColor: '#60a5fa',
-                    bodyColor: '#e2e8f0',
-                    borderColor: 'rgba(59, 130, 246, 0.3)',
-                    borderWidth: 1,
-                    padding: 12,
-                    displayColors: false,
-                    callbacks: {
-                        title: ctx => ctx[0].label,
-                        label: ctx => {
-                            const value = ctx.parsed.y;
-                            let formatted;
-                            if (isPortfolio) {
-                                formatted = formatCurrency(value);
-                            } else {
-                                formatted = formatPrice(value);
-                            }
-                            return `${label}: ${formatted}`;
-                        }
-                    }
-                }
-            },
-            scales: {
-                x: {
-                    grid: {
-                        color: 'rgba(59, 130, 246, 0.1)',
-                        drawBorder: false
-                    },
-                    ticks: {
-                        color: 'rgba(226, 232, 240, 0.7)',
-                        font: {
-                            size: 10
-                        },
-                        maxRotation: 0,
-                        autoSkip: true,
-                        autoSkipPadding: 20,
-                        maxTicksLimit: 5
-                    },
-                    reverse: false
-                },
-                y: {
-                    display: false
-                }
-            },
-            interaction: {
-                mode: 'index',
-                intersect: false
-            }
-        }
-    });
-    
-    if (canvasId === 'goldChart') goldChart = chart;
-    if (canvasId === 'silverChart') silverChart = chart;
-    if (canvasId === 'portfolioChart') portfolioChart = chart;
-}
-
-function updatePortfolio() {
-    const goldValue = goldAmount * currentGoldPrice;
-    const silverValue = silverAmount * currentSilverPrice;
-    const totalValue = goldValue + silverValue;
-    
-    document.getElementById('totalAmount').textContent = formatCurrency(totalValue);
-    document.getElementById('goldAmount').textContent = goldAmount + ' gr';
-    document.getElementById('silverAmount').textContent = silverAmount + ' gr';
-    document.getElementById('goldCurrentPrice').textContent = formatPrice(currentGoldPrice) + '/gr';
-    document.getElementById('silverCurrentPrice').textContent = formatPrice(currentSilverPrice) + '/gr';
-    document.getElementById('goldPortfolioValue').textContent = formatCurrency(goldValue);
-    document.getElementById('silverPortfolioValue').textContent = formatCurrency(silverValue);
-}
-
-function formatCurrency(amount) {
-    if (!amount || amount === 0) return '0,00 ₺';
-    return new Intl.NumberFormat('tr-TR', {
-        minimumFractionDigits: 2,
-        maximumFractionDigits: 2
-    }).format(amount) + ' ₺';
-}
-
-function formatPrice(price) {
-    if (!price || price === 0) return '0,00 ₺';
-    return new Intl.NumberFormat('tr-TR', {
-        minimumFractionDigits: 2,
-        maximumFractionDigits: 2
-    }).format(price) + ' ₺';
-}
-</script>
-</body>
-</html>"""
+# Rota başına istek sayısı ve gecikme (/metrics)
+
+def metrics_start():
+    g.metrics_started = time.perf_counter()
+
+def metrics_record(response):
+    started = g.get('metrics_started')
+    plain = (not response.direct_passthrough and not response.is_streamed
+             and 'Content-Encoding' not in response.headers)
+    core.metrics.record_request(request.url_rule.rule if request.url_rule is not None else 'unmatched',
+                                request.method, response.status_code,
+                                time.perf_counter() - started if started is not None else None,
+                                response.get_data() if plain else None)
+    return response
+
+def install_metrics(flask_app):
+    # after_request ters sırayla çalışır: JSON ara katmanından önce kurulunca en son ölçer
+    flask_app.before_request(metrics_start)
+    flask_app.after_request(metrics_record)
+
+install_metrics(app)
+
+# JSON API yanıtları: ETag/304 ve eşik üstü gövdelerde gzip (core.web, ASGI ile ortak)
+
+def respond(reply):
+    """core.routes.Reply -> Flask yanıtı"""
+    response = Response(core.routes.encode(reply), status=reply.status, mimetype='application/json')
+    if reply.etag:
+        response.set_etag(reply.etag)
+    if reply.cache_control:
+        response.headers['Cache-Control'] = reply.cache_control
+    return response
+
+def json_validators(response):
+    if (not request.path.startswith('/api/') or response.mimetype != 'application/json'
+            or response.direct_passthrough):
+        return response
+
+    etag, _ = response.get_etag()
+    status, headers, body = core.web.json_validators(
+        request.method, response.status_code, response.get_data(), etag, response.headers.get('Cache-Control'),
+        request.headers.get('Accept-Encoding', ''), request.headers.get('If-None-Match', ''))
+    if not headers:
+        return response
+    response.status_code = status
+    response.set_data(body)
+    response.vary.add(headers.pop('Vary'))
+    response.headers.update(headers)
+    if status == 304:
+        del response.headers['Content-Type']
+    return response
+
+def install_json_middleware(flask_app):
+    flask_app.after_request(json_validators)
+
+install_json_middleware(app)
 
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    status, headers, body = core.page.page_reply(request.headers.get('Accept-Encoding', ''),
+                                                 request.headers.get('If-None-Match', ''))
+    return Response(body, status=status, headers=headers)
 
 @app.route('/api/login', methods=['POST'])
 def api_login():
-    try:
-        data = request.get_json()
-        password = data.get('password', '')
-        if verify_password(password):
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            return jsonify({'success': True, 'token': password_hash})
-        else:
-            return jsonify({'success': False, 'error': 'Invalid password'})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    return respond(core.routes.login(request.get_json))
 
 @app.route('/api/verify-session', methods=['POST'])
 def api_verify_session():
-    try:
-        data = request.get_json()
-        token = data.get('token', '')
-        config = load_portfolio_config()
-        is_valid = token == config.get("password_hash", "")
-        return jsonify({'valid': is_valid})
-    except Exception as e:
-        return jsonify({'valid': False, 'error': str(e)})
+    return respond(core.routes.verify_session(request.get_json))
 
 @app.route('/api/portfolio-config')
 def api_portfolio_config():
+    return respond(core.routes.portfolio_config())
+
+def price_route(source):
     try:
-        config = load_portfolio_config()
-        return jsonify({
-            'success': True, 
-            'gold_amount': config.get('gold_amount', 0), 
-            'silver_amount': config.get('silver_amount', 0)
-        })
+        value, fetched_at = core.prices.get_cached_price(source)
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return respond(core.routes.error(e))
+    return respond(core.routes.price(source, value, fetched_at))
 
 @app.route('/api/gold-price')
 def api_gold_price():
-    try:
-        price = get_gold_price()
-        return jsonify({'success': bool(price), 'price': price or ''})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    return price_route("gold")
 
 @app.route('/api/silver-price')
 def api_silver_price():
-    try:
-        price = get_silver_price()
-        return jsonify({'success': bool(price), 'price': price or ''})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    return price_route("silver")
 
 @app.route('/api/gold-ounce-usd')
 def api_gold_ounce_usd():
-    try:
-        data = get_gold_ounce_usd()
-        return jsonify({'success': True, 'data': data})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    return price_route("gold_ounce_usd")
 
 @app.route('/api/silver-ounce-usd')
 def api_silver_ounce_usd():
-    try:
-        data = get_silver_ounce_usd()
-        return jsonify({'success': True, 'data': data})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    return price_route("silver_ounce_usd")
 
 @app.route('/api/table-data')
 def api_table_data():
+    return respond(core.routes.table_data())
+
+@app.route('/api/stats')
+def api_stats():
+    return respond(core.routes.stats(request.args))
+
+@app.route('/api/history')
+def api_history():
+    return respond(core.routes.history(request.args))
+
+@app.route('/api/snapshot')
+def api_snapshot():
     try:
-        data = get_table_data()
-        return jsonify({'success': bool(data), 'data': data or {}})
+        return respond(core.routes.snapshot(core.prices.get_dashboard_snapshot()))
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return respond(core.routes.error(e))
+
+@app.route('/api/stream')
+def api_stream():
+    if not core.page.SSE_ENABLED:
+        return respond(core.routes.stream_disabled())
+    return Response(stream_with_context(core.stream.stream_events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/warmup')
+def api_warmup():
+    # Zamanlanmış ping ile örneği sıcak tutmak için; senkron çalışır
+    return respond(core.routes.warmup())
+
+@app.route('/api/status')
+def api_status():
+    return respond(core.routes.status())
+
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    return respond(core.routes.cache_stats(len(core.stream._stream_clients)))
+
+@app.route('/metrics')
+def api_metrics():
+    return Response(core.metrics.render(), content_type=core.metrics.CONTENT_TYPE,
+                    headers={'Cache-Control': 'no-store'})
+
+# Soğuk başlangıçta geçmiş snapshot'ı arka planda hazırlanır (WARMUP=off kapatır)
+core.warmup.start()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Sütunlu (numpy) geçmiş ile sözlük listesi karşılaştırması
+- Sentetik 15 dakikalık kayıtlar üretir (varsayılan 10k, 100k, 1M)
+- Ölçülenler: yüzde değişim, aralık filtresi (son gün), peak arama
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+import core  # noqa: E402
+
+def synthetic_records(n):
+    rnd = random.Random(7)
+    start = 1_700_000_000
+    gold, silver = 5000.0, 60.0
+    records = []
+    for i in range(n):
+        ts = start + i * 900
+        gold = max(gold + rnd.uniform(-10, 10.5), 1)
+        silver = max(silver + rnd.uniform(-0.2, 0.21), 1)
+        records.append({
+            "timestamp": ts,
+            "date": time.strftime("%Y-%m-%d", time.gmtime(ts)),
+            "time": time.strftime("%H:%M", time.gmtime(ts)),
+            "gold_price": round(gold, 2),
+            "silver_price": round(silver, 2),
+            "portfolio_value": round(gold + silver, 2),
+            "daily_peak": False,
+            "monthly_peak": False
+        })
+    return records
+
+def python_change(records):
+    result = [0]
+    for prev, record in zip(records, records[1:]):
+        result.append(((record["gold_price"] - prev["gold_price"]) / prev["gold_price"]) * 100)
+    return result
+
+def python_range(records, start_ts, end_ts):
+    return [r for r in records if start_ts <= r["timestamp"] < end_ts]
+
+def python_peaks(records):
+    return {
+        "gold": max(range(len(records)), key=lambda i: records[i]["gold_price"]),
+        "silver": max(range(len(records)), key=lambda i: records[i]["silver_price"]),
+        "portfolio": max(range(len(records)), key=lambda i: records[i]["portfolio_value"])
+    }
+
+def measure(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+def bench_size(n):
+    """Tek boyut için ölçüm satırlarını yazar; kayıtlar ve sütunlar dönüşte bırakılır"""
+    records = synthetic_records(n)
+    build_ms, columns = measure(lambda: core.snapshot.build_columnar_history(records))
+    print(f"{n:>9} {'sütun kurulum':<14}{'-':>11}{build_ms:>10.1f}")
+
+    last_ts = records[-1]["timestamp"]
+    prices = [r["gold_price"] for r in records]
+    cases = {
+        "yüzde değişim": (lambda: python_change(records),
+                          lambda: core.snapshot.change_percents(prices)),
+        "aralık (1 gün)": (lambda: python_range(records, last_ts - 86400, last_ts + 1),
+                           lambda: core.snapshot.columnar_range(columns, last_ts - 86400, last_ts + 1)),
+        "peak arama": (lambda: python_peaks(records),
+                       lambda: core.snapshot.columnar_peaks(columns)),
+    }
+    for name, (py_fn, np_fn) in cases.items():
+        py_ms, _ = measure(py_fn)
+        np_ms, _ = measure(np_fn)
+        print(f"{n:>9} {name:<14}{py_ms:>11.1f}{np_ms:>10.2f}{py_ms / max(np_ms, 1e-6):>7.0f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='Columnar history benchmark')
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    args = parser.parse_args()
+
+    if core.snapshot.np is None:
+        print("❌ numpy kurulu değil")
+        return
+
+    print(f"{'kayıt':>9} {'işlem':<14}{'python ms':>11}{'numpy ms':>10}{'hız':>8}")
+    for n in (int(x) for x in args.sizes.split(',')):
+        bench_size(n)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Hızlı HTML çıkarıcı ile BeautifulSoup karşılaştırması
+- tests/fixtures/*.html: elle yazılmış sentetik sayfalar; kaynak sitelerin fiyat
+  çevresindeki işaretlemesini taklit eder, canlı kopya değildir (tests/test_extractors.py
+  sabit fiyatlarıyla bunları kullanır)
+- --save: canlı sayfaları script/style/svg gövdeleri kırpılmış olarak
+  tests/fixtures/live/ altına indirir; varsa ölçüm bunları kullanır, testlere dokunulmaz
+- --synthetic: aynı işaretlemeye sahip büyük üretilmiş sayfalar
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+import core  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'fixtures')
+LIVE_DIR = os.path.join(FIXTURE_DIR, 'live')
+_TRIM_RE = re.compile(rb'(<(script|style|svg)\b[^>]*>).*?(</\2\s*>)', re.I | re.S)
+
+PAGES = {
+    "gram-altin": ("https://m.doviz.com/altin/yapikredi/gram-altin", "socket", "6-gram-altin"),
+    "gumus": ("https://m.doviz.com/altin/vakifbank/gumus", "socket", "5-gumus"),
+    "altin-ons": ("https://www.bloomberght.com/altin/altin-ons", "bloomberg", None),
+    "gumus-ons": ("https://www.bloomberght.com/emtia/gumus-ons", "bloomberg", None),
+}
+
+def trim_page(content):
+    """Etiketleri koruyup script/style/svg gövdelerini atar - kayıtlı canlı sayfalar küçük kalsın"""
+    return _TRIM_RE.sub(rb'\1\3', content)
+
+def save_live_pages():
+    """Canlı sayfaları kırpılmış olarak LIVE_DIR altına kaydeder"""
+    os.makedirs(LIVE_DIR, exist_ok=True)
+    headers = {'User-Agent': 'Mozilla/5.0 (Android 10; Mobile; rv:91.0) Gecko/91.0 Firefox/91.0'}
+    for name, (url, _, _) in PAGES.items():
+        response = core.net.http_get(url, headers=headers, read_timeout=15)
+        response.raise_for_status()
+        content = trim_page(response.content)
+        with open(os.path.join(LIVE_DIR, f"{name}.html"), 'wb') as f:
+            f.write(content)
+        print(f"💾 {name}: {len(response.content) / 1024:.0f} KB -> {len(content) / 1024:.0f} KB")
+
+def synthetic_page(kind, socket_key, size_kb=300):
+    """Hedef span'ı sayfanın sonlarına gömülü büyük bir mobil sayfa"""
+    rnd = random.Random(42)
+    filler = []
+    while sum(len(x) for x in filler) < size_kb * 1024:
+        key = rnd.choice(["1-dolar", "2-euro", "3-sterlin", "7-ceyrek-altin", "8-yarim-altin"])
+        filler.append(
+            f'<div class="market-row"><a href="/x/{rnd.randint(1, 9999)}">'
+            f'<span class="name">Kalem {rnd.randint(1, 999)}</span>'
+            f'<span data-socket-key="{key}" data-socket-attr="bid">{rnd.randint(10, 9999)},{rnd.randint(10, 99)}</span>'
+            f'<span class="percent">%{rnd.randint(0, 9)},{rnd.randint(10, 99)}</span></a></div>\n'
+        )
+    cut = int(len(filler) * 0.8)
+    if kind == "socket":
+        target = (f'<span class="value" data-socket-key="{socket_key}" data-socket-attr="ask">5.830,10</span>'
+                  f'<span class="value" data-socket-key="{socket_key}" data-socket-attr="bid">\n  5.812,34\n</span>')
+    else:
+        target = ('<div class="security-summary"><span class="lastPrice">4.012,57</span>'
+                  '<span class="bloomberght-icon-font-icon-graphic-up"></span>'
+                  '<span class="percentChange">%0,54</span></div>')
+    body = ''.join(filler[:cut]) + target + ''.join(filler[cut:])
+    return f'<!DOCTYPE html><html><head><title>x</title></head><body>{body}</body></html>'.encode()
+
+def load_pages(synthetic=False):
+    pages = {}
+    for name, (_, kind, socket_key) in PAGES.items():
+        if synthetic:
+            pages[name] = (synthetic_page(kind, socket_key), kind, socket_key, "sentetik")
+            continue
+        live = os.path.join(LIVE_DIR, f"{name}.html")
+        if os.path.exists(live):
+            with open(live, 'rb') as f:
+                pages[name] = (f.read(), kind, socket_key, "canlı")
+            continue
+        with open(os.path.join(FIXTURE_DIR, f"{name}.html"), 'rb') as f:
+            pages[name] = (f.read(), kind, socket_key, "fixture")
+    return pages
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML extractor benchmark')
+    parser.add_argument('--save', action='store_true', help='Canlı sayfaları tests/fixtures/live altına kaydet')
+    parser.add_argument('--synthetic', action='store_true', help='Fixture yerine büyük sentetik sayfalar')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.save:
+        save_live_pages()
+
+    print(f"{'sayfa':<12}{'kaynak':<10}{'boyut':>8}{'bs4 ms':>10}{'fast ms':>10}{'hız':>8}  sonuç")
+    try:
+        pages = load_pages(args.synthetic)
+    except FileNotFoundError as e:
+        print(f"❌ fixture bulunamadı: {e.filename} (--save veya --synthetic)")
+        sys.exit(1)
+    mismatches = 0
+    for name, (content, kind, socket_key, origin) in pages.items():
+        if kind == "socket":
+            bs4_fn = lambda: core.extract.bs4_socket_price(content, socket_key)
+            fast_fn = lambda: core.extract.fast_socket_price(content, socket_key)
+        else:
+            bs4_fn = lambda: core.extract.bs4_bloomberg_quote(content)
+            fast_fn = lambda: core.extract.fast_bloomberg_quote(content)
+        bs4_ms, bs4_result = timeit(bs4_fn, max(args.repeat // 10, 1))
+        fast_ms, fast_result = timeit(fast_fn, args.repeat)
+        match = "✅ aynı" if bs4_result == fast_result else f"❌ {bs4_result!r} != {fast_result!r}"
+        mismatches += bs4_result != fast_result
+        print(f"{name:<12}{origin:<10}{len(content) / 1024:>6.0f}KB{bs4_ms:>10.2f}{fast_ms:>10.3f}"
+              f"{bs4_ms / max(fast_ms, 1e-6):>7.0f}x  {match}")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Soğuk başlangıç: giriş noktası ve rota başına import süresi + bütçe kontrolü
+- Her senaryo temiz bir Python sürecinde, WARMUP=off ile ölçülür (ısınma thread'i
+  numpy/geçmişi yükleyip sonucu bozmasın)
+- Senaryo: giriş modülü + o rotanın eriştiği core alt modülü
+- Ağır bağımlılıkların (numpy, bs4, ...) hangi senaryoda yüklendiği raporlanır
+- --check: python -X importtime ile giriş modülünün toplam süresi ve en pahalı
+  modüller; toplam --budget-ms'i aşarsa veya yasaklı modül (varsayılan numpy, bs4,
+  requests) yüklenirse çıkış kodu 1 olur (CI'da kullanılabilir)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+HEAVY = ("flask", "requests", "httpx", "numpy", "bs4")
+ENV = {**os.environ, 'WARMUP': 'off'}
+
+SCENARIOS = {
+    "index": ("index", None),
+    "index + /api/gold-price": ("index", "prices"),
+    "index + /api/table-data": ("index", "snapshot"),
+    "index + /": ("index", "page"),
+    "asgi": ("asgi", None),
+}
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {api_dir!r})
+start = time.perf_counter()
+import {entry}
+entry_ms = (time.perf_counter() - start) * 1000
+route_ms = 0
+if {submodule!r}:
+    start = time.perf_counter()
+    getattr({entry}.core, {submodule!r})
+    route_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"entry_ms": entry_ms, "route_ms": route_ms,
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def probe(entry, submodule):
+    code = PROBE.format(api_dir=API_DIR, entry=entry, submodule=submodule, heavy=HEAVY)
+    output = subprocess.run([sys.executable, '-c', code], env=ENV, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def importtime(entry):
+    """[(modül, self_us, cumulative_us, derinlik)] - import sırasıyla"""
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {entry}'],
+                            cwd=API_DIR, env=ENV, capture_output=True, text=True, check=True)
+    rows = []
+    for line in output.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def report_scenarios(args):
+    print(f"{'senaryo':<26}{'giriş ms':>10}{'rota ms':>10}{'toplam':>9}  yüklenenler")
+    for name, (entry, submodule) in SCENARIOS.items():
+        runs = [probe(entry, submodule) for _ in range(args.repeat)]
+        entry_ms = statistics.median(r["entry_ms"] for r in runs)
+        route_ms = statistics.median(r["route_ms"] for r in runs)
+        print(f"{name:<26}{entry_ms:>10.1f}{route_ms:>10.1f}{entry_ms + route_ms:>9.1f}  {', '.join(runs[-1]['loaded'])}")
+
+def check_budget(args):
+    runs = [importtime(args.entry) for _ in range(args.repeat)]
+    # Üst düzey importların kümülatif toplamı = import süresi
+    totals = [sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000 for rows in runs]
+    total_ms = statistics.median(totals)
+    rows = runs[totals.index(sorted(totals)[len(totals) // 2])]
+
+    print(f"{args.entry}: {total_ms:.1f} ms (medyan, {args.repeat} çalıştırma), bütçe {args.budget_ms:.0f} ms")
+    print(f"{'modül':<40}{'self ms':>9}{'kümülatif ms':>14}")
+    for name, self_us, cumulative_us, _ in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>9.1f}{cumulative_us / 1000:>14.1f}")
+
+    loaded = {name.split('.')[0] for name, _, _, _ in rows}
+    forbidden = [name for name in args.forbid.split(',') if name and name in loaded]
+    failed = False
+    if forbidden:
+        print(f"❌ import sırasında yüklenmemeli: {', '.join(forbidden)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"❌ bütçe aşıldı: {total_ms:.1f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("✅ bütçe içinde")
+    return 1 if failed else 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Import time benchmark and cold start budget check')
+    parser.add_argument('--check', action='store_true', help='Senaryolar yerine -X importtime bütçe kontrolü')
+    parser.add_argument('--entry', default='index')
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', 400)))
+    parser.add_argument('--forbid', default='numpy,bs4,requests', help='Import sırasında yüklenmemesi gereken modüller')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(check_budget(args))
+    report_scenarios(args)
+
+if __name__ == "__main__":
+    main()
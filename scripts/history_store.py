@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+"""
+Append-only fiyat geçmişi deposu
+- data/history/YYYY-MM.jsonl: ay başına bir segment, her satır bir kayıt (değiştirilmez)
+- data/history/manifest.json: segment listesi + meta (sıkışık JSON, geçmişle büyümez)
+- data/history/peaks/YYYY-MM.json: ayın günlük/aylık peak indeksi. Peak bayrakları
+  satırlarda değil burada tutulur; bir toplama bir satır ekler, peak değiştiyse
+  yalnızca o ayın küçük dosyasını ve manifest'i yeniden yazar. Manifest her ayın
+  peak dosyasının özetini taşır, API değişmeyen ayları yeniden indirmez
+- data/history/rollups/{hourly,daily,monthly}.jsonl: OHLC + peak katmanları, satır
+  başına bir kova. Bir toplama her katmanın yalnızca güncel kovasını son satırdan
+  okur ve yeni halini sona bir satır olarak ekler; aynı anahtarın son satırı geçerlidir.
+  Gece temizliği (compact_rollups) katmanları anahtar başına tek satıra indirir.
+  API /api/history ve günlük/aylık tabloları bu katmanlardan sunar
+- data/price-history.bin: API'nin parça parça okuyabildiği sıkıştırılmış ikili kopya
+- Meta alanlar (last_update, cleanup_stats...) manifest["meta"] altında saklanır
+- export_legacy() eski {"records": [...]} belgesini üretir
+- Segment yazılıp manifest kaydedilemeden kesilen bir çalışma open_store() ile
+  onarılır; manifest kaybolursa segmentlerden yeniden kurulur
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import struct
+from datetime import datetime, timezone
+
+HISTORY_DIR = os.environ.get('HISTORY_DIR', 'data/history')
+LEGACY_PATH = 'data/price-history.json'
+# json arka ucunun kalıcı peak indeksi; yayınlanan price-history.json'a gömülmez
+PEAK_INDEX_PATH = 'data/peak-index.json'
+
+def _manifest_path(base_dir):
+    return os.path.join(base_dir, 'manifest.json')
+
+def segment_path(month, base_dir=HISTORY_DIR):
+    return os.path.join(base_dir, f"{month}.jsonl")
+
+def peaks_path(month, base_dir=HISTORY_DIR):
+    return os.path.join(base_dir, 'peaks', f"{month}.json")
+
+def empty_manifest():
+    return {
+        "format": "jsonl-monthly",
+        "segments": {},
+        "meta": {}
+    }
+
+def empty_peaks():
+    return {"daily": {}, "monthly": {}}
+
+def load_manifest(base_dir=HISTORY_DIR):
+    """Manifest'i yükler, yoksa None döner"""
+    try:
+        with open(_manifest_path(base_dir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _write_atomic(path, body):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Geçici dosyaya yazıp yerine taşır - yarım yazılmış dosya kalmaz. Yazılan bayt sayısını döner"""
+    body = json.dumps(data, ensure_ascii=False, **dump_kwargs).encode('utf-8')
+    _write_atomic(path, body)
+    return len(body)
+
+def save_manifest(manifest, base_dir=HISTORY_DIR):
+    os.makedirs(base_dir, exist_ok=True)
+    write_json_atomic(_manifest_path(base_dir), manifest, separators=(',', ':'), sort_keys=True)
+
+def peaks_digest(body):
+    return hashlib.sha1(body).hexdigest()[:16]
+
+def load_month_peaks(month, base_dir=HISTORY_DIR):
+    """Ayın peak indeksi {"daily": {tarih: ...}, "monthly": {ay: ...}}; dosya yoksa boş"""
+    try:
+        with open(peaks_path(month, base_dir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return empty_peaks()
+
+def save_month_peaks(manifest, month, peaks, base_dir=HISTORY_DIR):
+    """Ayın peak dosyasını sıkışık yazar, özetini manifest'teki segment kaydına koyar"""
+    path = peaks_path(month, base_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    body = json.dumps(peaks, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    _write_atomic(path, body)
+    manifest["segments"][month]["peaks"] = peaks_digest(body)
+
+def load_peaks(manifest, base_dir=HISTORY_DIR):
+    """Tüm ayların peak indeksi tek sözlükte (dışa aktarma ve temizlik için)"""
+    peaks = empty_peaks()
+    for month in sorted(manifest["segments"]):
+        month_peaks = load_month_peaks(month, base_dir)
+        peaks["daily"].update(month_peaks["daily"])
+        peaks["monthly"].update(month_peaks["monthly"])
+    return peaks
+
+def save_peaks(manifest, peaks, base_dir=HISTORY_DIR):
+    """Birleşik indeksi aylara bölüp segmenti olan her ayın dosyasını yazar"""
+    months = {}
+    for date, entry in peaks["daily"].items():
+        months.setdefault(date[:7], empty_peaks())["daily"][date] = entry
+    for month, entry in peaks["monthly"].items():
+        months.setdefault(month, empty_peaks())["monthly"][month] = entry
+    for month, month_peaks in sorted(months.items()):
+        if month in manifest["segments"]:
+            save_month_peaks(manifest, month, month_peaks, base_dir)
+
+def record_peaks(manifest, record, base_dir=HISTORY_DIR):
+    """Kaydı yalnızca kendi ayının peak dosyasıyla karşılaştırır; peak değiştiyse o
+    dosyayı yazar. Değişen seviyeleri ("daily", "monthly") döndürür."""
+    month = record["date"][:7]
+    peaks = load_month_peaks(month, base_dir)
+    changed = update_peak_index(peaks, record)
+    if changed:
+        save_month_peaks(manifest, month, peaks, base_dir)
+    return changed
+
+def encode_record(record):
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+
+def append_record(manifest, record, base_dir=HISTORY_DIR):
+    """Kaydı ayın segmentinin sonuna ekler (O(1) yazma)"""
+    month = record["date"][:7]
+    line = encode_record(record).encode('utf-8')
+    os.makedirs(base_dir, exist_ok=True)
+    with open(segment_path(month, base_dir), 'ab') as f:
+        f.write(line)
+    segment = manifest["segments"].setdefault(month, {"records": 0, "bytes": 0})
+    segment["records"] += 1
+    segment["bytes"] += len(line)
+    # Temizlikte budanabilecek ham satırların en eski tarihi
+    segment.setdefault("raw_from", record["date"])
+
+def iter_segment(month, base_dir=HISTORY_DIR):
+    try:
+        with open(segment_path(month, base_dir), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    except FileNotFoundError:
+        return
+
+def compact_segment(month, keep, base_dir=HISTORY_DIR):
+    """Segmenti satır satır okuyup keep(record) olanları geçici dosyaya yazar; kayıt
+    silindiyse atomik olarak yerine taşır (rewritten), silinmediyse dosyaya dokunmaz ve
+    bytes_written 0 kalır. Bellekte aynı anda tek satır tutulur."""
+    path = segment_path(month, base_dir)
+    tmp_path = f"{path}.tmp"
+    stats = {"initial": 0, "final": 0, "bytes_read": 0, "bytes_written": 0, "first_kept_raw": None,
+             "rewritten": False}
+    with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        for line in src:
+            stats["bytes_read"] += len(line)
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            stats["initial"] += 1
+            verdict = keep(record)
+            if verdict:
+                dst.write(line)
+                stats["final"] += 1
+                stats["bytes_written"] += len(line)
+                if verdict == "raw" and stats["first_kept_raw"] is None:
+                    stats["first_kept_raw"] = record.get("date")
+        dst.flush()
+        os.fsync(dst.fileno())
+    if stats["final"] == stats["initial"]:
+        os.remove(tmp_path)
+        stats["bytes_written"] = 0
+    else:
+        os.replace(tmp_path, path)
+        stats["rewritten"] = True
+    return stats
+
+def iter_records(manifest, base_dir=HISTORY_DIR):
+    """Tüm kayıtları ay sırasıyla, satır satır okur"""
+    for month in sorted(manifest["segments"]):
+        yield from iter_segment(month, base_dir)
+
+def peak_value(record):
+    """Peak karşılaştırmasında kullanılan portföy değeri"""
+    value = record.get("portfolio_value", 0) or 0
+    if value == 0 and record.get("gold_price") and record.get("silver_price"):
+        value = record["gold_price"] + record["silver_price"]
+    return value
+
+def update_peak_index(peaks, record):
+    """Yeni kaydı yalnızca kendi gününün ve ayının peak'iyle karşılaştırır.
+    Değişen seviyeleri ("daily", "monthly") döndürür."""
+    changed = []
+    if not (record.get("gold_price") and record.get("silver_price")):
+        return changed
+    date = record["date"]
+    month = date[:7]
+    value = peak_value(record)
+    entry = {"timestamp": record["timestamp"], "portfolio_value": value}
+
+    daily = peaks["daily"].get(date)
+    if daily is None or value > daily["portfolio_value"]:
+        peaks["daily"][date] = entry
+        changed.append("daily")
+        monthly = peaks["monthly"].get(month)
+        if monthly is None or value > monthly["portfolio_value"]:
+            peaks["monthly"][month] = dict(entry, date=date)
+            changed.append("monthly")
+    return changed
+
+def build_peak_index(records):
+    """Mevcut daily_peak/monthly_peak bayraklarından indeksi tek geçişte kurar"""
+    peaks = {"daily": {}, "monthly": {}}
+    for record in records:
+        value = peak_value(record)
+        if record.get("daily_peak"):
+            peaks["daily"][record["date"]] = {"timestamp": record["timestamp"], "portfolio_value": value}
+        if record.get("monthly_peak"):
+            peaks["monthly"][record["date"][:7]] = {"timestamp": record["timestamp"],
+                                                    "portfolio_value": value, "date": record["date"]}
+    return peaks
+
+def load_peak_index(last_timestamp, path=PEAK_INDEX_PATH):
+    """Kayıtlarla aynı noktada (son kaydın timestamp'i) kaydedilmiş indeksi döner;
+    dosya yoksa veya geride kalmışsa None - çağıran bayraklardan yeniden kurar"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if saved.get("last_timestamp") != last_timestamp:
+        return None
+    return saved["peaks"]
+
+def save_peak_index(peaks, last_timestamp, path=PEAK_INDEX_PATH):
+    write_json_atomic(path, {"last_timestamp": last_timestamp, "peaks": peaks}, separators=(',', ':'))
+
+ROLLUP_TIERS = (("hourly", 13), ("daily", 10), ("monthly", 7))
+
+def empty_rollups():
+    return {tier: {} for tier, _ in ROLLUP_TIERS}
+
+def _bucket_key(record, width):
+    """hourly: YYYY-MM-DDTHH (UTC), daily: YYYY-MM-DD, monthly: YYYY-MM"""
+    if width == 13:
+        return datetime.fromtimestamp(record["timestamp"], timezone.utc).strftime("%Y-%m-%dT%H")
+    return record["date"][:width]
+
+def _merge_ohlc(ohlc, price):
+    if ohlc is None:
+        return [price, price, price, price]
+    ohlc[1] = max(ohlc[1], price)
+    ohlc[2] = min(ohlc[2], price)
+    ohlc[3] = price
+    return ohlc
+
+def _update_bucket(tier, bucket, record, value):
+    """Kaydı kovaya işler. Kova son işlenen kaydın timestamp'ini ("until") tutar; aynı
+    kayıt ikinci kez işlenmez (onarımda güvenli). Kova değiştiyse True"""
+    if record["timestamp"] <= bucket.get("until", float('-inf')):
+        return False
+    bucket["until"] = record["timestamp"]
+    bucket["gold"] = _merge_ohlc(bucket.get("gold"), record["gold_price"])
+    bucket["silver"] = _merge_ohlc(bucket.get("silver"), record["silver_price"])
+    bucket["count"] += 1
+    if tier == "hourly":
+        return True
+    peak = bucket.get("peak")
+    if peak is None or value > peak["portfolio_value"]:
+        bucket["peak"] = {
+            "timestamp": record["timestamp"],
+            "date": record["date"],
+            "time": record.get("time", ""),
+            "gold_price": record["gold_price"],
+            "silver_price": record["silver_price"],
+            "portfolio_value": value
+        }
+    return True
+
+def update_rollups(rollups, record):
+    """Kaydı saatlik/günlük/aylık OHLC kovalarına işler (kayıtlar zaman sırasıyla gelir).
+    Günlük ve aylık kovalar ayrıca portföy peak'ini taşır."""
+    if not (record.get("gold_price") and record.get("silver_price")):
+        return
+    value = peak_value(record)
+    for tier, width in ROLLUP_TIERS:
+        bucket = rollups[tier].setdefault(_bucket_key(record, width), {"count": 0})
+        _update_bucket(tier, bucket, record, value)
+
+def build_rollups(records):
+    """Mevcut kayıtlardan katmanları baştan kurar (taşıma için)"""
+    rollups = empty_rollups()
+    for record in sorted(records, key=lambda r: r.get("timestamp", 0)):
+        update_rollups(rollups, record)
+    return rollups
+
+def rollup_path(tier, base_dir=HISTORY_DIR):
+    return os.path.join(base_dir, 'rollups', f"{tier}.jsonl")
+
+def encode_rollup_lines(buckets):
+    """Anahtar sıralı, satır başına bir kova: {"key": ..., "count": ..., ...}"""
+    return ''.join(json.dumps({"key": key, **bucket}, ensure_ascii=False, separators=(',', ':'), sort_keys=True) + "\n"
+                   for key, bucket in sorted(buckets.items()))
+
+def parse_rollup_lines(lines):
+    buckets = {}
+    for line in lines:
+        if line.strip():
+            bucket = json.loads(line)
+            buckets[bucket.pop("key")] = bucket
+    return buckets
+
+def load_rollups(base_dir=HISTORY_DIR):
+    """Katman dosyalarını okur; hiçbiri yoksa eski tek dosyalı rollups.json'a bakar"""
+    rollups = empty_rollups()
+    found = False
+    for tier, _ in ROLLUP_TIERS:
+        try:
+            with open(rollup_path(tier, base_dir), 'r', encoding='utf-8') as f:
+                rollups[tier] = parse_rollup_lines(f)
+            found = True
+        except FileNotFoundError:
+            pass
+    if found:
+        return rollups
+    try:
+        with open(os.path.join(base_dir, 'rollups.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_rollups(rollups, base_dir=HISTORY_DIR):
+    """Katmanları anahtar başına tek satırla baştan yazar (taşıma ve gece sıkıştırması);
+    yazılan bayt sayısını döner"""
+    os.makedirs(os.path.join(base_dir, 'rollups'), exist_ok=True)
+    written = 0
+    for tier, _ in ROLLUP_TIERS:
+        body = encode_rollup_lines(rollups.get(tier, {})).encode('utf-8')
+        _write_atomic(rollup_path(tier, base_dir), body)
+        written += len(body)
+    # Eski tek dosyalı biçimden geçiş
+    legacy = os.path.join(base_dir, 'rollups.json')
+    if os.path.exists(legacy):
+        os.remove(legacy)
+    return written
+
+def has_rollups(base_dir=HISTORY_DIR):
+    return all(os.path.exists(rollup_path(tier, base_dir)) for tier, _ in ROLLUP_TIERS)
+
+def _current_bucket(path, key):
+    """(kova, tüm_kovalar) döner. Kayıtlar zaman sırasıyla geldiğinden son satır en
+    büyük anahtarı taşır ve yalnızca dosyanın sonu okunur (tüm_kovalar None); daha eski
+    bir kova istenirse (geç kayıt) dosyanın tamamı okunur. Yarım kalmış son satır kesilir."""
+    with open(path, 'r+b') as f:
+        end = f.seek(0, os.SEEK_END)
+        chunk = 512
+        while True:
+            start = max(end - chunk, 0)
+            f.seek(start)
+            tail = f.read(end - start)
+            if start == 0 or tail.count(b"\n") >= 2:
+                break
+            chunk *= 2
+        if tail and not tail.endswith(b"\n"):
+            keep = tail.rfind(b"\n") + 1
+            f.truncate(start + keep)
+            tail = tail[:keep]
+        lines = tail.splitlines()
+        if not lines or not lines[-1].strip():
+            return {"count": 0}, None
+        last = json.loads(lines[-1])
+        if last["key"] < key:
+            return {"count": 0}, None
+        if last.pop("key") == key:
+            return last, None
+        f.seek(0)
+        buckets = parse_rollup_lines(line.decode('utf-8') for line in f)
+    return buckets.setdefault(key, {"count": 0}), buckets
+
+def append_rollups(record, base_dir=HISTORY_DIR):
+    """Kaydı her katmanın güncel kovasına işler ve kovanın yeni halini dosyanın sonuna
+    ekler - toplama başına katman başına bir satır. Geç gelen kayıt eski bir kovaya
+    düşerse o katman sıralı olarak yeniden yazılır ki son satır yine en yeni kova olsun.
+    Yazılan bayt sayısını döner."""
+    if not (record.get("gold_price") and record.get("silver_price")):
+        return 0
+    value = peak_value(record)
+    written = 0
+    for tier, width in ROLLUP_TIERS:
+        key = _bucket_key(record, width)
+        path = rollup_path(tier, base_dir)
+        bucket, buckets = _current_bucket(path, key)
+        if not _update_bucket(tier, bucket, record, value):
+            continue
+        if buckets is not None:
+            body = encode_rollup_lines(buckets).encode('utf-8')
+            _write_atomic(path, body)
+        else:
+            body = encode_rollup_lines({key: bucket}).encode('utf-8')
+            with open(path, 'ab') as f:
+                f.write(body)
+        written += len(body)
+    return written
+
+def ensure_rollups(records, base_dir=HISTORY_DIR):
+    """Katman dosyaları yoksa bir kez kurar: eski rollups.json'dan veya kayıtlardan"""
+    if has_rollups(base_dir):
+        return
+    save_rollups(load_rollups(base_dir) or build_rollups(records), base_dir)
+
+def compact_rollups(base_dir=HISTORY_DIR):
+    """Eklenen ara satırları atar: anahtar başına tek satır, yazılan bayt sayısı döner"""
+    rollups = load_rollups(base_dir)
+    return save_rollups(rollups, base_dir) if rollups is not None else 0
+
+def apply_peak_flags(record, peaks):
+    """Manifest'teki peak indeksine göre eski formatın bayraklarını yazar"""
+    date = record.get("date", "")
+    daily = peaks["daily"].get(date)
+    monthly = peaks["monthly"].get(date[:7])
+    record["daily_peak"] = bool(daily and daily["timestamp"] == record.get("timestamp"))
+    record["monthly_peak"] = bool(monthly and monthly["date"] == date
+                                  and monthly["timestamp"] == record.get("timestamp"))
+    return record
+
+def migrate_from_legacy(price_data, base_dir=HISTORY_DIR):
+    """Mevcut price-history.json içeriğinden segmentleri ve peak dosyalarını kurar"""
+    manifest = empty_manifest()
+    records = sorted(price_data.get("records", []), key=lambda r: r.get("timestamp", 0))
+    months = {}
+    for record in records:
+        months.setdefault(record["date"][:7], []).append(record)
+    os.makedirs(base_dir, exist_ok=True)
+    for month, rows in months.items():
+        data = ''.join(encode_record(r) for r in rows).encode('utf-8')
+        with open(segment_path(month, base_dir), 'wb') as f:
+            f.write(data)
+        manifest["segments"][month] = {"records": len(rows), "bytes": len(data)}
+        raw_dates = [r["date"] for r in rows if not (r.get("daily_peak") or r.get("monthly_peak"))]
+        if raw_dates:
+            manifest["segments"][month]["raw_from"] = min(raw_dates)
+    manifest["meta"] = {k: v for k, v in price_data.items()
+                        if k not in ("records", "total_records", "peak_index", "rollups")}
+    save_peaks(manifest, build_peak_index(records), base_dir)
+    save_rollups(price_data.get("rollups") or build_rollups(records), base_dir)
+    save_manifest(manifest, base_dir)
+    return manifest
+
+def segment_months(base_dir=HISTORY_DIR):
+    """Diskte bulunan segmentler (manifest'ten bağımsız), ay sıralı"""
+    try:
+        names = os.listdir(base_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-len('.jsonl')] for name in names
+                  if name.endswith('.jsonl') and len(name) == len('YYYY-MM.jsonl'))
+
+def reconcile_manifest(manifest, base_dir=HISTORY_DIR):
+    """Manifest'i segment dosyalarıyla uzlaştırır ve manifest'te olmayan kayıtları
+    döndürür. Kesilen bir toplama: yarım kalan son satır kesilir, tam satırlar
+    sayaçlara ve ayın peak dosyasına işlenir; peak dosyası yazılıp manifest
+    kaydedilemediyse özet dosyadan yenilenir. Kesilen bir sıkıştırma (dosya
+    manifest'ten kısa): sayaçlar dosyadan yeniden sayılır."""
+    recovered = []
+    for month in sorted(manifest["segments"]):
+        try:
+            with open(peaks_path(month, base_dir), 'rb') as f:
+                digest = peaks_digest(f.read())
+        except FileNotFoundError:
+            continue
+        manifest["segments"][month]["peaks"] = digest
+    for month in segment_months(base_dir):
+        path = segment_path(month, base_dir)
+        segment = manifest["segments"].get(month, {"records": 0, "bytes": 0})
+        size = os.path.getsize(path)
+        if size == segment["bytes"]:
+            continue
+        if size < segment["bytes"]:
+            with open(path, 'rb') as f:
+                segment["records"] = sum(1 for line in f if line.strip())
+            segment["bytes"] = size
+            manifest["segments"][month] = segment
+            continue
+        with open(path, 'r+b') as f:
+            f.seek(segment["bytes"])
+            tail = f.read()
+            complete = tail[:tail.rfind(b"\n") + 1]
+            if len(complete) < len(tail):
+                f.truncate(segment["bytes"] + len(complete))
+        for line in complete.splitlines(keepends=True):
+            segment["bytes"] += len(line)
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            segment["records"] += 1
+            segment.setdefault("raw_from", record["date"])
+            manifest["segments"][month] = segment
+            record_peaks(manifest, record, base_dir)
+            recovered.append(record)
+        manifest["segments"][month] = segment
+    return recovered
+
+def rebuild_manifest(base_dir=HISTORY_DIR, meta=None):
+    """Manifest kaybolduysa segmentlerden yeniden kurar. Temizlik peak satırlarını
+    koruduğu için kayıtları sırayla yeniden oynatmak aynı peak indeksini verir."""
+    manifest = empty_manifest()
+    manifest["meta"] = meta or {}
+    peaks = empty_peaks()
+    for month in segment_months(base_dir):
+        segment = manifest["segments"][month] = {"records": 0, "bytes": 0}
+        for record in iter_segment(month, base_dir):
+            segment["records"] += 1
+            # Hangi satırın ham olduğu bilinmiyor; temizlik segmenti bir kez tarar
+            segment.setdefault("raw_from", record["date"])
+            update_peak_index(peaks, record)
+        segment["bytes"] = os.path.getsize(segment_path(month, base_dir))
+    save_peaks(manifest, peaks, base_dir)
+    return manifest
+
+def open_store(base_dir=HISTORY_DIR, legacy_path=LEGACY_PATH):
+    """Manifest'i döndürür. Yarım kalmış bir yazma varsa onarır; manifest yoksa
+    (veya bozuksa) segmentlerden, segment de yoksa eski JSON'dan bir kez kurar."""
+    try:
+        manifest = load_manifest(base_dir)
+    except ValueError:
+        manifest = None
+    if manifest is not None:
+        if "peaks" in manifest:
+            # Eski biçim: peak indeksi manifest'in içindeydi, aylık dosyalara taşı
+            save_peaks(manifest, manifest.pop("peaks"), base_dir)
+            save_manifest(manifest, base_dir)
+        before = json.dumps(manifest, sort_keys=True)
+        recovered = reconcile_manifest(manifest, base_dir)
+        if recovered:
+            print(f"🩹 Manifest onarıldı ({len(recovered)} kayıt kurtarıldı)")
+            if has_rollups(base_dir):
+                for record in recovered:
+                    append_rollups(record, base_dir)
+        if json.dumps(manifest, sort_keys=True) != before:
+            save_manifest(manifest, base_dir)
+        return manifest
+    try:
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            price_data = json.load(f)
+    except FileNotFoundError:
+        price_data = {"records": []}
+    if segment_months(base_dir):
+        # Segmentler eski JSON'dan yeni; onları ezmeden manifest'i yeniden kur
+        print("🩹 Manifest bulunamadı, segmentlerden yeniden kuruluyor")
+        meta = {k: v for k, v in price_data.items()
+                if k not in ("records", "total_records", "peak_index", "rollups")}
+        manifest = rebuild_manifest(base_dir, meta)
+        save_manifest(manifest, base_dir)
+        return manifest
+    print(f"📦 Append-only depo oluşturuluyor ({len(price_data.get('records', []))} kayıt taşınıyor)")
+    return migrate_from_legacy(price_data, base_dir)
+
+def export_legacy(manifest, path=LEGACY_PATH, base_dir=HISTORY_DIR):
+    """Tüketiciler için eski {"records": [...]} belgesini üretir"""
+    peaks = load_peaks(manifest, base_dir)
+    records = [apply_peak_flags(r, peaks) for r in iter_records(manifest, base_dir)]
+    price_data = {"records": records, **manifest["meta"]}
+    price_data["total_records"] = len(records)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    write_json_atomic(path, price_data, indent=2)
+    write_binary(records, os.path.splitext(path)[0] + '.bin')
+    return len(records)
+
+# İkili anlık görüntü (PHB1) - kanonik kaynak JSON, bu yalnızca hızlı okuma kopyası.
+# Tüm sayılar little-endian:
+#   başlık : magic "PHB1", sürüm u16, satır boyu u16, satır sayısı u32, gün sayısı u32, peak sayısı u32
+#   gün    : YYYYMMDD u32, ilk satır u32, satır sayısı u32   (tarih sıralı)
+#   peak   : satır indeksi u32                               (daily/monthly peak satırları)
+#   satır  : timestamp f64, altın f64, gümüş f64, portföy f64, bayrak u8, saat 8 bayt ASCII, 3 bayt dolgu
+# Satırlar (tarih, timestamp) sırasındadır; bir günün satırları ardışıktır.
+BINARY_PATH = 'data/price-history.bin'
+BINARY_MAGIC = b'PHB1'
+BINARY_HEADER = struct.Struct('<4sHHIII')
+BINARY_DAY = struct.Struct('<III')
+BINARY_PEAK = struct.Struct('<I')
+BINARY_ROW = struct.Struct('<ddddB8s3x')
+BINARY_FLAGS = {"daily_peak": 1, "monthly_peak": 2, "optimized": 4}
+# none | gzip | zstd (zstandard paketi kuruluysa)
+BINARY_COMPRESSION = os.environ.get('HISTORY_BINARY_COMPRESSION', 'gzip')
+
+def encode_binary(records):
+    """Kayıtları PHB1 biçimine çevirir (sıkıştırmasız)"""
+    rows = sorted(records, key=lambda r: (r.get("date", ""), r.get("timestamp", 0)))
+    days = []
+    peaks = []
+    body = bytearray()
+    for i, r in enumerate(rows):
+        day = int(r["date"].replace("-", ""))
+        if days and days[-1][0] == day:
+            days[-1][2] += 1
+        else:
+            days.append([day, i, 1])
+        flags = 0
+        for name, bit in BINARY_FLAGS.items():
+            if r.get(name):
+                flags |= bit
+        if flags & 3:
+            peaks.append(i)
+        body += BINARY_ROW.pack(float(r.get("timestamp") or 0), float(r.get("gold_price") or 0),
+                                float(r.get("silver_price") or 0), float(r.get("portfolio_value") or 0),
+                                flags, (r.get("time") or "").encode('ascii', 'replace')[:8])
+    header = BINARY_HEADER.pack(BINARY_MAGIC, 1, BINARY_ROW.size, len(rows), len(days), len(peaks))
+    index = b''.join(BINARY_DAY.pack(*d) for d in days) + b''.join(BINARY_PEAK.pack(p) for p in peaks)
+    return header + index + bytes(body)
+
+def write_binary(records, path=BINARY_PATH, compression=BINARY_COMPRESSION):
+    data = encode_binary(records)
+    if compression == 'gzip':
+        data = gzip.compress(data, mtime=0)
+    elif compression == 'zstd':
+        import zstandard
+        data = zstandard.ZstdCompressor(level=10).compress(data)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+WSGI (gunicorn + Flask) ile ASGI (uvicorn + api/asgi.py) yük karşılaştırması
+- Gecikmeli sahte kaynak sunucusu başlatır (doviz/bloomberg sayfaları + geçmiş JSON)
+- İki uygulamayı da bu kaynağa yönlendirip aynı eşzamanlılıkta istek yağdırır
+- PRICE_FRESH_TTL=0 (varsayılan) ile her istek kaynağa gider; gecikme istek yoluna düşer
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(SCRIPT_DIR, '..')
+sys.path.insert(0, SCRIPT_DIR)
+from bench_extractors import synthetic_page  # noqa: E402
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_upstream(delay):
+    with open(os.path.join(ROOT, 'data', 'price-history.json'), 'rb') as f:
+        history = f.read()
+    pages = {
+        '/altin/yapikredi/gram-altin': synthetic_page("socket", '6-gram-altin'),
+        '/altin/vakifbank/gumus': synthetic_page("socket", '5-gumus'),
+        '/altin/altin-ons': synthetic_page("bloomberg", None),
+        '/emtia/gumus-ons': synthetic_page("bloomberg", None),
+        '/price-history.json': history,
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = pages.get(self.path)
+            self.send_response(200 if body else 404)
+            self.send_header('Content-Length', str(len(body or b'')))
+            self.send_header('ETag', '"upstream"')
+            self.end_headers()
+            self.wfile.write(body or b'')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+def start_app(kind, port, upstream, args):
+    env = {
+        **os.environ,
+        'DOVIZ_BASE': upstream, 'BLOOMBERG_BASE': upstream,
+        'HISTORY_FORMAT': 'json', 'HISTORY_URL': f"{upstream}/price-history.json",
+        'PRICE_FRESH_TTL': str(args.fresh_ttl), 'PRICE_STALE_TTL': str(args.fresh_ttl),
+        'PORTFOLIO_CONFIG_PATH': os.path.join(ROOT, 'portfolio-config.json'),
+    }
+    if kind == 'wsgi':
+        cmd = ['gunicorn', '--chdir', 'api', '-k', 'gthread', '-w', str(args.workers),
+               '--threads', str(args.threads), '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'index:app']
+    else:
+        cmd = ['uvicorn', 'asgi:app', '--app-dir', 'api', '--port', str(port), '--log-level', 'warning']
+    process = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/portfolio-config", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"{kind} sunucusu başlamadı")
+
+async def run_load(base, paths, concurrency, duration):
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=30) as client:
+        end = time.perf_counter() + duration
+
+        async def worker(i):
+            nonlocal errors
+            n = i
+            while time.perf_counter() < end:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(paths[n % len(paths)])
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+                n += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    pick = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000 if latencies else 0
+    return len(latencies) / elapsed, pick(0.5), pick(0.95), pick(0.99), errors
+
+def main():
+    parser = argparse.ArgumentParser(description='WSGI vs ASGI load test')
+    parser.add_argument('--targets', default='wsgi,asgi')
+    parser.add_argument('--paths', default='/api/snapshot,/api/gold-price,/api/table-data')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--upstream-delay', type=float, default=0.5, help='Kaynak yanıt gecikmesi (sn)')
+    parser.add_argument('--fresh-ttl', type=int, default=0, help='PRICE_FRESH_TTL/PRICE_STALE_TTL (sn)')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    upstream = start_upstream(args.upstream_delay)
+    paths = args.paths.split(',')
+    print(f"kaynak gecikmesi {args.upstream_delay}s, {args.concurrency} eşzamanlı istemci, {args.duration}s")
+    print(f"{'hedef':<6}{'istek/sn':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'hata':>7}")
+    for kind in args.targets.split(','):
+        port = free_port()
+        process = start_app(kind, port, upstream, args)
+        try:
+            rps, p50, p95, p99, errors = asyncio.run(run_load(f"http://127.0.0.1:{port}", paths,
+                                                              args.concurrency, args.duration))
+            print(f"{kind:<6}{rps:>10.0f}{p50:>9.0f}{p95:>9.0f}{p99:>9.0f}{errors:>7}")
+        finally:
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
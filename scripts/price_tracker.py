@@ -9,12 +9,62 @@ Metal Price Tracker Bot v3.0
 
 import json
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone, timedelta
 from bs4 import BeautifulSoup
 import os
+import time
 import argparse
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, wait
 
-def get_gold_price():
+import history_store
+
+# json: tek dosya (data/price-history.json) her çalışmada yeniden yazılır
+# jsonl: append-only aylık segmentler (data/history), JSON/PHB1 kopyaları yalnızca
+# --export ile (workflow'da gece) üretilir; API bu durumda HISTORY_FORMAT=jsonl okumalı
+HISTORY_BACKEND = os.environ.get('HISTORY_BACKEND', 'json')
+PRICE_HISTORY_PATH = history_store.LEGACY_PATH
+
+# Fiyatlar paralel çekilir; toplam bekleme bu süreyi aşmaz
+COLLECT_DEADLINE = float(os.environ.get('COLLECT_DEADLINE', 20))
+
+# İki sayfa da aynı hostta - tek oturum, ayrı bağlantı/okuma zaman aşımları
+HTTP_TIMEOUT = (5, 15)
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+# Yeniden denemeler elle yapılır: urllib3 Retry son teslim anını bilmez, zaman aşımı
+# ve deneme sayısı her seferinde kalan süreden hesaplanır
+HTTP_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MIN_ATTEMPT_SECONDS = 1.0
+
+def fetch_page(url, headers, deadline_at=None):
+    """deadline_at (time.monotonic) geçmeden sayfayı çeker; geçecekse hata fırlatır"""
+    if deadline_at is None:
+        deadline_at = time.monotonic() + COLLECT_DEADLINE
+    error = None
+    for attempt in range(HTTP_ATTEMPTS):
+        if attempt:
+            time.sleep(min(RETRY_BACKOFF * 2 ** (attempt - 1), max(deadline_at - time.monotonic(), 0)))
+        remaining = deadline_at - time.monotonic()
+        if remaining < MIN_ATTEMPT_SECONDS:
+            break
+        timeout = (min(HTTP_TIMEOUT[0], remaining), min(HTTP_TIMEOUT[1], remaining))
+        try:
+            response = http_session.get(url, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+            continue
+        if response.status_code not in RETRY_STATUSES:
+            response.raise_for_status()
+            return response
+        error = requests.HTTPError(f"{response.status_code} for url: {url}", response=response)
+    raise error or requests.Timeout(f"{url}: süre doldu")
+
+def get_gold_price(deadline_at=None):
     """Yapı Kredi altın fiyatını çeker"""
     try:
         url = "https://m.doviz.com/altin/yapikredi/gram-altin"
@@ -24,8 +74,7 @@ def get_gold_price():
             'Accept-Language': 'tr-TR,tr;q=0.8,en-US;q=0.5',
         }
         
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
+        response = fetch_page(url, headers, deadline_at)
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -45,7 +94,7 @@ def get_gold_price():
         print(f"Altın fiyatı çekme hatası: {e}")
         return None
 
-def get_silver_price():
+def get_silver_price(deadline_at=None):
     """Vakıfbank gümüş fiyatını çeker"""
     try:
         url = "https://m.doviz.com/altin/vakifbank/gumus"
@@ -55,8 +104,7 @@ def get_silver_price():
             'Accept-Language': 'tr-TR,tr;q=0.8,en-US;q=0.5',
         }
         
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
+        response = fetch_page(url, headers, deadline_at)
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -76,27 +124,59 @@ def get_silver_price():
         print(f"Gümüş fiyatı çekme hatası: {e}")
         return None
 
+def fetch_prices_concurrently(fetchers, deadline=COLLECT_DEADLINE):
+    """Kaynakları aynı anda çeker, süresi dolanlar için None döner. Her istek kalan
+    süreye göre kısaltıldığından thread'ler de son teslimde biter (çıkışı bekletmez)"""
+    deadline_at = time.monotonic() + deadline
+    executor = ThreadPoolExecutor(max_workers=len(fetchers))
+    futures = {executor.submit(fetcher, deadline_at): name for name, fetcher in fetchers.items()}
+    done, pending = wait(futures, timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+    
+    results = {name: None for name in fetchers}
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as e:
+            print(f"{futures[future]} çekme hatası: {e}")
+    for future in pending:
+        print(f"⏱️  {futures[future]} {deadline:.0f}s içinde yanıt vermedi")
+    return results
+
 def load_price_history():
-    """Mevcut fiyat geçmişini yükler"""
+    """Mevcut fiyat geçmişini yükler; peak indeksi ayrı dosyasından eklenir"""
     try:
-        with open('data/price-history.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(PRICE_HISTORY_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
     except FileNotFoundError:
         return {"records": []}
     except Exception as e:
         print(f"Dosya okuma hatası: {e}")
         return {"records": []}
+    records = data.get("records", [])
+    # Eski dosyalar indeksi içinde taşır; yenileri PEAK_INDEX_PATH'te tutar
+    if "peak_index" not in data and records:
+        peaks = history_store.load_peak_index(records[-1].get("timestamp"))
+        if peaks is not None:
+            data["peak_index"] = peaks
+    return data
 
 def save_price_history(data):
-    """Fiyat geçmişini dosyaya kaydeder"""
+    """Fiyat geçmişini dosyaya kaydeder (geçici dosya + atomik taşıma), yazılan JSON baytını döner.
+    Peak indeksi yayınlanan JSON'a yazılmaz, PEAK_INDEX_PATH'e ayrıca kaydedilir."""
     try:
         os.makedirs('data', exist_ok=True)
-        with open('data/price-history.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
+        published = {k: v for k, v in data.items() if k != "peak_index"}
+        bytes_written = history_store.write_json_atomic(PRICE_HISTORY_PATH, published, indent=2)
+        history_store.write_binary(data.get("records", []))
+        records = data.get("records", [])
+        if "peak_index" in data and records:
+            # JSON'dan sonra yazılır: yarıda kalırsa indeks geride kalır ve yeniden kurulur
+            history_store.save_peak_index(data["peak_index"], records[-1].get("timestamp"))
+        return bytes_written
     except Exception as e:
         print(f"Dosya kaydetme hatası: {e}")
-        return False
+        return 0
 
 def calculate_portfolio_value(gold_price, silver_price, gold_amount=1, silver_amount=1):
     """Standart portföy değeri hesapla"""
@@ -153,62 +233,131 @@ def find_monthly_peak(records, target_month):
     
     return peak_record
 
+def _find_by_timestamp(records, timestamp):
+    """Kayıtlar zaman sıralı eklendiği için ikili arama ile bulur"""
+    i = bisect_left(records, timestamp, key=lambda r: r.get("timestamp", 0))
+    if i < len(records) and records[i].get("timestamp") == timestamp:
+        return records[i]
+    return None
+
+def _set_flag(records, entry, flag, value):
+    record = _find_by_timestamp(records, entry["timestamp"]) if entry else None
+    if record is None:
+        return False
+    record[flag] = value
+    return True
+
 def optimize_realtime(price_data):
-    """Her yeni veri eklendiğinde çalışır - Peak'leri günceller"""
+    """Her yeni veri eklendiğinde çalışır - Peak'leri günceller.
+    Kalıcı peak indeksi sayesinde yeni kayıt yalnızca kendi gününün ve ayının
+    peak'iyle karşılaştırılır; tüm kayıtlar taranmaz."""
     records = price_data.get("records", [])
     
     if not records:
         return price_data
     
     now = datetime.now(timezone.utc)
-    today = now.strftime("%Y-%m-%d")
-    current_month = now.strftime("%Y-%m")
+    new_record = records[-1]
+    date = new_record.get("date", "")
+    month = date[:7]
     
-    # 1. GÜNLÜK PEAK GÜNCELLEME
-    # Bugünün tüm daily_peak flag'lerini sıfırla
-    for record in records:
-        if record.get("date") == today:
-            record["daily_peak"] = False
+    peaks = price_data.get("peak_index")
+    if peaks is None:
+        # İlk çalışma: mevcut bayraklardan indeksi bir kez kur
+        peaks = history_store.build_peak_index(records[:-1])
     
-    # Bugünün en yüksek portföy değerini bul
-    daily_peak = find_daily_peak(records, today)
+    previous_daily = peaks["daily"].get(date)
+    previous_monthly = peaks["monthly"].get(month)
+    changed = history_store.update_peak_index(peaks, new_record)
     
-    if daily_peak:
-        # Peak kaydını işaretle
-        for record in records:
-            if (record.get("timestamp") == daily_peak.get("timestamp") and 
-                record.get("date") == today):
-                record["daily_peak"] = True
-                print(f"✅ Günlük peak güncellendi: {record['time']} - {record['portfolio_value']:.2f} TL")
-                break
+    # 1. GÜNLÜK PEAK GÜNCELLEME
+    if "daily" in changed:
+        _set_flag(records, previous_daily, "daily_peak", False)
+        new_record["daily_peak"] = True
+        print(f"✅ Günlük peak güncellendi: {new_record['time']} - {new_record['portfolio_value']:.2f} TL")
     
     # 2. AYLIK PEAK GÜNCELLEME
-    # Bu ayın tüm monthly_peak flag'lerini sıfırla
-    for record in records:
-        if record.get("date", "").startswith(current_month):
-            record["monthly_peak"] = False
-    
-    # Bu ayın günlük peak'lerinden en yüksek olanını bul
-    monthly_peak = find_monthly_peak(records, current_month)
-    
-    if monthly_peak:
-        # Peak kaydını işaretle
-        for record in records:
-            if (record.get("timestamp") == monthly_peak.get("timestamp") and 
-                record.get("date") == monthly_peak.get("date")):
-                record["monthly_peak"] = True
-                print(f"✅ Aylık peak güncellendi: {record['date']} {record['time']} - {record['portfolio_value']:.2f} TL")
-                break
+    if "monthly" in changed:
+        _set_flag(records, previous_monthly, "monthly_peak", False)
+        new_record["monthly_peak"] = True
+        print(f"✅ Aylık peak güncellendi: {new_record['date']} {new_record['time']} - {new_record['portfolio_value']:.2f} TL")
     
     price_data["records"] = records
+    price_data["peak_index"] = peaks
     price_data["last_optimization"] = now.isoformat()
     
     return price_data
 
+def cleanup_segments():
+    """jsonl deposu için gece temizliği - yalnızca budanabilir ham satır içeren
+    segmentleri akış halinde sıkıştırır (bellek kullanımı satır boyutuyla sınırlı)"""
+    started = time.perf_counter()
+    manifest = history_store.open_store()
+    peaks = history_store.load_peaks(manifest)
+    now = datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
+    
+    def keep(record):
+        history_store.apply_peak_flags(record, peaks)
+        if record["daily_peak"] or record["monthly_peak"]:
+            return True
+        # Bugünün (veya ileri tarihli) ham kaydı - şimdilik kalsın
+        return "raw" if record.get("date", "") >= today else False
+    
+    initial_count = sum(segment["records"] for segment in manifest["segments"].values())
+    removed_count = 0
+    bytes_read = 0
+    bytes_written = 0
+    touched = []
+    for month, segment in sorted(manifest["segments"].items()):
+        if segment.get("raw_from", today) >= today:
+            continue
+        stats = history_store.compact_segment(month, keep)
+        touched.append(month)
+        removed_count += stats["initial"] - stats["final"]
+        bytes_read += stats["bytes_read"]
+        bytes_written += stats["bytes_written"]
+        if stats["rewritten"]:
+            # Dosyaya dokunulmadıysa manifest'teki boyut (API bununla doğrular) aynı kalır
+            segment["records"] = stats["final"]
+            segment["bytes"] = stats["bytes_written"]
+        if stats["first_kept_raw"]:
+            segment["raw_from"] = stats["first_kept_raw"]
+        else:
+            segment.pop("raw_from", None)
+    
+    # Gün boyu eklenen ara kova satırları atılır: anahtar başına tek satır
+    bytes_written += history_store.compact_rollups()
+    
+    manifest["meta"]["last_cleanup"] = now.isoformat()
+    manifest["meta"]["cleanup_stats"] = {
+        "date": today,
+        "initial_count": initial_count,
+        "final_count": initial_count - removed_count,
+        "removed_count": removed_count,
+        "partitions_touched": touched,
+        "bytes_read": bytes_read,
+        "bytes_written": bytes_written,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+    history_store.save_manifest(manifest)
+    print(f"✅ Temizlik tamamlandı!")
+    print(f"   📂 İşlenen segmentler: {', '.join(touched) or '-'}")
+    print(f"   🗑️ Silinen kayıt: {removed_count}")
+    print(f"   💾 Okunan/yazılan: {bytes_read / 1024:.1f} KB / {bytes_written / 1024:.1f} KB")
+
 def cleanup_old_raw_data():
-    """Gece 02:00'da çalışır - Dünün ve daha eski günlerin ham verilerini siler"""
+    """Gece 02:00'da çalışır - Dünün ve daha eski günlerin ham verilerini siler.
+    json arka ucunda dosyanın tamamı yüklenir ve baştan yazılır (O(n)); yalnızca
+    budanan segmentleri akışla yazan temizlik HISTORY_BACKEND=jsonl'dedir."""
     print("🌙 Gece temizliği başlatılıyor...")
     
+    if HISTORY_BACKEND == 'jsonl':
+        cleanup_segments()
+        return
+    
+    started = time.perf_counter()
+    bytes_read = os.path.getsize(PRICE_HISTORY_PATH) if os.path.exists(PRICE_HISTORY_PATH) else 0
     price_data = load_price_history()
     records = price_data.get("records", [])
     
@@ -250,18 +399,56 @@ def cleanup_old_raw_data():
         "date": today,
         "initial_count": initial_count,
         "final_count": len(cleaned_records),
-        "removed_count": removed_count
+        "removed_count": removed_count,
+        "bytes_read": bytes_read,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1)
     }
     
-    # Dosyaya kaydet
-    if save_price_history(price_data):
+    # Dosyaya kaydet - yazılan boyut kaydetmenin dönüş değerinden gelir (dosyanın
+    # kendisi kendi boyutunu içeremez, bu yüzden yalnızca bellekteki istatistiğe ve loga girer)
+    bytes_written = save_price_history(price_data)
+    if bytes_written:
+        bytes_written += history_store.compact_rollups()
+        price_data["cleanup_stats"]["bytes_written"] = bytes_written
         print(f"✅ Temizlik tamamlandı!")
         print(f"   📊 Başlangıç kayıt: {initial_count}")
         print(f"   🗑️ Silinen kayıt: {removed_count}")
         print(f"   💾 Kalan kayıt: {len(cleaned_records)}")
+        print(f"   💾 Okunan/yazılan: {bytes_read / 1024:.1f} KB / {bytes_written / 1024:.1f} KB")
     else:
         print("❌ Temizlik kaydetme başarısız!")
 
+def append_price_record(new_record, now):
+    """jsonl deposuna tek satır ekler; peak değiştiyse yalnızca ayın peak dosyasını yazar"""
+    manifest = history_store.open_store()
+    history_store.ensure_rollups(history_store.iter_records(manifest))
+    history_store.append_record(manifest, new_record)
+    
+    # Katmanlara yalnızca güncel kovaların yeni hali eklenir
+    history_store.append_rollups(new_record)
+    
+    for level in history_store.record_peaks(manifest, new_record):
+        label = "Günlük" if level == "daily" else "Aylık"
+        print(f"✅ {label} peak güncellendi: {new_record['date']} {new_record['time']} - {new_record['portfolio_value']:.2f} TL")
+    
+    manifest["meta"].update({
+        "last_update": now.isoformat(),
+        "last_optimization": now.isoformat(),
+        "bot_version": "3.0.0",
+        "format_version": "simplified",
+        "cron_format": "*/15 4-21 * * * (Garantili 15 dakikalık periyot)"
+    })
+    history_store.save_manifest(manifest)
+    
+    segment = manifest["segments"][new_record["date"][:7]]
+    print(f"\n✅ Kayıt eklendi: {history_store.segment_path(new_record['date'][:7])} ({segment['records']} kayıt)")
+
+def export_price_history():
+    """jsonl deposundan eski formatta data/price-history.json üretir"""
+    manifest = history_store.open_store()
+    count = history_store.export_legacy(manifest)
+    print(f"📤 {history_store.LEGACY_PATH} üretildi ({count} kayıt)")
+
 def collect_price_data():
     """Normal fiyat verisi toplama işlemi + Anlık optimizasyon"""
     print("📊 Metal Fiyat Takip Botu v3.0 - Veri Toplama")
@@ -269,9 +456,10 @@ def collect_price_data():
     print(f"🕐 Çalışma Saatleri: 07:00-00:59 TR")
     print(f"⏰ Zaman: {datetime.now(timezone.utc).isoformat()}")
     
-    # Fiyatları çek
-    gold_price = get_gold_price()
-    silver_price = get_silver_price()
+    # Fiyatları paralel çek - süre en yavaş kaynakla sınırlı
+    prices = fetch_prices_concurrently({"gold": get_gold_price, "silver": get_silver_price})
+    gold_price = prices["gold"]
+    silver_price = prices["silver"]
     
     if gold_price is None and silver_price is None:
         print("❌ Hiçbir fiyat alınamadı!")
@@ -283,9 +471,6 @@ def collect_price_data():
     # Portföy değeri hesapla
     portfolio_value = calculate_portfolio_value(gold_price, silver_price) if gold_price and silver_price else 0
     
-    # Mevcut veriyi yükle
-    price_data = load_price_history()
-    
     now = datetime.now(timezone.utc)
     
     # Basitleştirilmiş kayıt - Gereksiz alanlar kaldırıldı
@@ -300,6 +485,13 @@ def collect_price_data():
         "monthly_peak": False
     }
     
+    if HISTORY_BACKEND == 'jsonl':
+        append_price_record(new_record, now)
+        return
+    
+    # Mevcut veriyi yükle
+    price_data = load_price_history()
+    
     # Kayıtları güncelle
     price_data["records"].append(new_record)
     
@@ -307,6 +499,14 @@ def collect_price_data():
     print("\n⚡ Anlık optimizasyon başlatılıyor...")
     price_data = optimize_realtime(price_data)
     
+    # Saatlik/günlük/aylık OHLC katmanlarını güncelle - gece temizliği bunlara dokunmaz.
+    # Katmanlar kendi dosyalarında; dashboard'un indirdiği JSON'a gömülmez
+    embedded = price_data.pop("rollups", None)
+    if embedded is not None and not history_store.has_rollups():
+        history_store.save_rollups(embedded)
+    history_store.ensure_rollups(price_data["records"][:-1])
+    history_store.append_rollups(new_record)
+    
     # Meta bilgileri güncelle
     price_data["last_update"] = now.isoformat()
     price_data["total_records"] = len(price_data["records"])
@@ -330,10 +530,14 @@ def main():
                        help='Collect current price data + realtime optimization (Her 15 dakika - */15 cron)')
     parser.add_argument('--cleanup', action='store_true', 
                        help='Clean old raw data (keep only peaks) - Gece 02:00')
+    parser.add_argument('--export', action='store_true',
+                       help='Export the jsonl store as data/price-history.json (HISTORY_BACKEND=jsonl)')
     
     args = parser.parse_args()
     
-    if args.cleanup:
+    if args.export:
+        export_price_history()
+    elif args.cleanup:
         cleanup_old_raw_data()
     elif args.collect:
         collect_price_data()
@@ -0,0 +1,48 @@
+"""
+Testler api/ (core paketi) ve scripts/ (bot) modüllerini doğrudan içe aktarır
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'api'))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+# İçe aktarırken ağa veya geçici diske dokunulmasın
+os.environ.setdefault('WARMUP', 'off')
+os.environ.setdefault('HISTORY_CACHE_DIR', 'off')
+
+
+# Flask ve ASGI giriş noktalarına aynı GET: (durum, küçük harfli başlıklar, ham gövde)
+def flask_get(path, headers):
+    import index
+    response = index.app.test_client().get(path, headers=headers)
+    return response.status_code, {k.lower(): v for k, v in response.headers.items()}, response.get_data()
+
+
+def asgi_get(path, headers):
+    """Ham ASGI çağrısı: gövde sıkıştırılmış haliyle alınır"""
+    import asgi
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    path, _, query = path.partition('?')
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(),
+             'headers': [(k.lower().encode(), v.encode()) for k, v in headers.items()]}
+    asyncio.run(asgi.app(scope, receive, send))
+    start = messages[0]
+    return (start['status'], {k.decode(): v.decode() for k, v in start['headers']},
+            b''.join(m.get('body', b'') for m in messages[1:]))
+
+
+@pytest.fixture(params=[flask_get, asgi_get], ids=["flask", "asgi"])
+def get(request):
+    return request.param
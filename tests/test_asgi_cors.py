@@ -0,0 +1,35 @@
+"""
+ASGI uygulaması Flask'taki CORS(app) ile aynı başlıkları ve OPTIONS ön kontrolünü verir
+"""
+import asyncio
+
+import httpx
+
+import asgi
+
+
+def request(method, path, headers=None):
+    async def run():
+        transport = httpx.ASGITransport(app=asgi.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, headers=headers or {})
+    return asyncio.run(run())
+
+
+def test_preflight_echoes_origin_and_headers():
+    response = request("OPTIONS", "/api/gold-price", {
+        "Origin": "https://example.com", "Access-Control-Request-Method": "GET",
+        "Access-Control-Request-Headers": "Content-Type"})
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
+    assert response.headers["access-control-allow-headers"] == "Content-Type"
+    assert "GET" in response.headers["access-control-allow-methods"]
+    assert response.headers["allow"] == "GET, HEAD, OPTIONS"
+    assert response.headers["vary"] == "Origin"
+
+
+def test_wildcard_without_origin_and_unknown_path():
+    assert request("OPTIONS", "/api/login").headers["allow"] == "OPTIONS, POST"
+    response = request("GET", "/missing")
+    assert response.status_code == 404
+    assert response.headers["access-control-allow-origin"] == "*"
@@ -0,0 +1,48 @@
+"""
+Flask ve ASGI giriş noktaları aynı core.routes gövdelerini ve ara katmanı kullanır:
+aynı istek aynı durum, başlık ve gövdeyi verir
+"""
+import asyncio
+
+import httpx
+import pytest
+
+import asgi
+import core
+import index
+
+
+@pytest.fixture
+def apps(monkeypatch):
+    async def ready():
+        pass
+    monkeypatch.setattr(core.aio, "ensure_history", ready)
+    monkeypatch.setattr(core.snapshot, "get_price_stats",
+                        lambda days=None: {"days": days, "gold": {"value": 100.0}})
+    return index.app.test_client()
+
+
+def asgi_get(path, headers):
+    async def run():
+        transport = httpx.ASGITransport(app=asgi.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("path", ["/api/stats?days=abc", "/api/stats?days=7", "/api/stats"])
+def test_stats_days_parsing_matches(apps, path):
+    headers = {"Accept-Encoding": "identity"}
+    flask_response, asgi_response = apps.get(path, headers=headers), asgi_get(path, headers)
+    assert asgi_response.status_code == flask_response.status_code == 200
+    assert asgi_response.content == flask_response.get_data()
+    assert asgi_response.headers["etag"] == flask_response.headers["ETag"]
+    # Geçersiz sayı varsayılana (tüm geçmiş) düşer
+    assert asgi_response.json()["data"]["days"] == (7 if path.endswith("=7") else None)
+
+
+def test_cache_stats_sections_match(apps):
+    flask_sections = set(apps.get("/api/cache-stats").get_json())
+    asgi_sections = set(asgi_get("/api/cache-stats", {}).json())
+    assert "http" in asgi_sections
+    assert asgi_sections == flask_sections
@@ -0,0 +1,76 @@
+"""
+Şifre ve oturum doğrulama: doğru şifre token verir, yanlış şifre/token reddedilir,
+şifre tanımlı değilse hiçbir şey geçmez; ayar dosyası değişince yeniden okunur
+"""
+import hashlib
+import json
+import os
+
+import pytest
+
+import index
+from core import auth
+
+PASSWORD = "altın-2026"
+HASH = hashlib.sha256(PASSWORD.encode()).hexdigest()
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    path = tmp_path / "portfolio-config.json"
+    monkeypatch.setattr(auth, "PORTFOLIO_CONFIG_PATH", str(path))
+    monkeypatch.setattr(auth, "PORTFOLIO_CONFIG_CHECK", 0)
+    monkeypatch.setattr(auth, "_portfolio", {"mtime": None, "checked_at": float("-inf"),
+                                             "config": auth.DEFAULT_PORTFOLIO_CONFIG, "token": b""})
+
+    def write(**values):
+        path.write_text(json.dumps({"gold_amount": 10, "silver_amount": 100, **values}), encoding="utf-8")
+        # Aynı nanosaniyede iki yazım mtime'ı değiştirmeyebilir
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    return write
+
+
+def test_password_and_token_accepted(config):
+    config(password_hash=HASH.upper())
+    assert auth.verify_password(PASSWORD)
+    assert auth.verify_token(HASH)
+
+    client = index.app.test_client()
+    login = client.post("/api/login", json={"password": PASSWORD}).get_json()
+    assert login == {"success": True, "token": HASH}
+    assert client.post("/api/verify-session", json={"token": login["token"]}).get_json() == {"valid": True}
+
+
+@pytest.mark.parametrize("password", ["", "altın-2027", PASSWORD.upper(), HASH])
+def test_wrong_password_rejected(config, password):
+    config(password_hash=HASH)
+    assert not auth.verify_password(password)
+    response = index.app.test_client().post("/api/login", json={"password": password}).get_json()
+    assert response == {"success": False, "error": "Invalid password"}
+
+
+@pytest.mark.parametrize("token", ["", HASH[:-1], HASH + "0", "ş" * 64, None, 12345])
+def test_wrong_token_rejected(config, token):
+    config(password_hash=HASH)
+    assert auth.verify_token(token) is False
+
+
+def test_nothing_passes_without_password(config):
+    # Dosya yok
+    assert not auth.verify_password("")
+    assert not auth.verify_token("")
+    # Dosya var, şifre tanımsız
+    config(password_hash="")
+    assert not auth.verify_password("")
+    assert not auth.verify_token("")
+    assert index.app.test_client().post("/api/verify-session", json={"token": ""}).get_json() == {"valid": False}
+
+
+def test_config_change_is_picked_up(config):
+    config(password_hash=HASH)
+    assert auth.verify_password(PASSWORD)
+    config(password_hash=hashlib.sha256(b"yeni").hexdigest())
+    assert not auth.verify_password(PASSWORD)
+    assert auth.verify_password("yeni")
+    assert auth.load_portfolio_config()["gold_amount"] == 10
@@ -0,0 +1,71 @@
+"""
+PHB1 ikili kopya: bot'un yazdığı dosya API'de aynı kayıtlara çözülür; gün ve satır
+aralığı okumaları tam çözümle aynı sonucu verir
+"""
+import pytest
+
+import history_store
+from core import history, snapshot
+
+DAYS = ("2026-01-30", "2026-01-31", "2026-02-01")
+
+
+def make_records():
+    records = []
+    ts = 1769763600  # 2026-01-30 09:00 UTC
+    for day_index, date in enumerate(DAYS):
+        for hour, gold in ((9, 100.0), (12, 130.0), (15, 110.0)):
+            records.append({"timestamp": ts + day_index * 86400 + (hour - 9) * 3600, "date": date,
+                            "time": f"{hour:02d}:00", "gold_price": gold + day_index,
+                            "silver_price": 10.5, "portfolio_value": gold + day_index + 10.5,
+                            "daily_peak": hour == 12, "monthly_peak": hour == 12 and date in ("2026-01-31", "2026-02-01"),
+                            "optimized": False})
+    # Yazıcı sıralar: karışık girdi aynı dosyayı üretmeli
+    return records[::-1]
+
+
+def expected(records):
+    return sorted(({**r, "timestamp": float(r["timestamp"])} for r in records),
+                  key=lambda r: (r["date"], r["timestamp"]))
+
+
+@pytest.fixture(params=["none", "gzip"])
+def binary(request, tmp_path):
+    path = str(tmp_path / "price-history.bin")
+    history_store.write_binary(make_records(), path, compression=request.param)
+    with open(path, "rb") as f:
+        return history.parse_binary_history(f.read())
+
+
+def test_round_trip(binary):
+    assert binary.row_count == 9
+    assert history.history_records(binary) == expected(make_records())
+    # Peak satırları indeksten okunur
+    assert [history.history_records(binary)[i]["time"] for i in binary.peak_rows] == ["12:00"] * 3
+
+
+def test_range_decode_matches_full_decode(binary):
+    full = expected(make_records())
+    for date in DAYS:
+        assert history.decode_binary_day(binary, date) == [r for r in full if r["date"] == date]
+    assert history.decode_binary_day(binary, "2026-03-01") == []
+    # Gün sınırını aşan aralık: tarih her satır için gün indeksinden bulunur
+    assert history.decode_binary_rows(binary, 2, 7) == full[2:7]
+    rows = history._BinaryRecords(binary)
+    assert len(rows) == 9
+    assert [rows[i] for i in range(9)] == full
+
+
+def test_binary_snapshot_matches_json(binary):
+    records = expected(make_records())
+    for today in DAYS:
+        from_json = snapshot.build_history_snapshot(records, today, 1)
+        from_binary = snapshot.build_binary_snapshot(binary, today, 1)
+        assert from_binary.today_records == from_json.today_records
+        assert from_binary.daily_peaks == from_json.daily_peaks
+        assert dict(from_binary.monthly_peaks) == dict(from_json.monthly_peaks)
+
+
+def test_rejects_other_formats():
+    with pytest.raises(ValueError):
+        history.parse_binary_history(b"PHB2" + bytes(history.BINARY_HEADER.size))
@@ -0,0 +1,108 @@
+"""
+Devre kesici: kapalı -> (eşik kadar hata) açık -> (bekleme sonunda tek deneme)
+yarı açık -> kapalı/açık. Kaynak çökük veya devre açıkken son bilinen fiyat döner.
+"""
+import os
+import types
+
+import pytest
+
+from core import breaker, prices
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'gram-altin.html')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(breaker, "time", types.SimpleNamespace(time=lambda: now[0]))
+    monkeypatch.setattr(breaker, "BREAKER_THRESHOLD", 3)
+    monkeypatch.setattr(breaker, "BREAKER_COOLDOWN", 30)
+    return now
+
+
+def test_state_machine(clock):
+    b = breaker.CircuitBreaker("gold")
+    b.record_failure()
+    b.record_failure()
+    b.record_success(0.1)
+    # Başarı ardışık hata sayacını sıfırlar
+    b.record_failure()
+    b.record_failure()
+    assert b.state == "closed" and b.allow()
+
+    b.record_failure()
+    assert b.state == "open"
+    assert not b.allow()
+    with pytest.raises(breaker.CircuitOpen):
+        b.check()
+    clock[0] += 10
+    assert b.retry_in() == 20
+
+    # Bekleme bitti: yalnızca tek deneme geçer, başarısızsa yeniden açılır
+    clock[0] += 20
+    assert b.allow()
+    assert b.state == "half_open"
+    assert not b.allow()
+    b.record_failure()
+    assert b.state == "open"
+    assert not b.allow()
+
+    clock[0] += 30
+    assert b.allow()
+    b.record_success(0.2)
+    assert b.state == "closed"
+    assert b.allow() and b.allow()
+    assert b.status()["consecutive_failures"] == 0
+    assert {k: b.stats[k] for k in ("opens", "rejected")} == {"opens": 2, "rejected": 4}
+
+
+@pytest.fixture
+def gold(clock, monkeypatch):
+    monkeypatch.setitem(prices.breakers, "gold", breaker.CircuitBreaker("gold"))
+    monkeypatch.setitem(prices.price_cache_stats, "gold", dict.fromkeys(prices.price_cache_stats["gold"], 0))
+    monkeypatch.setattr(prices, "_price_cache", {})
+    monkeypatch.setattr(prices, "_inflight", {})
+    calls = []
+    upstream = {"up": False}
+
+    class Response:
+        with open(FIXTURE, 'rb') as f:
+            content = f.read()
+
+        def raise_for_status(self):
+            pass
+
+    def http_get(url, headers=None, read_timeout=None, session=None):
+        calls.append(url)
+        if not upstream["up"]:
+            raise ConnectionError("down")
+        return Response()
+    monkeypatch.setattr(prices, "http_get", http_get)
+    return calls, upstream
+
+
+def test_last_known_good_while_down_and_open(gold, clock):
+    calls, upstream = gold
+    # Önbellekte yalnızca bayat penceresini de geçmiş bir değer var
+    prices._price_cache["gold"] = {"value": "5.800,00", "fetched_at": 0.0}
+
+    for _ in range(4):
+        assert prices.get_cached_price("gold", deadline=5) == ("5.800,00", 0.0)
+    # Üç hata devreyi açtı; dördüncü istek kaynağa gitmeden son bilinen değeri aldı
+    assert len(calls) == 3
+    assert prices.breakers["gold"].state == "open"
+    assert prices.price_cache_stats["gold"]["fallbacks"] == 4
+
+    # Bekleme sonunda deneme isteği başarılı: devre kapanır, yeni değer döner
+    clock[0] += 30
+    upstream["up"] = True
+    value, _ = prices.get_cached_price("gold", deadline=5)
+    assert value == "5.812,34"
+    assert prices.breakers["gold"].state == "closed"
+
+
+def test_no_fallback_without_previous_value(gold):
+    with pytest.raises(Exception, match="Gold price error"):
+        prices.get_cached_price("gold", deadline=5)
+    assert prices.price_cache_stats["gold"]["fallbacks"] == 0
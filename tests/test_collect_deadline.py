@@ -0,0 +1,62 @@
+"""
+Toplama son teslimi: istek zaman aşımı ve yeniden denemeler kalan süreden hesaplanır,
+yavaş kaynak toplam süreyi COLLECT_DEADLINE'ın ötesine taşımaz
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import price_tracker
+
+
+@pytest.fixture
+def server():
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            calls.append(self.path)
+            if self.path == "/slow":
+                time.sleep(3)
+            status = 503 if self.path == "/flaky" and len(calls) == 1 else 200
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", calls
+    httpd.shutdown()
+
+
+def test_slow_source_finishes_by_deadline(server, monkeypatch):
+    base, _ = server
+    monkeypatch.setattr(price_tracker, "MIN_ATTEMPT_SECONDS", 0.1)
+    workers = []
+
+    def slow(deadline_at):
+        workers.append(threading.current_thread())
+        return price_tracker.fetch_page(f"{base}/slow", {}, deadline_at).text
+
+    started = time.monotonic()
+    results = price_tracker.fetch_prices_concurrently({"slow": slow}, deadline=1.0)
+    assert results == {"slow": None}
+    # Thread da son teslimde biter; süreç çıkışta onu beklemez
+    workers[0].join(1.0)
+    assert not workers[0].is_alive()
+    assert time.monotonic() - started < 2.0
+
+
+def test_retryable_status_is_retried_within_deadline(server, monkeypatch):
+    base, calls = server
+    monkeypatch.setattr(price_tracker, "RETRY_BACKOFF", 0.01)
+    response = price_tracker.fetch_page(f"{base}/flaky", {}, time.monotonic() + 5)
+    assert response.text == "ok"
+    assert calls == ["/flaky", "/flaky"]
@@ -0,0 +1,52 @@
+"""
+Hızlı çıkarıcı ile BeautifulSoup yolu kayıtlı sayfalarda aynı sonucu vermeli
+(tests/fixtures: kaynak sitelerin fiyat çevresindeki işaretlemesini taklit eden, elle
+yazılmış sentetik sayfalar - canlı kopya değil; fiyatlar sabittir)
+"""
+import os
+
+import pytest
+
+from core import extract
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+SOCKET_PAGES = {
+    "gram-altin.html": ("6-gram-altin", "5.812,34"),
+    "gumus.html": ("5-gumus", "68,4120"),
+}
+BLOOMBERG_PAGES = {
+    "altin-ons.html": {"price": "4.012,57", "direction": "up", "change_percent": "%0,54"},
+    "gumus-ons.html": {"price": "46,8120", "direction": "down", "change_percent": "%-1,12"},
+}
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", sorted(SOCKET_PAGES))
+@pytest.mark.parametrize("attr", ["bid", "ask"])
+def test_socket_extractors_agree(name, attr):
+    content = fixture(name)
+    key, bid = SOCKET_PAGES[name]
+    fast = extract.fast_socket_price(content, key, attr)
+    assert fast is not None
+    assert fast == extract.bs4_socket_price(content, key, attr)
+    if attr == "bid":
+        assert fast == bid
+
+
+@pytest.mark.parametrize("name", sorted(BLOOMBERG_PAGES))
+def test_bloomberg_extractors_agree(name):
+    content = fixture(name)
+    fast = extract.fast_bloomberg_quote(content)
+    assert fast == extract.bs4_bloomberg_quote(content)
+    assert fast == BLOOMBERG_PAGES[name]
+
+
+def test_missing_target_falls_back_to_bs4():
+    content = fixture("gram-altin.html")
+    assert extract.fast_socket_price(content, "9-yok") is None
+    assert extract.extract_socket_price(content, "9-yok") is None
@@ -0,0 +1,57 @@
+"""
+/api/history: imleçle sayfalama aynı timestamp'li öğeleri sayfa sınırında atlamaz
+veya tekrarlamaz; geçersiz parametre 400, kaynak alınamazsa 503
+"""
+import pytest
+
+import core
+import index
+
+# Sayfa sınırlarına denk gelen tekrar eden timestamp'ler
+TIMESTAMPS = [100, 200, 200, 200, 300, 300, 400, 500, 500]
+ITEMS = [{"timestamp": ts, "n": n} for n, ts in enumerate(TIMESTAMPS)]
+
+
+@pytest.fixture
+def series(monkeypatch):
+    monkeypatch.setattr(core.snapshot, "get_history_series", lambda resolution: ("v1", (TIMESTAMPS, ITEMS)))
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4])
+def test_cursor_pages_cover_duplicates_once(series, limit):
+    seen = []
+    cursor = None
+    while True:
+        _, page = core.snapshot.query_history("raw", float("-inf"), float("inf"), limit, cursor)
+        assert page["count"] <= limit
+        seen.extend(item["n"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(range(len(ITEMS)))
+
+
+def test_cursor_respects_range(series):
+    _, page = core.snapshot.query_history("raw", 200, 500, 2)
+    assert [item["n"] for item in page["items"]] == [1, 2]
+    _, page = core.snapshot.query_history("raw", 200, 500, 2, page["next_cursor"])
+    assert [item["n"] for item in page["items"]] == [3, 4]
+    _, page = core.snapshot.query_history("raw", 200, 500, 2, page["next_cursor"])
+    assert [item["n"] for item in page["items"]] == [5, 6]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.parametrize("query", ["resolution=weekly", "cursor=bm90Om51bQ", "from=yesterday"])
+def test_invalid_parameters_are_400(series, query):
+    response = index.app.test_client().get(f"/api/history?{query}")
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+def test_unavailable_source_is_503(monkeypatch):
+    def unavailable(resolution):
+        raise Exception("hourly rollups unavailable")
+    monkeypatch.setattr(core.snapshot, "get_history_series", unavailable)
+    response = index.app.test_client().get("/api/history?resolution=hourly")
+    assert response.status_code == 503
+    assert response.get_json() == {"success": False, "error": "hourly rollups unavailable"}
@@ -0,0 +1,105 @@
+"""
+Geçmişin disk kopyası: TTL içindeki kopya istek atmadan servis edilir; süresi dolan
+kopya hemen döner ve tek bir koşullu yenileme (kopyanın ETag'iyle) yapılır
+"""
+import json
+import os
+import time
+
+import pytest
+
+from core import history
+
+URL = "https://example.com/price-history.json"
+
+
+class Response:
+    def __init__(self, status_code, content=b"", etag=None):
+        self.status_code, self.content = status_code, content
+        self.headers = {"ETag": etag} if etag else {}
+
+
+class InlineThread:
+    def __init__(self, target, args=(), **kwargs):
+        self.target, self.args = target, args
+
+    def start(self):
+        self.target(*self.args)
+
+
+@pytest.fixture
+def disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_FORMAT", "json")
+    monkeypatch.setattr(history, "HISTORY_URL", URL)
+    monkeypatch.setattr(history, "HISTORY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(history, "_history_cache",
+                        {"data": None, "etag": None, "fetched_at": 0.0, "version": 0, "failed_at": 0.0})
+    monkeypatch.setattr(history, "_history_inflight", None)
+    monkeypatch.setattr(history, "history_cache_stats", dict.fromkeys(history.history_cache_stats, 0))
+    monkeypatch.setattr(history.threading, "Thread", InlineThread)
+    requests = []
+    replies = []
+
+    def http_get(url, headers=None, read_timeout=None):
+        requests.append(headers or {})
+        return replies.pop(0)
+    monkeypatch.setattr(history, "http_get", http_get)
+
+    def write(records, etag, age):
+        data_path, meta_path = history._disk_paths()
+        with open(data_path, "w", encoding="utf-8") as f:
+            json.dump({"records": records}, f)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"source": history.history_source(), "etag": etag, "fetched_at": time.time() - age}, f)
+    return write, requests, replies
+
+
+def test_fresh_disk_copy_is_served_without_request(disk):
+    write, requests, _ = disk
+    write([{"gold_price": 1.0}], '"disk"', age=10)
+    assert history.load_price_history() == {"records": [{"gold_price": 1.0}]}
+    assert history.load_price_history()["records"][0]["gold_price"] == 1.0
+    assert requests == []
+    assert history.history_cache_stats["disk_loads"] == 1
+    assert history.history_cache_stats["hits"] == 2
+
+
+def test_expired_copy_revalidates_with_its_etag(disk):
+    write, requests, replies = disk
+    write([{"gold_price": 1.0}], '"disk"', age=history.HISTORY_TTL + 10)
+    replies.append(Response(304))
+    assert history.load_price_history()["records"][0]["gold_price"] == 1.0
+    assert requests == [{"If-None-Match": '"disk"'}]
+    assert history.history_cache_stats["not_modified"] == 1
+
+    # 304 meta'yı tazeledi: yeni süreç kopyayı taze bulur
+    with open(history._disk_paths()[1], encoding="utf-8") as f:
+        assert time.time() - json.load(f)["fetched_at"] < 5
+    history.load_price_history()
+    assert len(requests) == 1
+
+
+def test_expired_copy_is_replaced_on_change(disk):
+    write, requests, replies = disk
+    write([{"gold_price": 1.0}], '"disk"', age=history.HISTORY_TTL + 10)
+    replies.append(Response(200, json.dumps({"records": [{"gold_price": 2.0}]}).encode(), '"new"'))
+    # Eski kopya beklemeden döner, yenileme sonrası yenisi
+    assert history.load_price_history()["records"][0]["gold_price"] == 1.0
+    assert history.load_price_history()["records"][0]["gold_price"] == 2.0
+
+    data_path, meta_path = history._disk_paths()
+    with open(data_path, encoding="utf-8") as f:
+        assert json.load(f)["records"][0]["gold_price"] == 2.0
+    with open(meta_path, encoding="utf-8") as f:
+        assert json.load(f)["etag"] == '"new"'
+
+
+def test_copy_from_other_source_is_ignored(disk, monkeypatch):
+    write, requests, replies = disk
+    write([{"gold_price": 1.0}], '"disk"', age=10)
+    monkeypatch.setattr(history, "HISTORY_URL", URL + "?v=2")
+    replies.append(Response(200, b'{"records": [{"gold_price": 3.0}]}', '"other"'))
+    assert history.load_price_history()["records"][0]["gold_price"] == 3.0
+    assert requests == [{}]
+    assert history.history_cache_stats["disk_loads"] == 0
+    assert os.path.exists(history._disk_paths()[0])
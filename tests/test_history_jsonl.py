@@ -0,0 +1,158 @@
+"""
+API'nin jsonl deposu okuyucusu: dışa aktarılan eski belgeyle aynı kayıtlar, ve bir
+toplamadan sonra yalnızca değişen segment yeniden okunur
+"""
+import json
+import os
+import shutil
+
+import pytest
+
+import history_store
+from core import history
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    base_dir = str(tmp_path / "history")
+    monkeypatch.setattr(history, "HISTORY_FORMAT", "jsonl")
+    monkeypatch.setattr(history, "HISTORY_JSONL_URL", base_dir)
+    monkeypatch.setattr(history, "HISTORY_CACHE_DIR", "off")
+    monkeypatch.setattr(history, "_segment_cache", {})
+    monkeypatch.setattr(history, "_history_cache",
+                        {"data": None, "etag": None, "fetched_at": 0.0, "version": 0, "failed_at": 0.0})
+    records = []
+    for day, month in ((5, "2026-01"), (6, "2026-01"), (3, "2026-02")):
+        for hour, gold in ((9, 100.0), (12, 110.0), (15, 105.0)):
+            ts = len(records) * 3600 + 1767225600
+            records.append({"timestamp": ts, "date": f"{month}-{day:02d}", "time": f"{hour:02d}:00",
+                            "gold_price": gold + day, "silver_price": 10.0, "portfolio_value": gold + day + 10.0,
+                            "daily_peak": False, "monthly_peak": False})
+    manifest = history_store.migrate_from_legacy({"records": []}, base_dir)
+    for record in records:
+        history_store.append_record(manifest, record, base_dir)
+        history_store.record_peaks(manifest, record, base_dir)
+    history_store.save_manifest(manifest, base_dir)
+    return tmp_path, base_dir, manifest
+
+
+def exported(tmp_path, manifest, base_dir):
+    out = str(tmp_path / "price-history.json")
+    history_store.export_legacy(manifest, out, base_dir)
+    with open(out, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_jsonl_history_matches_legacy_export(store):
+    tmp_path, base_dir, manifest = store
+    history._fetch_price_history()
+    data = history._history_cache["data"]
+    assert data["records"] == exported(tmp_path, manifest, base_dir)["records"]
+    assert data["total_records"] == 9
+
+
+def test_jsonl_refresh_reads_only_changed_segments(store, monkeypatch):
+    tmp_path, base_dir, manifest = store
+    history._fetch_price_history()
+    january = history._segment_cache["2026-01"][1]
+
+    record = {"timestamp": 1767225600 + 10 * 3600, "date": "2026-02-03", "time": "18:00",
+              "gold_price": 200.0, "silver_price": 10.0, "portfolio_value": 210.0,
+              "daily_peak": False, "monthly_peak": False}
+    history_store.append_record(manifest, record, base_dir)
+    history_store.record_peaks(manifest, record, base_dir)
+    history_store.save_manifest(manifest, base_dir)
+
+    reads = []
+    fetch_source = history._fetch_source
+    monkeypatch.setattr(history, "_fetch_source", lambda url, etag=None: reads.append(url) or fetch_source(url, etag))
+    history._fetch_price_history()
+
+    # Yeni kayıt Şubat'ın peak'i oldu: o ayın peak dosyası da gelir, Ocak hiç okunmaz
+    assert [url.split("/history/", 1)[1] for url in reads] == ["manifest.json", "2026-02.jsonl", "peaks/2026-02.json"]
+    assert history._segment_cache["2026-01"][1] is january
+    data = history._history_cache["data"]
+    assert data["records"] == exported(tmp_path, manifest, base_dir)["records"]
+    assert data["records"][-1]["daily_peak"] and data["records"][-1]["monthly_peak"]
+
+
+def test_daily_and_monthly_served_from_rollup_tiers(store, monkeypatch):
+    from core import snapshot
+    tmp_path, base_dir, manifest = store
+    monkeypatch.setattr(history, "_rollups_cache",
+                        {tier: {"data": None, "etag": None, "fetched_at": 0.0, "version": 0, "failed_at": 0.0}
+                         for tier in history.ROLLUP_TIERS})
+    monkeypatch.setattr(snapshot, "_tier_views", {})
+    monkeypatch.setattr(snapshot, "_snapshot", None)
+    monkeypatch.setattr(snapshot, "_range_index", {"version": None, "series": {}})
+
+    # Katman yokken peak bayraklarına düşülür
+    shutil.rmtree(os.path.join(base_dir, "rollups"), ignore_errors=True)
+    _, flags_page = snapshot.query_history("daily", 0, float("inf"))
+    assert [item["date"] for item in flags_page["items"]] == ["2026-01-05", "2026-01-06", "2026-02-03"]
+    assert "gold" not in flags_page["items"][0]
+
+    history_store.ensure_rollups(history_store.iter_records(manifest, base_dir), base_dir)
+    monkeypatch.setattr(history, "_rollups_cache",
+                        {tier: {"data": None, "etag": None, "fetched_at": 0.0, "version": 0, "failed_at": 0.0}
+                         for tier in history.ROLLUP_TIERS})
+    _, page = snapshot.query_history("daily", 0, float("inf"))
+    assert [{k: item[k] for k in ("date", "time", "gold", "count")} for item in page["items"]] == [
+        {"date": "2026-01-05", "time": "12:00", "gold": [105.0, 115.0, 105.0, 110.0], "count": 3},
+        {"date": "2026-01-06", "time": "12:00", "gold": [106.0, 116.0, 106.0, 111.0], "count": 3},
+        {"date": "2026-02-03", "time": "12:00", "gold": [103.0, 113.0, 103.0, 108.0], "count": 3},
+    ]
+    table = snapshot.get_table_data()
+    assert [row["gold_price"] for row in table["daily"]] == [115.0, 116.0, 113.0]
+    assert table["daily"] == snapshot.get_daily_optimized_data(snapshot.get_history_snapshot())
+
+
+def test_short_segment_body_is_not_cached(store, monkeypatch):
+    tmp_path, base_dir, manifest = store
+    reads = []
+    short = [True]
+    fetch_source = history._fetch_source
+
+    def short_january(url, etag=None):
+        reads.append(url)
+        status_code, content, etag = fetch_source(url, etag)
+        if url.endswith("2026-01.jsonl") and short[0]:
+            # CDN'den yarım gelen gövde: son satır eksik
+            content = content[:content.rstrip(b"\n").rfind(b"\n") + 1]
+        return status_code, content, etag
+
+    monkeypatch.setattr(history, "_fetch_source", short_january)
+    history._fetch_price_history()
+    assert "2026-01" not in history._segment_cache
+    assert history._history_cache["data"]["total_records"] == 8
+
+    reads.clear()
+    short[0] = False
+    monkeypatch.setattr(history, "_history_cache", {**history._history_cache, "etag": None})
+    history._fetch_price_history()
+    assert [url.split("/history/", 1)[1] for url in reads] == ["manifest.json", "2026-01.jsonl"]
+    assert history._history_cache["data"]["records"] == exported(tmp_path, manifest, base_dir)["records"]
+
+
+def test_legacy_fallback_keeps_its_own_validator(store, monkeypatch):
+    tmp_path, base_dir, manifest = store
+    legacy = tmp_path / "price-history.json"
+    legacy.write_text(json.dumps(exported(tmp_path, manifest, base_dir)), encoding="utf-8")
+    shutil.rmtree(base_dir)
+    monkeypatch.setattr(history, "HISTORY_URL", str(legacy))
+    monkeypatch.setattr(history, "_fallback_etag", None)
+    requests = []
+    fetch_source = history._fetch_source
+    monkeypatch.setattr(history, "_fetch_source",
+                        lambda url, etag=None: requests.append((os.path.basename(url), etag)) or fetch_source(url, etag))
+
+    history._fetch_price_history()
+    assert history._history_cache["data"]["total_records"] == 9
+    assert history._history_cache["etag"] is None
+
+    requests.clear()
+    history._fetch_price_history()
+    # Manifest'e kanonik JSON'un ETag'i gönderilmez; o ETag yalnızca JSON'a gider
+    assert requests[0] == ("manifest.json", None)
+    assert requests[1] == ("price-history.json", history._fallback_etag)
+    assert history.history_cache_stats["not_modified"] >= 1
@@ -0,0 +1,43 @@
+"""
+get_history_snapshot: arka plan yenilemesi yükleyici döndükten hemen sonra bitse de
+snapshot'ın sürümü içindeki veriyle eşleşir, yeni sürüm bir sonraki çağrıda kurulur
+"""
+import time
+
+from core import history, snapshot
+
+
+def record(gold):
+    return {"timestamp": 1767261600, "date": "2026-01-01", "time": "10:00:00",
+            "gold_price": gold, "silver_price": 5.0, "portfolio_value": gold + 5.0, "daily_peak": True}
+
+
+class InlineThread:
+    """Yenileme thread'ini start() içinde bitirir: yarış penceresi her seferinde açılır"""
+    def __init__(self, target, args=(), **kwargs):
+        self.target, self.args = target, args
+
+    def start(self):
+        self.target(*self.args)
+
+
+def test_snapshot_version_matches_its_data(monkeypatch):
+    monkeypatch.setattr(history, "_history_cache",
+                        {"data": {"records": [record(100.0)]}, "etag": '"a"', "fetched_at": time.time() - 10 ** 6,
+                         "version": 1, "failed_at": 0.0})
+    monkeypatch.setattr(history, "_history_inflight", None)
+    monkeypatch.setattr(history.threading, "Thread", InlineThread)
+    monkeypatch.setattr(history, "_fetch_price_history",
+                        lambda: history._store_history({"records": [record(200.0)]}, b"", '"b"'))
+    monkeypatch.setattr(snapshot, "_snapshot", None)
+
+    stale = snapshot.get_history_snapshot()
+    assert stale.version == 1
+    assert stale.daily_peaks[0]["gold_price"] == 100.0
+    # Yeni ETag eski sürümün verisine verilmez
+    assert history.history_tag(stale.version) == 1
+
+    fresh = snapshot.get_history_snapshot()
+    assert fresh.version == 2
+    assert fresh.daily_peaks[0]["gold_price"] == 200.0
+    assert history.history_tag(fresh.version) == '"b"'
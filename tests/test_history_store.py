@@ -0,0 +1,243 @@
+"""
+Append-only depo: eski JSON'dan taşıma, dışa aktarma, temizlik sıkıştırması ve
+yarım kalan yazmalardan sonra manifest onarımı
+"""
+import json
+import os
+
+import history_store
+
+
+def make_record(ts, gold, silver, **flags):
+    date = f"2026-01-{1 + ts // 86400:02d}"
+    return {
+        "timestamp": ts,
+        "date": date,
+        "time": f"{ts % 86400 // 3600:02d}:{ts % 3600 // 60:02d}",
+        "gold_price": gold,
+        "silver_price": silver,
+        "portfolio_value": gold + silver,
+        "daily_peak": flags.get("daily_peak", False),
+        "monthly_peak": flags.get("monthly_peak", False),
+    }
+
+
+def collect(manifest, record, base_dir):
+    history_store.append_record(manifest, record, base_dir)
+    history_store.record_peaks(manifest, record, base_dir)
+
+
+def legacy_document():
+    records = [
+        make_record(3600, 100.0, 10.0),
+        make_record(7200, 105.0, 10.0, daily_peak=True, monthly_peak=True),
+        make_record(86400 + 3600, 101.0, 10.0, daily_peak=True),
+        make_record(86400 + 7200, 99.0, 10.0),
+    ]
+    return {"records": records, "last_update": "2026-01-02T02:00:00+00:00", "total_records": len(records)}
+
+
+def test_migrate_and_export_round_trip(tmp_path):
+    base_dir = str(tmp_path / "history")
+    legacy = legacy_document()
+    manifest = history_store.migrate_from_legacy(legacy, base_dir)
+
+    assert manifest["segments"]["2026-01"]["records"] == 4
+    assert manifest["meta"] == {"last_update": "2026-01-02T02:00:00+00:00"}
+
+    out = str(tmp_path / "price-history.json")
+    assert history_store.export_legacy(manifest, out, base_dir) == 4
+    with open(out, encoding="utf-8") as f:
+        exported = json.load(f)
+    assert exported["records"] == legacy["records"]
+    assert "rollups" not in exported
+    assert os.path.exists(str(tmp_path / "price-history.bin"))
+
+
+def test_append_writes_one_line(tmp_path):
+    base_dir = str(tmp_path / "history")
+    manifest = history_store.migrate_from_legacy(legacy_document(), base_dir)
+    path = history_store.segment_path("2026-01", base_dir)
+    before = os.path.getsize(path)
+
+    record = make_record(86400 + 10800, 120.0, 10.0)
+    collect(manifest, record, base_dir)
+
+    line = history_store.encode_record(record).encode("utf-8")
+    assert os.path.getsize(path) == before + len(line)
+    segment = manifest["segments"]["2026-01"]
+    assert {k: segment[k] for k in ("records", "bytes", "raw_from")} == \
+        {"records": 5, "bytes": before + len(line), "raw_from": "2026-01-01"}
+    peaks = history_store.load_month_peaks("2026-01", base_dir)
+    assert peaks["daily"]["2026-01-02"]["timestamp"] == record["timestamp"]
+    assert peaks["monthly"]["2026-01"]["timestamp"] == record["timestamp"]
+    with open(history_store.peaks_path("2026-01", base_dir), "rb") as f:
+        assert segment["peaks"] == history_store.peaks_digest(f.read())
+
+
+def test_manifest_stays_small_and_compact(tmp_path):
+    base_dir = str(tmp_path / "history")
+    manifest = history_store.migrate_from_legacy({"records": []}, base_dir)
+    sizes = []
+    for day in range(60):
+        for hour in (9, 12, 15):
+            ts = 1767225600 + day * 86400 + hour * 3600
+            record = {"timestamp": ts, "date": f"2026-{1 + day // 31:02d}-{1 + day % 31:02d}", "time": f"{hour:02d}:00",
+                      "gold_price": 100.0 + day + hour, "silver_price": 10.0, "portfolio_value": 110.0 + day + hour}
+            history_store.append_record(manifest, record, base_dir)
+            history_store.record_peaks(manifest, record, base_dir)
+            history_store.save_manifest(manifest, base_dir)
+        sizes.append(os.path.getsize(os.path.join(base_dir, "manifest.json")))
+
+    # Peak indeksi manifest'te değil; manifest ay başına bir kayıtla büyür, günle değil
+    assert "peaks" not in manifest
+    assert sizes[59] - sizes[45] < 8 and sizes[59] < 400
+    with open(os.path.join(base_dir, "manifest.json"), encoding="utf-8") as f:
+        assert "\n" not in f.read()
+    assert len(history_store.load_month_peaks("2026-02", base_dir)["daily"]) == 29
+
+
+def test_open_store_moves_peaks_out_of_old_manifest(tmp_path):
+    base_dir = str(tmp_path / "history")
+    manifest = history_store.migrate_from_legacy(legacy_document(), base_dir)
+    peaks = history_store.load_peaks(manifest, base_dir)
+    old = {**manifest, "segments": {m: {k: v for k, v in seg.items() if k != "peaks"}
+                                    for m, seg in manifest["segments"].items()}, "peaks": peaks}
+    with open(os.path.join(base_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(old, f, indent=1)
+    os.remove(history_store.peaks_path("2026-01", base_dir))
+
+    reopened = history_store.open_store(base_dir, str(tmp_path / "missing.json"))
+
+    assert "peaks" not in reopened and "peaks" not in history_store.load_manifest(base_dir)
+    assert history_store.load_peaks(reopened, base_dir) == peaks
+
+
+def test_compact_segment_keeps_peaks(tmp_path):
+    base_dir = str(tmp_path / "history")
+    manifest = history_store.migrate_from_legacy(legacy_document(), base_dir)
+    peaks = history_store.load_peaks(manifest, base_dir)
+
+    def keep(record):
+        history_store.apply_peak_flags(record, peaks)
+        return record["daily_peak"] or record["monthly_peak"]
+
+    stats = history_store.compact_segment("2026-01", keep, base_dir)
+
+    assert (stats["initial"], stats["final"]) == (4, 2)
+    kept = list(history_store.iter_segment("2026-01", base_dir))
+    assert [r["timestamp"] for r in kept] == [7200, 86400 + 3600]
+    assert stats["bytes_written"] == os.path.getsize(history_store.segment_path("2026-01", base_dir))
+    assert stats["rewritten"]
+
+
+def test_compact_segment_leaves_untouched_file_alone(tmp_path):
+    base_dir = str(tmp_path / "history")
+    manifest = history_store.migrate_from_legacy(legacy_document(), base_dir)
+    path = history_store.segment_path("2026-01", base_dir)
+    # Boş satır sayılmaz ama dosyada yer tutar: yeniden yazılmayan dosyanın boyutu değişmemeli
+    with open(path, "ab") as f:
+        f.write(b"\n")
+    size = os.path.getsize(path)
+
+    stats = history_store.compact_segment("2026-01", lambda record: True, base_dir)
+    assert (stats["initial"], stats["final"], stats["rewritten"], stats["bytes_written"]) == (4, 4, False, 0)
+    assert os.path.getsize(path) == size
+    assert not os.path.exists(path + ".tmp")
+    assert manifest["segments"]["2026-01"]["records"] == 4
+
+
+def test_open_store_recovers_unrecorded_tail(tmp_path):
+    base_dir = str(tmp_path / "history")
+    history_store.migrate_from_legacy(legacy_document(), base_dir)
+    # Satır yazıldı, manifest kaydedilemeden çalışma kesildi; sonraki satır yarım kaldı
+    record = make_record(86400 + 10800, 120.0, 10.0)
+    path = history_store.segment_path("2026-01", base_dir)
+    with open(path, "ab") as f:
+        f.write(history_store.encode_record(record).encode("utf-8"))
+        f.write(b'{"timestamp": 999')
+
+    manifest = history_store.open_store(base_dir, str(tmp_path / "missing.json"))
+
+    assert manifest["segments"]["2026-01"]["records"] == 5
+    assert manifest["segments"]["2026-01"]["bytes"] == os.path.getsize(path)
+    assert history_store.load_month_peaks("2026-01", base_dir)["daily"]["2026-01-02"]["timestamp"] == record["timestamp"]
+    assert list(history_store.iter_segment("2026-01", base_dir))[-1] == record
+    # Onarım kalıcı; ikinci açılış bir şey değiştirmez
+    assert history_store.load_manifest(base_dir) == manifest
+    assert history_store.reconcile_manifest(manifest, base_dir) == []
+
+
+def test_open_store_rebuilds_missing_manifest_from_segments(tmp_path):
+    base_dir = str(tmp_path / "history")
+    legacy_path = str(tmp_path / "price-history.json")
+    with open(legacy_path, "w", encoding="utf-8") as f:
+        json.dump(legacy_document(), f)
+    manifest = history_store.open_store(base_dir, legacy_path)
+    collect(manifest, make_record(86400 + 10800, 120.0, 10.0), base_dir)
+    history_store.save_manifest(manifest, base_dir)
+    os.remove(os.path.join(base_dir, "manifest.json"))
+
+    rebuilt = history_store.open_store(base_dir, legacy_path)
+
+    # Segmentler eski JSON'dan yeni: yeniden taşınmaz, eklenen satır kaybolmaz
+    assert rebuilt["segments"]["2026-01"]["records"] == 5
+    assert history_store.load_peaks(rebuilt, base_dir) == history_store.load_peaks(manifest, base_dir)
+    assert rebuilt["meta"] == {"last_update": "2026-01-02T02:00:00+00:00"}
+
+
+def test_rollups_are_one_bucket_per_line_and_idempotent(tmp_path):
+    base_dir = str(tmp_path / "history")
+    records = legacy_document()["records"]
+    rollups = history_store.build_rollups(records)
+    history_store.update_rollups(rollups, records[-1])
+    assert rollups == history_store.build_rollups(records)
+
+    history_store.save_rollups(rollups, base_dir)
+    with open(history_store.rollup_path("hourly", base_dir), encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == len(rollups["hourly"])
+    assert history_store.load_rollups(base_dir) == rollups
+
+
+def test_append_rollups_patches_only_current_buckets(tmp_path):
+    base_dir = str(tmp_path / "history")
+    records = legacy_document()["records"]
+    history_store.ensure_rollups(records[:2], base_dir)
+    for record in records[2:]:
+        sizes = {tier: os.path.getsize(history_store.rollup_path(tier, base_dir)) for tier in ("hourly", "daily", "monthly")}
+        written = history_store.append_rollups(record, base_dir)
+        grown = {tier: os.path.getsize(history_store.rollup_path(tier, base_dir)) - sizes[tier] for tier in sizes}
+        # Katman başına tek satır eklenir, dosyanın geri kalanı yeniden yazılmaz
+        assert sum(grown.values()) == written and all(0 < n < 400 for n in grown.values())
+    # Aynı kayıt ikinci kez işlenmez
+    assert history_store.append_rollups(records[-1], base_dir) == 0
+
+    # Son satır kazanır: okuyucunun gördüğü, baştan kurulanla aynı
+    assert history_store.load_rollups(base_dir) == history_store.build_rollups(records)
+    history_store.compact_rollups(base_dir)
+    with open(history_store.rollup_path("monthly", base_dir), encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 1
+    assert history_store.load_rollups(base_dir) == history_store.build_rollups(records)
+
+
+def test_append_rollups_handles_late_record_and_torn_line(tmp_path):
+    base_dir = str(tmp_path / "history")
+    records = legacy_document()["records"]
+    history_store.ensure_rollups([records[0], records[2]], base_dir)
+    with open(history_store.rollup_path("hourly", base_dir), "ab") as f:
+        f.write(b'{"key":"2026-01-02T0')
+    # Önceki güne ait geç kayıt: eski saatlik/günlük kova dosya taranarak bulunur
+    # (aylık kova "until" kuralıyla ondan yeni bir kaydı zaten işlemiş, atlar)
+    history_store.append_rollups(records[1], base_dir)
+    history_store.append_rollups(records[3], base_dir)
+    rollups, expected = history_store.load_rollups(base_dir), history_store.build_rollups(records)
+    assert rollups["hourly"] == expected["hourly"]
+    assert rollups["daily"] == expected["daily"]
+
+
+def test_write_json_atomic_returns_bytes_on_disk(tmp_path):
+    path = str(tmp_path / "doc.json")
+    written = history_store.write_json_atomic(path, {"fiyat": "altın", "records": [1, 2]}, indent=2)
+    assert written == os.path.getsize(path)
+    assert not os.path.exists(path + ".tmp")
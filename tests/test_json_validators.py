@@ -0,0 +1,73 @@
+"""
+JSON API ara katmanı: /api/table-data ve /api/snapshot eşik üstü gövdeyi gzip'ler,
+ETag kodlamaya göre ayrışır, eşleşen If-None-Match 304 döner - Flask ve ASGI'de aynı
+"""
+import gzip
+import json
+
+import pytest
+
+import core
+
+ROWS = [{"time": f"{day:02d}.01.2026", "gold_price": 4000.0 + day, "silver_price": 50.0} for day in range(1, 29)]
+
+
+@pytest.fixture(autouse=True)
+def data(monkeypatch):
+    async def ready():
+        pass
+
+    async def async_snapshot():
+        return {"gold": {"success": True, "price": 4000.0}, "table": {"daily": ROWS}}
+
+    monkeypatch.setattr(core.aio, "ensure_history", ready)
+    monkeypatch.setattr(core.snapshot, "get_table_data", lambda: {"hourly": [], "daily": ROWS, "monthly": []})
+    monkeypatch.setattr(core.snapshot, "table_version", lambda: ("v1", "2026-01-28"))
+    monkeypatch.setattr(core.web, "_payload_cache", {})
+    monkeypatch.setattr(core.prices, "get_dashboard_snapshot",
+                        lambda: {"gold": {"success": True, "price": 4000.0}, "table": {"daily": ROWS}})
+    monkeypatch.setattr(core.aio, "get_dashboard_snapshot", async_snapshot)
+
+
+@pytest.mark.parametrize("path", ["/api/table-data", "/api/snapshot"])
+def test_gzip_etag_and_304(get, path):
+    status, headers, body = get(path, {"Accept-Encoding": "gzip"})
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in headers["vary"]
+    payload = json.loads(gzip.decompress(body))
+    assert payload["success"] is True
+    etag = headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    status, headers, body = get(path, {"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert status == 304
+    assert body == b""
+    assert headers["etag"] == etag
+
+    # Aynı içerik, sıkıştırılmamış: ayrı ETag, gzip ETag'i onu doğrulamaz
+    status, headers, body = get(path, {"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert status == 200
+    assert "content-encoding" not in headers
+    assert json.loads(body) == payload
+    assert headers["etag"] == etag.replace("-gzip", "")
+
+
+def test_table_etag_follows_version(get, monkeypatch):
+    _, headers, _ = get("/api/table-data", {"Accept-Encoding": "identity"})
+    status, _, _ = get("/api/table-data", {"Accept-Encoding": "identity", "If-None-Match": headers["etag"]})
+    assert status == 304
+
+    monkeypatch.setattr(core.snapshot, "get_table_data", lambda: {"hourly": [], "daily": ROWS[:1], "monthly": []})
+    monkeypatch.setattr(core.snapshot, "table_version", lambda: ("v2", "2026-01-28"))
+    status, new_headers, body = get("/api/table-data", {"Accept-Encoding": "identity", "If-None-Match": headers["etag"]})
+    assert status == 200
+    assert new_headers["etag"] != headers["etag"]
+    assert json.loads(body)["data"]["daily"] == ROWS[:1]
+
+
+def test_small_body_not_compressed(get):
+    status, headers, body = get("/api/portfolio-config", {"Accept-Encoding": "gzip"})
+    assert status == 200
+    assert "content-encoding" not in headers
+    assert json.loads(body)
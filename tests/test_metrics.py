@@ -0,0 +1,13 @@
+"""
+api_errors_total yalnızca rotaların yuttuğu hataları sayar
+"""
+from core import metrics, web
+
+
+def test_error_bodies():
+    assert metrics.is_error_body(web.dumps({'success': False, 'error': 'kaynak yok'}))
+    assert metrics.is_error_body(web.dumps({'valid': False, 'error': 'bozuk istek'}))
+    # Geçersiz oturum/şifre normal bir sonuçtur
+    assert not metrics.is_error_body(web.dumps({'valid': False}))
+    assert not metrics.is_error_body(web.dumps({'success': True, 'warmup': {'error': None}}))
+    assert not metrics.is_error_body(b'<html>"error": x</html>')
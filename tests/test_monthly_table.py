@@ -0,0 +1,52 @@
+"""
+Aylık tablo: son N takvim ayı (30 günlük adımlar değil) - ay sınırları, geriye bakış
+sayısı ve peak'i olmayan (boş) aylar
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+from core import snapshot
+
+
+@pytest.mark.parametrize("now, count, expected", [
+    # Ayın son anı / ilk anı: komşu aya taşmaz
+    (datetime(2026, 1, 31, 23, 59, tzinfo=timezone.utc), 3, ["2025-11", "2025-12", "2026-01"]),
+    (datetime(2026, 3, 1, 0, 0, tzinfo=timezone.utc), 3, ["2026-01", "2026-02", "2026-03"]),
+    # 31 günlük aydan sonra Şubat atlanmaz
+    (datetime(2026, 3, 31, tzinfo=timezone.utc), 2, ["2026-02", "2026-03"]),
+    (datetime(2026, 12, 15, tzinfo=timezone.utc), 1, ["2026-12"]),
+    (datetime(2026, 5, 10, tzinfo=timezone.utc), 14, [f"2025-{m:02d}" for m in range(4, 13)]
+     + [f"2026-{m:02d}" for m in range(1, 6)]),
+])
+def test_calendar_months(now, count, expected):
+    assert snapshot.calendar_months(now, count) == expected
+
+
+def peak(date, gold):
+    return {"date": date, "time": "12:00:00", "gold_price": gold, "silver_price": 10.0, "portfolio_value": gold + 10.0}
+
+
+def test_monthly_table_lookback_skips_empty_months(monkeypatch):
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 3, 1, 0, 30, tzinfo=timezone.utc)
+    monkeypatch.setattr(snapshot, "datetime", FixedDatetime)
+
+    peaks = {
+        "2025-10": peak("2025-10-20", 90.0),   # geriye bakışın dışında
+        "2025-12": peak("2025-12-31", 100.0),
+        # 2026-01: bu ay hiç peak yok
+        "2026-02": peak("2026-02-28", 110.0),
+        "2026-03": peak("2026-03-01", 99.0),
+    }
+    rows = snapshot.get_monthly_optimized_data(months=4, peaks=peaks)
+    assert [row["time"] for row in rows] == ["Aralık 2025", "Şubat 2026", "Mart 2026"]
+    assert [row["peak_date"] for row in rows] == ["2025-12-31", "2026-02-28", "2026-03-01"]
+    # Değişim bir önceki gösterilen aya göre; boş ay araya sıfır eklemez
+    assert rows[0]["change_percent"] == 0
+    assert rows[1]["change_percent"] == pytest.approx(10.0)
+    assert rows[2]["change_percent"] == pytest.approx(-10.0)
+
+    assert snapshot.get_monthly_optimized_data(months=1, peaks={"2026-02": peak("2026-02-28", 1.0)}) == []
@@ -0,0 +1,43 @@
+"""
+Panel sayfası (/): önceden sıkıştırılmış çeşitler Accept-Encoding'e göre seçilir,
+ETag kodlamaya göre ayrışır ve eşleşince 304 döner - Flask ve ASGI'de aynı
+"""
+import gzip
+
+import core
+
+
+def test_page_gzip_and_304(get):
+    status, headers, body = get("/", {"Accept-Encoding": "gzip"})
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(body) == core.page.PAGE_VARIANTS["identity"]
+    etag = headers["etag"]
+
+    status, headers, body = get("/", {"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert status == 304
+    assert body == b""
+    assert headers["etag"] == etag
+    assert "content-type" not in headers
+
+
+def test_page_identity_has_its_own_etag(get):
+    _, gzip_headers, _ = get("/", {"Accept-Encoding": "gzip"})
+    status, headers, body = get("/", {"Accept-Encoding": "identity", "If-None-Match": gzip_headers["etag"]})
+    # gzip çeşidinin ETag'i sıkıştırılmamış gövdeyi doğrulamaz
+    assert status == 200
+    assert "content-encoding" not in headers
+    assert headers["etag"] != gzip_headers["etag"]
+    assert body == core.page.PAGE_VARIANTS["identity"]
+    assert headers["content-type"] == "text/html; charset=utf-8"
+
+    status, _, _ = get("/", {"Accept-Encoding": "identity", "If-None-Match": f'W/{headers["etag"]}'})
+    assert status == 304
+
+
+def test_page_gzip_refused_with_q0(get):
+    status, headers, body = get("/", {"Accept-Encoding": "gzip;q=0"})
+    assert status == 200
+    assert "content-encoding" not in headers
+    assert body == core.page.PAGE_VARIANTS["identity"]
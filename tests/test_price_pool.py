@@ -0,0 +1,52 @@
+"""
+Canlı fiyat havuzu: asılı kalan bir kaynak havuzu tüketmez (kaynak başına tek yenileme,
+istekler süre sınırıyla bekler), önbellek isabeti havuza hiç uğramaz
+"""
+import threading
+
+import pytest
+
+from core import prices
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    hang = threading.Event()
+    calls = {source: 0 for source in prices.PRICE_SOURCES}
+
+    def source_fn(source):
+        def fetch():
+            calls[source] += 1
+            if source == "gold":
+                hang.wait(5)
+            return f"{source}-value"
+        return fetch
+
+    monkeypatch.setattr(prices, "PRICE_SOURCES", {source: source_fn(source) for source in prices.PRICE_SOURCES})
+    monkeypatch.setattr(prices, "_price_cache", {})
+    monkeypatch.setattr(prices, "_inflight", {})
+    yield calls
+    hang.set()
+
+
+def test_hung_source_holds_one_worker(sources):
+    for _ in range(20):
+        results = prices.fetch_all_prices(deadline=0.05)
+        assert results["gold"] == {"error": "timeout"}
+    assert results["silver"]["value"] == "silver-value"
+    # Yirmi istek aynı süren işi paylaştı; diğer kaynaklar taze önbellekten döndü
+    assert sources == {"gold": 1, "silver": 1, "gold_ounce_usd": 1, "silver_ounce_usd": 1}
+    with pytest.raises(Exception, match="timeout"):
+        prices.get_cached_price("gold", deadline=0.05)
+
+
+def test_cache_hit_does_not_use_pool(sources, monkeypatch):
+    prices.fetch_all_prices(sources=["silver"], deadline=1)
+
+    class NoPool:
+        def submit(self, *args):
+            raise AssertionError("cache hit must not be submitted")
+
+    monkeypatch.setattr(prices, "_fetch_pool", NoPool())
+    assert prices.get_cached_price("silver")[0] == "silver-value"
+    assert prices.fetch_all_prices(sources=["silver"])["silver"]["value"] == "silver-value"
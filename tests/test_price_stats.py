@@ -0,0 +1,25 @@
+"""
+get_price_stats: portföy değeri olmayan eski kayıt zirve seçilirse, seçimde kullanılan
+altın + gümüş değeri döner (None değil) - sütunlu ve düz yolda aynı sonuç
+"""
+import pytest
+
+from core import snapshot
+
+RECORDS = [
+    {"timestamp": 1767261600, "date": "2026-01-01", "time": "10:00:00", "gold_price": 100.0, "silver_price": 5.0,
+     "portfolio_value": 105.0},
+    # Eski kayıt: portföy hesaplanmamış, ama altın + gümüş en yüksek
+    {"timestamp": 1767265200, "date": "2026-01-01", "time": "11:00:00", "gold_price": 120.0, "silver_price": 6.0},
+]
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_portfolio_peak_without_stored_value(columnar, monkeypatch):
+    columns = snapshot.build_columnar_history(RECORDS) if columnar else None
+    monkeypatch.setattr(snapshot, "get_history_snapshot",
+                        lambda: snapshot.HistorySnapshot(1, "2026-01-01", [], [], {}, columns))
+    monkeypatch.setattr(snapshot, "load_price_history", lambda: {"records": RECORDS})
+    stats = snapshot.get_price_stats()
+    assert stats["portfolio"] == {"value": 126.0, "date": "2026-01-01", "time": "11:00"}
+    assert stats["gold"]["value"] == 120.0
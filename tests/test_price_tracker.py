@@ -0,0 +1,94 @@
+"""
+Artımlı peak bakımı (optimize_realtime) eski altı taramalı uygulamayla aynı
+daily_peak/monthly_peak bayraklarını üretmeli; indeks yayınlanan JSON'a girmez
+"""
+import copy
+import json
+import random
+
+import price_tracker
+
+
+def reference_optimize(records, today):
+    """Önceki optimize_realtime: bugünü ve bu ayı baştan tarar"""
+    for record in records:
+        if record.get("date") == today:
+            record["daily_peak"] = False
+    daily_peak = price_tracker.find_daily_peak(records, today)
+    if daily_peak:
+        for record in records:
+            if record.get("timestamp") == daily_peak.get("timestamp") and record.get("date") == today:
+                record["daily_peak"] = True
+                break
+    month = today[:7]
+    for record in records:
+        if record.get("date", "").startswith(month):
+            record["monthly_peak"] = False
+    monthly_peak = price_tracker.find_monthly_peak(records, month)
+    if monthly_peak:
+        for record in records:
+            if (record.get("timestamp") == monthly_peak.get("timestamp")
+                    and record.get("date") == monthly_peak.get("date")):
+                record["monthly_peak"] = True
+                break
+
+
+def flags(records):
+    return [(r["timestamp"], r["daily_peak"], r["monthly_peak"]) for r in records]
+
+
+def test_incremental_peaks_match_full_rescan(capsys):
+    rnd = random.Random(10)
+    reference = []
+    price_data = {"records": []}
+    gold, silver = 5000.0, 60.0
+    ts = 1767225600  # 2026-01-01 00:00 UTC
+    for _ in range(600):
+        ts += rnd.choice((900, 900, 900, 3 * 3600, 20 * 3600))
+        # Kaba yuvarlama eşit değerler (beraberlik) de üretsin
+        gold = round(max(gold + rnd.uniform(-40, 40), 1), -1)
+        silver = round(max(silver + rnd.uniform(-1, 1), 1))
+        date = price_tracker.datetime.fromtimestamp(ts, price_tracker.timezone.utc)
+        record = {
+            "timestamp": ts,
+            "date": date.strftime("%Y-%m-%d"),
+            "time": date.strftime("%H:%M"),
+            "gold_price": gold,
+            "silver_price": silver,
+            "portfolio_value": price_tracker.calculate_portfolio_value(gold, silver),
+            "daily_peak": False,
+            "monthly_peak": False,
+        }
+        reference.append(copy.deepcopy(record))
+        reference_optimize(reference, record["date"])
+        price_data["records"].append(record)
+        price_data = price_tracker.optimize_realtime(price_data)
+        assert flags(price_data["records"]) == flags(reference)
+    capsys.readouterr()
+
+
+def test_peak_index_stored_beside_published_json(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    ts = 1767261600  # 2026-01-01 10:00 UTC
+    for step, gold in enumerate((100.0, 120.0, 110.0)):
+        price_data = price_tracker.load_price_history()
+        price_data["records"].append({
+            "timestamp": ts + step * 900, "date": "2026-01-01", "time": "10:00",
+            "gold_price": gold, "silver_price": 5.0, "portfolio_value": gold + 5.0,
+            "daily_peak": False, "monthly_peak": False})
+        price_tracker.save_price_history(price_tracker.optimize_realtime(price_data))
+
+    with open(price_tracker.PRICE_HISTORY_PATH, encoding="utf-8") as f:
+        published = json.load(f)
+    assert "peak_index" not in published
+    assert [r["daily_peak"] for r in published["records"]] == [False, True, False]
+
+    loaded = price_tracker.load_price_history()
+    assert loaded["peak_index"]["daily"]["2026-01-01"]["timestamp"] == ts + 900
+
+    # JSON indeksten ileride (ör. indeks yazılamadı): eski indeks kullanılmaz
+    published["records"].append(dict(published["records"][-1], timestamp=ts + 3 * 900))
+    with open(price_tracker.PRICE_HISTORY_PATH, "w", encoding="utf-8") as f:
+        json.dump(published, f)
+    assert "peak_index" not in price_tracker.load_price_history()
+    capsys.readouterr()
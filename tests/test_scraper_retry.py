@@ -0,0 +1,73 @@
+"""
+Kaynak sayfa istekleri okuma zaman aşımında yeniden denenmez: devre kesicinin tek
+hata saydığı çağrı tek deneme sürer. Aynı anda bekleyen istekler tek (başarısız)
+yenilemenin sonucunu paylaşır, her biri yeniden kazımaz.
+"""
+import socket
+import threading
+import time
+
+import pytest
+import requests
+
+from core import net, prices
+
+
+@pytest.fixture
+def silent_server():
+    """Bağlantıyı kabul eden ama hiç yanıt vermeyen yerel sunucu"""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    accepted = []
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            accepted.append(conn)
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield f"http://127.0.0.1:{server.getsockname()[1]}/", accepted
+    server.close()
+    for conn in accepted:
+        conn.close()
+
+
+def test_scraper_read_timeout_is_single_attempt(silent_server):
+    url, accepted = silent_server
+    started = time.perf_counter()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        net.http_get(url, read_timeout=0.2, session=net.scraper_session)
+    assert time.perf_counter() - started < 0.5
+    assert len(accepted) == 1
+
+
+def test_waiters_share_failed_refresh(monkeypatch):
+    calls = []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.2)
+        raise Exception("source down")
+
+    monkeypatch.setattr(prices, "PRICE_SOURCES", {**prices.PRICE_SOURCES, "gold": failing})
+    monkeypatch.setattr(prices, "_price_cache", {})
+    monkeypatch.setattr(prices, "_inflight", {})
+    errors = []
+
+    def request():
+        try:
+            prices.get_cached_price("gold", deadline=2)
+        except Exception as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert errors == ["source down"] * 8
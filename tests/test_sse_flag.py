@@ -0,0 +1,36 @@
+"""
+SSE_ENABLED: kapalıyken (varsayılan, sunucusuz dağıtım) sayfa /api/snapshot'ı yoklar
+ve /api/stream iki giriş noktasında da 404 döner; bayrak sayfaya derlenir
+"""
+import asyncio
+
+import httpx
+
+import asgi
+import core
+import index
+
+
+def test_stream_disabled_by_default():
+    assert core.page.SSE_ENABLED is False
+    assert b"const SSE_ENABLED = false;" in core.page.PAGE_VARIANTS["identity"]
+
+    response = index.app.test_client().get("/api/stream")
+    assert response.status_code == 404
+    assert response.get_json()["success"] is False
+
+    async def run():
+        transport = httpx.ASGITransport(app=asgi.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/stream")
+    response = asyncio.run(run())
+    assert response.status_code == 404
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_flag_and_poll_interval_are_built_into_page(monkeypatch):
+    monkeypatch.setattr(core.page, "SSE_ENABLED", True)
+    monkeypatch.setattr(core.page, "SNAPSHOT_POLL_INTERVAL", 30)
+    _, variants = core.page.build_page(core.page.HTML_TEMPLATE)
+    assert b"const SSE_ENABLED = true;" in variants["identity"]
+    assert b"const SNAPSHOT_POLL_MS = 30000;" in variants["identity"]
@@ -0,0 +1,28 @@
+"""
+SSE: kuyruğu dolan (okumayan) istemci poller tarafından düşürülünce generator'ı
+kapanış işaretiyle biter - asılı kalan generator olmaz
+"""
+import itertools
+
+from core import stream
+
+
+def test_slow_client_generator_returns(monkeypatch):
+    counter = itertools.count()
+    monkeypatch.setattr(stream, "get_dashboard_snapshot",
+                        lambda: {"gold": {"success": True, "price": next(counter)}})
+    monkeypatch.setattr(stream, "STREAM_INTERVAL", 0.001)
+    monkeypatch.setattr(stream, "STREAM_KEEPALIVE", 5)
+    monkeypatch.setattr(stream, "_stream_state", {})
+
+    events = stream.stream_events()
+    assert next(events).startswith("event: snapshot")
+    [client] = list(stream._stream_clients)
+    # İstemci okumazken poller kuyruğu doldurup istemciyi düşürür
+    while client in stream._stream_clients:
+        stream.time.sleep(0.005)
+
+    # Kuyrukta yalnızca kapanış işareti kalır, generator biter
+    assert list(events) == []
+    stream._stream_thread and stream._stream_thread.join(1)
+    assert not stream._stream_clients